@@ -1,16 +1,55 @@
-from typing import Any, Generic, TypeVar, Optional, Annotated
+import sys
+import threading
+from pathlib import Path
+from contextlib import redirect_stdout
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, cast, TextIO, Generic, TypeVar, Optional, Annotated
 
 import typer
 from rich import print
 
 from .util import select, get_file_path_extension
 from .input import Input, InputType
+from .model import Model
 from .config import get_config
 from .logger import logger
 from .output import Output, OutputType
 from .generator import Generator
 
 
+class ThreadStdout:
+    """
+    Standard output that every thread can point to its own file, which is written to instead of the original standard output while set
+    """
+
+    __original: TextIO
+    __local: threading.local
+
+    def __init__(self, original: TextIO) -> None:
+        self.__original = original
+        self.__local = threading.local()
+
+    def set_file(self, file: Optional[TextIO]) -> None:
+        self.__local.file = file
+
+    def get_file(self) -> TextIO:
+        file: Optional[TextIO] = getattr(self.__local, "file", None)
+        return self.__original if file is None else file
+
+    def write(self, text: str) -> int:
+        return self.get_file().write(text)
+
+    def flush(self) -> None:
+        self.get_file().flush()
+
+    def isatty(self) -> bool:
+        return self.get_file().isatty()
+
+    @property
+    def encoding(self) -> str:
+        return self.get_file().encoding
+
+
 GeneratorOption = Annotated[
     str,
     typer.Option(
@@ -43,6 +82,18 @@ GeneratorConfigOption = Annotated[
 
 GeneratorConfigDefault = None
 
+OutputDirectoryOption = Annotated[
+    str,
+    typer.Option(
+        "--output-directory",
+        "-d",
+        help="The directory that outputs are written to, each in a file named after its ID",
+        file_okay=False,
+    ),
+]
+
+OutputDirectoryDefault = "."
+
 InputFileArgument = Annotated[
     str,
     typer.Argument(
@@ -52,6 +103,7 @@ InputFileArgument = Annotated[
 ]
 
 T = TypeVar("T")
+TModel = TypeVar("TModel", bound=Model)
 AnyInput = Input[Any, T]  # type: ignore [misc]
 
 
@@ -94,6 +146,48 @@ class Commands(Generic[T]):
 
         logger.debug("End command generate")
 
+    @staticmethod
+    def sweep(
+        generators: dict[str, Generator[list[TModel]]],
+        generator_name: GeneratorOption,
+        outputs: dict[OutputType, Output[TModel]],
+        output_type: OutputTypeOption,
+        generator_config: GeneratorConfigOption,
+        output_directory: OutputDirectoryOption,
+    ) -> None:
+        logger.debug(f"Start command sweep with config: {get_config().to_json()}")
+
+        generator = select("generator", generators, generator_name)
+        output = select("output", outputs, output_type)
+
+        logger.debug("Start generator")
+        generated = generator.run_super(generator_config)
+        logger.debug("End generator")
+
+        # Outputs are written at the same time, each to its own file from its own
+        # thread, so that items which are generated together are also written in one pass
+        directory = Path(output_directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        stdout = ThreadStdout(sys.stdout)
+
+        def write(item: TModel) -> None:
+            path = directory / f"{item.get_id()}.{output_type.value}"
+            logger.debug(f"Start output to {path}")
+            with open(path, "w") as file:
+                stdout.set_file(file)
+                try:
+                    output.run_super(item)
+                finally:
+                    stdout.set_file(None)
+            logger.debug(f"End output to {path}")
+
+        with redirect_stdout(cast(TextIO, stdout)):
+            with ThreadPoolExecutor(max(len(generated), 1)) as executor:
+                for future in [executor.submit(write, item) for item in generated]:
+                    future.result()
+
+        logger.debug("End command sweep")
+
     @staticmethod
     def convert(
         inputs: dict[InputType, AnyInput[T]],
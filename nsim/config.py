@@ -1,10 +1,12 @@
 import json
 from enum import Enum
-from typing import Annotated
+from typing import Optional, Annotated
 from dataclasses import dataclass
 
 import typer
 
+from .seed import set_root_seed
+
 
 class LoggingLevel(str, Enum):
     DEBUG = "debug"
@@ -13,17 +15,35 @@ class LoggingLevel(str, Enum):
     ERROR = "error"
 
 
-def set_config(logging_level: LoggingLevel) -> None:
+class RoutingMetric(str, Enum):
+    HOPS = "hops"
+    BANDWIDTH = "bandwidth"
+
+
+def set_config(
+    logging_level: LoggingLevel,
+    workers: int = 1,
+    seed: int | None = None,
+    routing: RoutingMetric | None = None,
+) -> None:
     global config
     config = Config(  # type: ignore [name-defined]
         logging=LoggingConfig(
             level=logging_level,
         ),
+        generation=GenerationConfig(
+            workers=workers,
+            seed=set_root_seed(seed),
+            routing=routing,
+        ),
     )
 
 
 def set_logging_level(logging_level: LoggingLevel) -> None:
-    set_config(logging_level=logging_level)
+    try:
+        get_config().logging.level = logging_level
+    except RuntimeError:
+        set_config(logging_level=logging_level)
 
 
 LoggingLevelOption = Annotated[
@@ -38,20 +58,94 @@ LoggingLevelOption = Annotated[
 LoggingLevelDefault = LoggingLevel.INFO
 
 
+def set_workers(workers: int) -> None:
+    try:
+        get_config().generation.workers = workers
+    except RuntimeError:
+        set_config(logging_level=LoggingLevelDefault, workers=workers)
+
+
+WorkersOption = Annotated[
+    int,
+    typer.Option(
+        help="Set the number of processes that generation is spread over",
+        rich_help_panel="Config",
+        callback=set_workers,
+        min=1,
+    ),
+]
+
+WorkersDefault = 1
+
+
+def set_seed(seed: int | None) -> None:
+    try:
+        get_config().generation.seed = set_root_seed(seed)
+    except RuntimeError:
+        set_config(logging_level=LoggingLevelDefault, seed=seed)
+
+
+SeedOption = Annotated[
+    Optional[int],
+    typer.Option(
+        help="Set the seed from which all random numbers are derived, which makes generation reproducible (random if not given)",
+        rich_help_panel="Config",
+        callback=set_seed,
+        show_default=False,
+        min=0,
+    ),
+]
+
+SeedDefault = None
+
+
+def set_routing(routing: RoutingMetric | None) -> None:
+    try:
+        get_config().generation.routing = routing
+    except RuntimeError:
+        set_config(logging_level=LoggingLevelDefault, routing=routing)
+
+
+RoutingOption = Annotated[
+    Optional[RoutingMetric],
+    typer.Option(
+        help="Set the metric of the shortest paths that are attached to generated traffic (no paths if not given)",
+        rich_help_panel="Config",
+        callback=set_routing,
+        show_default=False,
+    ),
+]
+
+RoutingDefault = None
+
+
 @dataclass
 class LoggingConfig:
     level: LoggingLevel
 
 
+@dataclass
+class GenerationConfig:
+    workers: int
+    seed: int
+    routing: RoutingMetric | None
+
+
 @dataclass
 class Config:
     logging: LoggingConfig
+    generation: GenerationConfig
 
     def to_json(self) -> str:
         config_dict = {
             "logging": {
                 "level": self.logging.level,
             },
+            "generation": {
+                "workers": self.generation.workers,
+                "seed": self.generation.seed,
+                "routing": self.generation.routing,
+            },
         }
         return json.dumps(config_dict)
 
@@ -9,7 +9,10 @@ from .util import Json, Connectivity, select, get_file_path_extension
 from .input import InputType
 from .logger import logger
 from .topology.inputs import topology_inputs
+from .topology.sampling import to_connectivities
 from .topology.models.node import Node
+from .traffic.sizes import SIZE_RANGES, SizeDistribution, to_size_distribution
+from .traffic.models.traffic import MAX_ARRIVAL_SIZE
 
 
 TInputType = TypeVar("TInputType")
@@ -89,6 +92,18 @@ class Generator(Generic[TGeneratorType], metaclass=ABCMeta):
             except ValueError:
                 logger.error(f"Input must be {validate_text}")
 
+    def _has_input(self, variable_name: str) -> bool:
+        """
+        Check whether a value for `variable_name` was provided in generator_options, for inputs that are optional and not prompted for
+        """
+        if self.generator_options is None:
+            return False
+        try:
+            opts: Json = json.loads(self.generator_options)
+            return variable_name in opts
+        except Exception:
+            return False
+
     def _get_input_name(self) -> str:
         name = self._get_input(
             "name",
@@ -122,6 +137,19 @@ class Generator(Generic[TGeneratorType], metaclass=ABCMeta):
         logger.debug(f"Set connectivity to {connectivity}")
         return connectivity
 
+    def _get_input_connectivities(self) -> list[Connectivity]:
+        connectivities = self._get_input(
+            "connectivities",
+            "the connectivities",
+            "a JSON list of distinct floats with value >= 0 and <= 1",
+            to_connectivities,
+            lambda c: len(c) > 0
+            and len(set(c)) == len(c)
+            and all(n >= 0 and n <= 1 for n in c),
+        )
+        logger.debug(f"Set connectivities to {connectivities}")
+        return connectivities
+
     def _get_input_node(self) -> Node:
         def to_node(file_path: str) -> Node:
             i = select(
@@ -151,6 +179,23 @@ class Generator(Generic[TGeneratorType], metaclass=ABCMeta):
         logger.debug(f"Set duration to {duration}")
         return duration
 
+    def _get_input_sizes(self) -> SizeDistribution:
+        # Sizes are optional, so the default distribution is used rather than
+        # prompting for them
+        if not self._has_input("sizes"):
+            logger.debug("Set sizes to the default uniform distribution")
+            return SizeDistribution(SIZE_RANGES["uniform"])
+
+        sizes = self._get_input(
+            "sizes",
+            "the distribution of message sizes in bytes",
+            f"one of {', '.join(SIZE_RANGES)}, or a JSON list or JSON file path of [min, max, weight] ranges or of [size, cumulative probability] points, with sizes <= {MAX_ARRIVAL_SIZE}",
+            to_size_distribution,
+            lambda d: d.get_max() <= MAX_ARRIVAL_SIZE,
+        )
+        logger.debug(f"Set sizes to {sizes}")
+        return sizes
+
     def run_super(self, generator_options: str | None) -> TGeneratorType:
         self.generator_options = generator_options
         result = self.run()
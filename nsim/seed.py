@@ -0,0 +1,56 @@
+import random
+import secrets
+from enum import Enum
+
+import numpy as np
+
+
+class Stream(int, Enum):
+    """
+    Subsystem that draws random numbers, each of which gets a random stream that is independent of the others
+    """
+
+    EDGES = 0
+    ROUTES = 1
+    SIZES = 2
+    INTER_ARRIVAL_TIMES = 3
+
+
+__root_seed: int | None = None
+__seeds: dict[Stream, np.random.SeedSequence] = {}
+__randoms: dict[Stream, random.Random] = {}
+
+
+def set_root_seed(seed: int | None) -> int:
+    """
+    Set the seed that all random streams are derived from, or pick a random one if no seed is given, and return it
+    """
+    global __root_seed
+    __root_seed = secrets.randbits(64) if seed is None else seed
+    __seeds.clear()
+    __randoms.clear()
+    return __root_seed
+
+
+def __get_stream_seed(stream: Stream) -> np.random.SeedSequence:
+    if stream not in __seeds:
+        root_seed = set_root_seed(None) if __root_seed is None else __root_seed
+        __seeds[stream] = np.random.SeedSequence(root_seed, spawn_key=(int(stream),))
+    return __seeds[stream]
+
+
+def spawn_seed(stream: Stream) -> np.random.SeedSequence:
+    """
+    Get a new seed from a random stream. The n-th seed spawned from a stream is the same in every run with the same root seed, no matter how many seeds were spawned from other streams
+    """
+    return __get_stream_seed(stream).spawn(1)[0]
+
+
+def get_random(stream: Stream) -> random.Random:
+    """
+    Get the generator of a random stream for code that draws one number at a time, for which Python's own generator is faster than NumPy
+    """
+    if stream not in __randoms:
+        state = __get_stream_seed(stream).generate_state(1, np.uint64)
+        __randoms[stream] = random.Random(int(state[0]))
+    return __randoms[stream]
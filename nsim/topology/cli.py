@@ -1,7 +1,15 @@
 import typer
 
 from .inputs import topology_inputs
-from ..config import LoggingLevelOption, LoggingLevelDefault, get_config
+from ..config import (
+    SeedOption,
+    SeedDefault,
+    WorkersOption,
+    WorkersDefault,
+    LoggingLevelOption,
+    LoggingLevelDefault,
+    get_config,
+)
 from ..logger import logger
 from .outputs import topology_outputs
 from ..version import VersionOption, VersionDefault
@@ -11,10 +19,12 @@ from ..commands import (
     OutputTypeOption,
     InputFileArgument,
     OutputTypeDefault,
+    OutputDirectoryOption,
+    OutputDirectoryDefault,
     GeneratorConfigOption,
     GeneratorConfigDefault,
 )
-from .generators import topology_generators
+from .generators import topology_generators, topology_sweep_generators
 
 
 topology_app = typer.Typer()
@@ -48,6 +58,8 @@ def topology_generate(
     generator: GeneratorOption,
     output_type: OutputTypeOption = OutputTypeDefault,
     generator_config: GeneratorConfigOption = GeneratorConfigDefault,
+    workers: WorkersOption = WorkersDefault,
+    seed: SeedOption = SeedDefault,
     version: VersionOption = VersionDefault,
     logging_level: LoggingLevelOption = LoggingLevelDefault,
 ) -> None:
@@ -63,6 +75,30 @@ def topology_generate(
     )
 
 
+@topology_app.command("sweep")  # type: ignore [misc]
+def topology_sweep(
+    generator: GeneratorOption,
+    output_type: OutputTypeOption = OutputTypeDefault,
+    output_directory: OutputDirectoryOption = OutputDirectoryDefault,
+    generator_config: GeneratorConfigOption = GeneratorConfigDefault,
+    workers: WorkersOption = WorkersDefault,
+    seed: SeedOption = SeedDefault,
+    version: VersionOption = VersionDefault,
+    logging_level: LoggingLevelOption = LoggingLevelDefault,
+) -> None:
+    """
+    Generate random network topologies at a number of connectivities in one pass using a given sweep generator, and write each to its own file in a directory
+    """
+    Commands.sweep(
+        topology_sweep_generators,
+        generator,
+        topology_outputs,
+        output_type,
+        generator_config,
+        output_directory,
+    )
+
+
 @topology_app.command("convert")  # type: ignore [misc]
 def topology_convert(
     input_file: InputFileArgument,
@@ -1,11 +1,28 @@
 from nsim.generator import Generator
 
-from .mesh import MeshTopologyGenerator
-from .star import StarTopologyGenerator
+from .mesh import MeshTopologyGenerator, MeshSweepTopologyGenerator
+from .star import StarTopologyGenerator, StarSweepTopologyGenerator
+from .torus import TorusTopologyGenerator
+from .fast_mesh import FastMeshTopologyGenerator
+from .waxman import WaxmanTopologyGenerator
+from .fat_tree import FatTreeTopologyGenerator
+from .dragonfly import DragonflyTopologyGenerator
+from .barabasi_albert import BarabasiAlbertTopologyGenerator
 from ..models.node import Node
 
 
 topology_generators: dict[str, Generator[Node]] = {
     "mesh": MeshTopologyGenerator(),
+    "fast-mesh": FastMeshTopologyGenerator(),
+    "barabasi-albert": BarabasiAlbertTopologyGenerator(),
     "star": StarTopologyGenerator(),
+    "waxman": WaxmanTopologyGenerator(),
+    "fat-tree": FatTreeTopologyGenerator(),
+    "torus": TorusTopologyGenerator(),
+    "dragonfly": DragonflyTopologyGenerator(),
+}
+
+topology_sweep_generators: dict[str, Generator[list[Node]]] = {
+    "mesh": MeshSweepTopologyGenerator(),
+    "star": StarSweepTopologyGenerator(),
 }
@@ -0,0 +1,73 @@
+import numpy as np
+
+from nsim.generator import Generator
+
+from ...seed import Stream, spawn_seed
+from ..sampling import IndexArray
+from ..models.leaf import LeafType
+from ..models.node import BANDWIDTHS, Node
+from ..models.compact import LEAF_TYPES, CompactTopology
+
+
+class BarabasiAlbertTopologyGenerator(Generator[Node]):
+    """
+    Generates a scale-free topology in which every new host links to m existing hosts, preferring hosts that already have many links
+    """
+
+    def __attach(
+        self,
+        number_of_nodes: int,
+        number_of_links: int,
+        rng: np.random.Generator,
+    ) -> tuple[IndexArray, IndexArray]:
+        m = number_of_links
+        number_of_edges = max(number_of_nodes - m, 0) * m
+
+        # Link e belongs to node m + e // m. In the list of link endpoints, link e
+        # takes positions 2e (the new node) and 2e + 1 (its target), so picking a
+        # uniform position among the endpoints of all earlier links picks a node with
+        # probability proportional to its degree
+        sources = m + np.arange(number_of_edges, dtype=np.int64) // m
+        endpoints = 2 * m * (sources - m)
+        positions = (rng.random(number_of_edges) * endpoints).astype(np.int64)
+
+        # The first new node links to all initial nodes. Otherwise, an even position
+        # holds the new node of a link, whose value is known, and an odd position
+        # holds the target of an earlier link, which is resolved below
+        targets = np.where(positions % 2 == 0, m + positions // 2 // m, -1)
+        targets[:m] = np.arange(min(m, number_of_edges))
+        pointers = positions // 2
+
+        # Resolve the targets that point to earlier links by pointer jumping, which
+        # takes a logarithmic number of rounds
+        unresolved = np.flatnonzero(targets < 0)
+        while len(unresolved) > 0:
+            pointed = targets[pointers[unresolved]]
+            resolved = pointed >= 0
+            targets[unresolved[resolved]] = pointed[resolved]
+            unresolved = unresolved[~resolved]
+            pointers[unresolved] = pointers[pointers[unresolved]]
+
+        # A node can pick the same target more than once, but only links once
+        unique = np.unique(sources * number_of_nodes + targets)
+        return unique // number_of_nodes, unique % number_of_nodes
+
+    def run(self) -> Node:
+        name = self._get_input_name()
+        number_of_nodes = self._get_input_number_of_nodes()
+        number_of_links = self._get_input(
+            "number_of_links",
+            "the number of links every new node makes",
+            "a valid integer with value >= 1",
+            int,
+            lambda n: n >= 1,
+        )
+
+        link_seed, bandwidth_seed = spawn_seed(Stream.EDGES).spawn(2)
+        rng = np.random.default_rng(link_seed)
+        a, b = self.__attach(number_of_nodes, number_of_links, rng)
+        bandwidths = np.random.default_rng(bandwidth_seed).choice(BANDWIDTHS, len(a))
+
+        ids = [f"{name}_{i}" for i in range(number_of_nodes)]
+        types = np.full(number_of_nodes, LEAF_TYPES.index(LeafType.HOST), np.uint8)
+        return CompactTopology.from_links(name, ids, types, a, b, bandwidths)
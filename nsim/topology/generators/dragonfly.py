@@ -0,0 +1,88 @@
+import numpy as np
+
+from nsim.generator import Generator
+
+from ..sampling import to_mesh_pairs
+from ..models.leaf import LeafType
+from ..models.node import Node
+from ..models.compact import LEAF_TYPES, CompactTopology
+
+
+"""
+Link speeds in bits per second of the links to hosts, within groups, and between groups
+"""
+HOST_BANDWIDTH = 10000000000
+LOCAL_BANDWIDTH = 40000000000
+GLOBAL_BANDWIDTH = 100000000000
+
+
+class DragonflyTopologyGenerator(Generator[Node]):
+    """
+    Generates a dragonfly topology of a * h + 1 fully connected groups of a routers, in which every router has p hosts and h global links, and every pair of groups is connected by exactly one global link
+    """
+
+    def run(self) -> Node:
+        name = self._get_input_name()
+        a = self._get_input(
+            "routers_per_group",
+            "the number of routers per group",
+            "a valid integer with value >= 1",
+            int,
+            lambda n: n >= 1,
+        )
+        p = self._get_input(
+            "hosts_per_router",
+            "the number of hosts per router",
+            "a valid integer with value >= 0",
+            int,
+            lambda n: n >= 0,
+        )
+        h = self._get_input(
+            "global_links_per_router",
+            "the number of links from every router to other groups",
+            "a valid integer with value >= 1",
+            int,
+            lambda n: n >= 1,
+        )
+        g = a * h + 1
+        number_of_routers = g * a
+
+        # Routers are fully connected within their group
+        local_a, local_b = to_mesh_pairs(np.arange(a * (a - 1) // 2, dtype=np.int64))
+        groups = np.repeat(np.arange(g, dtype=np.int64), len(local_a)) * a
+        local_a = groups + np.tile(local_a, g)
+        local_b = groups + np.tile(local_b, g)
+
+        # Group i reaches group j through its global port (j - i - 1) mod g, which
+        # belongs to router ((j - i - 1) mod g) // h
+        group_i, group_j = to_mesh_pairs(np.arange(g * (g - 1) // 2, dtype=np.int64))
+        global_a = group_i * a + (group_j - group_i - 1) % g // h
+        global_b = group_j * a + (group_i - group_j - 1) % g // h
+
+        hosts = np.arange(number_of_routers * p, dtype=np.int64)
+        host_a = number_of_routers + hosts
+        host_b = hosts // max(p, 1)
+
+        ids = [f"{name}_router_{i}_{r}" for i in range(g) for r in range(a)]
+        ids += [
+            f"{name}_host_{i}_{r}_{j}"
+            for i in range(g)
+            for r in range(a)
+            for j in range(p)
+        ]
+        types = np.full(len(ids), LEAF_TYPES.index(LeafType.SWITCH), np.uint8)
+        types[number_of_routers:] = LEAF_TYPES.index(LeafType.HOST)
+        bandwidths = [
+            np.full(len(local_a), LOCAL_BANDWIDTH),
+            np.full(len(global_a), GLOBAL_BANDWIDTH),
+            np.full(len(hosts), HOST_BANDWIDTH),
+        ]
+
+        return CompactTopology.from_links(
+            name,
+            ids,
+            types,
+            np.concatenate([local_a, global_a, host_a]),
+            np.concatenate([local_b, global_b, host_b]),
+            np.concatenate(bandwidths),
+        )
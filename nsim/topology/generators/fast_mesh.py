@@ -0,0 +1,35 @@
+import numpy as np
+
+from nsim.generator import Generator
+
+from ..sampling import to_mesh_pairs, sample_pair_indices
+from ..models.leaf import LeafType
+from ..models.node import BANDWIDTHS, Node
+from ...seed import Stream, spawn_seed
+from ...config import get_config
+from ..models.compact import LEAF_TYPES, CompactTopology
+
+
+class FastMeshTopologyGenerator(Generator[Node]):
+    """
+    Generates the same kind of topology as the mesh generator, but stores it compactly so that large, sparse topologies can be generated quickly
+    """
+
+    def run(self) -> Node:
+        name = self._get_input_name()
+        number_of_nodes = self._get_input_number_of_nodes()
+        connectivity = self._get_input_connectivity()
+
+        pair_seed, bandwidth_seed = spawn_seed(Stream.EDGES).spawn(2)
+        indices = sample_pair_indices(
+            number_of_nodes * (number_of_nodes - 1) // 2,
+            connectivity,
+            pair_seed,
+            get_config().generation.workers,
+        )
+        a, b = to_mesh_pairs(indices)
+        bandwidths = np.random.default_rng(bandwidth_seed).choice(BANDWIDTHS, len(a))
+
+        ids = [f"{name}_{i}" for i in range(number_of_nodes)]
+        types = np.full(number_of_nodes, LEAF_TYPES.index(LeafType.HOST), np.uint8)
+        return CompactTopology.from_links(name, ids, types, a, b, bandwidths)
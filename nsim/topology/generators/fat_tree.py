@@ -0,0 +1,78 @@
+import numpy as np
+
+from nsim.generator import Generator
+
+from ..models.leaf import LeafType
+from ..models.node import Node
+from ..models.compact import LEAF_TYPES, CompactTopology
+
+
+"""
+Link speeds in bits per second, which increase towards the core of the fabric
+"""
+HOST_BANDWIDTH = 10000000000
+EDGE_BANDWIDTH = 40000000000
+CORE_BANDWIDTH = 100000000000
+
+
+class FatTreeTopologyGenerator(Generator[Node]):
+    """
+    Generates a k-ary fat-tree data center topology of k pods, each with k/2 edge and k/2 aggregation switches, (k/2)^2 core switches, and k/2 hosts per edge switch
+    """
+
+    def run(self) -> Node:
+        name = self._get_input_name()
+        k = self._get_input(
+            "k",
+            "the number of ports per switch",
+            "an even integer with value >= 2",
+            int,
+            lambda n: n >= 2 and n % 2 == 0,
+        )
+        half = k // 2
+
+        # Switches and hosts are numbered tier by tier, from the core down to the hosts
+        ids = [f"{name}_core_{i}_{j}" for i in range(half) for j in range(half)]
+        ids += [f"{name}_aggregation_{p}_{i}" for p in range(k) for i in range(half)]
+        ids += [f"{name}_edge_{p}_{e}" for p in range(k) for e in range(half)]
+        first_aggregation = half * half
+        first_edge = first_aggregation + k * half
+        first_host = first_edge + k * half
+        ids += [
+            f"{name}_host_{p}_{e}_{h}"
+            for p in range(k)
+            for e in range(half)
+            for h in range(half)
+        ]
+        types = np.full(len(ids), LEAF_TYPES.index(LeafType.SWITCH), np.uint8)
+        types[first_host:] = LEAF_TYPES.index(LeafType.HOST)
+
+        # Every edge switch connects to its hosts and to every aggregation switch in
+        # its pod, and aggregation switch i of every pod connects to core switches
+        # (i, 0) to (i, k/2 - 1)
+        hosts = np.arange(k * half * half, dtype=np.int64)
+        pod, rest = np.divmod(hosts, half * half)
+        port, other = np.divmod(rest, half)
+        links_a = [
+            first_host + hosts,
+            first_aggregation + pod * half + port,
+            first_aggregation + pod * half + port,
+        ]
+        links_b = [
+            first_edge + hosts // half,
+            first_edge + pod * half + other,
+            port * half + other,
+        ]
+        bandwidths = [
+            np.full(len(hosts), bandwidth, np.int64)
+            for bandwidth in (HOST_BANDWIDTH, EDGE_BANDWIDTH, CORE_BANDWIDTH)
+        ]
+
+        return CompactTopology.from_links(
+            name,
+            ids,
+            types,
+            np.concatenate(links_a),
+            np.concatenate(links_b),
+            np.concatenate(bandwidths),
+        )
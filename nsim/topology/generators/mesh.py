@@ -1,8 +1,15 @@
 from nsim.generator import Generator
 
-from ..models.leaf import Leaf, LeafType
-from ..models.node import Node
-from ..models.topology import Topology
+from ..sampling import (
+    take_indices,
+    sample_bandwidths,
+    sample_pair_indices,
+    sample_coupled_pair_indices,
+)
+from ..shapes import make_mesh
+from ..models.node import BANDWIDTHS, Node
+from ...seed import Stream, spawn_seed
+from ...config import get_config
 
 
 class MeshTopologyGenerator(Generator[Node]):
@@ -15,11 +22,47 @@ class MeshTopologyGenerator(Generator[Node]):
         number_of_nodes = self._get_input_number_of_nodes()
         connectivity = self._get_input_connectivity()
 
-        topology = Topology(name)
-        for i in range(number_of_nodes):
-            leaf = Leaf(f"{name}_{i}", LeafType.HOST)
-            for node in topology.get_nodes():
-                leaf.connect(node, connectivity)
-            topology.add_node(leaf)
+        pair_seed, bandwidth_seed = spawn_seed(Stream.EDGES).spawn(2)
+        indices = sample_pair_indices(
+            number_of_nodes * (number_of_nodes - 1) // 2,
+            connectivity,
+            pair_seed,
+            get_config().generation.workers,
+        )
+        bandwidths = sample_bandwidths(len(indices), bandwidth_seed, BANDWIDTHS)
 
-        return topology
+        return make_mesh(name, name, number_of_nodes, indices, bandwidths)
+
+
+class MeshSweepTopologyGenerator(Generator[list[Node]]):
+    """
+    Generates a mesh topology for each of a list of connectivities in one pass. Every candidate pair is connected in the topologies whose connectivity is above its one uniform mark, so that all topologies are coupled: every edge at a connectivity is also an edge, with the same bandwidth, at every higher connectivity
+    """
+
+    def run(self) -> list[Node]:
+        name = self._get_input_name()
+        number_of_nodes = self._get_input_number_of_nodes()
+        connectivities = self._get_input_connectivities()
+
+        # The topology at the highest connectivity has the same edges as that of
+        # the mesh generator, as the marks are seeded last
+        pair_seed, bandwidth_seed, mark_seed = spawn_seed(Stream.EDGES).spawn(3)
+        indices, positions = sample_coupled_pair_indices(
+            number_of_nodes * (number_of_nodes - 1) // 2,
+            connectivities,
+            pair_seed,
+            mark_seed,
+            get_config().generation.workers,
+        )
+        bandwidths = sample_bandwidths(len(indices), bandwidth_seed, BANDWIDTHS)
+
+        return [
+            make_mesh(
+                f"{name}-{connectivity}",
+                name,
+                number_of_nodes,
+                take_indices(indices, connectivity_positions),
+                take_indices(bandwidths, connectivity_positions),
+            )
+            for connectivity, connectivity_positions in zip(connectivities, positions)
+        ]
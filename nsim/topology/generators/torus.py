@@ -0,0 +1,75 @@
+import numpy as np
+
+from nsim.generator import Generator
+
+from ..sampling import IndexArray
+from ..models.leaf import LeafType
+from ..models.node import Node
+from ..models.compact import LEAF_TYPES, CompactTopology
+
+
+"""
+Link speeds in bits per second of the links to hosts, and of the links between switches
+"""
+HOST_BANDWIDTH = 10000000000
+SWITCH_BANDWIDTH = 100000000000
+
+
+class TorusTopologyGenerator(Generator[Node]):
+    """
+    Generates a 2D or 3D torus of switches, in which every switch connects to its neighbours in every dimension with wrap-around, and to a number of hosts
+    """
+
+    def run(self) -> Node:
+        name = self._get_input_name()
+        dimensions = self._get_input(
+            "dimensions",
+            "the number of switches along every dimension",
+            "2 or 3 integers with value >= 1 separated by x, e.g. 8x8x8",
+            lambda s: [int(d) for d in s.split("x")],
+            lambda d: len(d) in (2, 3) and all(n >= 1 for n in d),
+        )
+        hosts_per_switch = self._get_input(
+            "hosts_per_switch",
+            "the number of hosts connected to every switch",
+            "a valid integer with value >= 0",
+            int,
+            lambda n: n >= 0,
+        )
+
+        number_of_switches = int(np.prod(dimensions))
+        switches = np.arange(number_of_switches, dtype=np.int64)
+        coordinates = np.unravel_index(switches, dimensions)
+        labels = ["_".join(str(c) for c in coordinate) for coordinate in zip(*coordinates)]
+
+        # Switches link to the next switch along every dimension. A dimension of two
+        # switches only has one link, as wrapping around would duplicate it
+        links_a: list[IndexArray] = []
+        links_b: list[IndexArray] = []
+        for dimension, size in enumerate(dimensions):
+            neighbours = list(coordinates)
+            neighbours[dimension] = (coordinates[dimension] + 1) % size
+            has_link = coordinates[dimension] + 1 < size if size <= 2 else switches >= 0
+            links_a.append(switches[has_link])
+            links_b.append(np.ravel_multi_index(neighbours, dimensions)[has_link])
+        number_of_switch_links = sum(len(a) for a in links_a)
+
+        hosts = np.arange(number_of_switches * hosts_per_switch, dtype=np.int64)
+        links_a.append(number_of_switches + hosts)
+        links_b.append(hosts // max(hosts_per_switch, 1))
+
+        ids = [f"{name}_switch_{label}" for label in labels]
+        ids += [f"{name}_host_{l}_{h}" for l in labels for h in range(hosts_per_switch)]
+        types = np.full(len(ids), LEAF_TYPES.index(LeafType.SWITCH), np.uint8)
+        types[number_of_switches:] = LEAF_TYPES.index(LeafType.HOST)
+        bandwidths = np.full(number_of_switch_links + len(hosts), HOST_BANDWIDTH)
+        bandwidths[:number_of_switch_links] = SWITCH_BANDWIDTH
+
+        return CompactTopology.from_links(
+            name,
+            ids,
+            types,
+            np.concatenate(links_a),
+            np.concatenate(links_b),
+            bandwidths,
+        )
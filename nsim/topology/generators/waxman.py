@@ -0,0 +1,62 @@
+import numpy as np
+
+from nsim.generator import Generator
+
+from ...seed import Stream, spawn_seed
+from ..sampling import find_nearby_pairs
+from ..models.leaf import LeafType
+from ..models.node import BANDWIDTHS, Node
+from ..models.compact import LEAF_TYPES, CompactTopology
+
+
+class WaxmanTopologyGenerator(Generator[Node]):
+    """
+    Generates a topology in which hosts are placed in a square area, and nearby hosts are more likely to be connected than distant ones
+    """
+
+    def run(self) -> Node:
+        name = self._get_input_name()
+        number_of_nodes = self._get_input_number_of_nodes()
+        size = self._get_input(
+            "size",
+            "the side length of the square area in meters",
+            "a float with value > 0",
+            float,
+            lambda n: n > 0,
+        )
+        radius = self._get_input(
+            "radius",
+            "the maximum distance in meters between connected hosts",
+            "a float with value > 0",
+            float,
+            lambda n: n > 0,
+        )
+        alpha = self._get_input(
+            "alpha",
+            "the probability that two hosts at the same place are connected",
+            "a float with value > 0 and <= 1",
+            float,
+            lambda n: n > 0 and n <= 1,
+        )
+        beta = self._get_input(
+            "beta",
+            "the rate at which the connection probability decays with distance, relative to the diagonal of the area",
+            "a float with value > 0",
+            float,
+            lambda n: n > 0,
+        )
+
+        placement_seed, link_seed, bandwidth_seed = spawn_seed(Stream.EDGES).spawn(3)
+        x, y = np.random.default_rng(placement_seed).random((2, number_of_nodes)) * size
+
+        # Waxman's connection probability, cut off at the radius so that only nearby
+        # hosts have to be considered
+        a, b, distances = find_nearby_pairs(x, y, radius)
+        probabilities = alpha * np.exp(-distances / (beta * size * np.sqrt(2)))
+        connected = np.random.default_rng(link_seed).random(len(a)) < probabilities
+        a, b, distances = a[connected], b[connected], distances[connected]
+        bandwidths = np.random.default_rng(bandwidth_seed).choice(BANDWIDTHS, len(a))
+
+        ids = [f"{name}_{i}" for i in range(number_of_nodes)]
+        types = np.full(number_of_nodes, LEAF_TYPES.index(LeafType.HOST), np.uint8)
+        return CompactTopology.from_links(name, ids, types, a, b, bandwidths, distances)
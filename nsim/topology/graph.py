@@ -0,0 +1,175 @@
+import numpy as np
+import numpy.typing as npt
+
+from .sampling import IndexArray
+from .models.leaf import Leaf
+from .models.node import Node
+from .models.compact import CompactTopology
+
+
+def to_edge_arrays(
+    node: Node,
+) -> tuple[list[Leaf], IndexArray, IndexArray, npt.NDArray[np.int64]]:
+    """
+    Get the leaves of a node, and its edges as arrays of source and destination indices into those leaves, ordered by source, and of bandwidths. Edges to leaves outside of the node are left out
+    """
+    leaves = node.flatten()
+    if isinstance(node, CompactTopology):
+        sources = node.get_sources()
+        destinations = node.get_destinations().astype(np.int64)
+        return leaves, sources, destinations, node.get_bandwidths()
+
+    indices = {leaf: index for index, leaf in enumerate(leaves)}
+    sources_list: list[int] = []
+    destinations_list: list[int] = []
+    bandwidths_list: list[int] = []
+    for index, leaf in enumerate(leaves):
+        for edge in leaf.get_edges():
+            destination = indices.get(edge.get_destination())
+            if destination is not None:
+                sources_list.append(index)
+                destinations_list.append(destination)
+                bandwidths_list.append(edge.get_bandwidth())
+
+    return (
+        leaves,
+        np.array(sources_list, dtype=np.int64),
+        np.array(destinations_list, dtype=np.int64),
+        np.array(bandwidths_list, dtype=np.int64),
+    )
+
+
+def is_symmetric(
+    number_of_leaves: int,
+    sources: IndexArray,
+    destinations: IndexArray,
+) -> bool:
+    """
+    Check whether every edge has an edge in the opposite direction
+    """
+    forward = np.unique(sources * number_of_leaves + destinations)
+    backward = np.unique(destinations * number_of_leaves + sources)
+    return np.array_equal(forward, backward)
+
+
+def find_components(
+    number_of_leaves: int,
+    sources: IndexArray,
+    destinations: IndexArray,
+) -> IndexArray:
+    """
+    Label every leaf with the smallest index in its connected component, treating edges as undirected. This is a union-find in which all edges are merged at once: the root of every edge's larger endpoint is hooked onto the smaller root, after which paths are compressed by pointer jumping, until no edge joins two trees
+    """
+    parents = np.arange(number_of_leaves, dtype=np.int64)
+    while True:
+        roots_a = parents[sources]
+        roots_b = parents[destinations]
+        joins = roots_a != roots_b
+        if not joins.any():
+            return parents
+
+        # Hooking onto smaller roots only can never create a cycle
+        np.minimum.at(
+            parents,
+            np.maximum(roots_a, roots_b)[joins],
+            np.minimum(roots_a, roots_b)[joins],
+        )
+        grandparents = parents[parents]
+        while not np.array_equal(grandparents, parents):
+            parents = grandparents
+            grandparents = parents[parents]
+
+
+def find_strong_components(
+    number_of_leaves: int,
+    sources: IndexArray,
+    destinations: IndexArray,
+) -> IndexArray:
+    """
+    Label every leaf with its strongly connected component with Tarjan's algorithm, written with an explicit stack so that long paths do not overflow Python's call stack. Components are labelled in the order in which they are completed, so every edge between two components goes from a higher label to a lower one
+    """
+    order = np.argsort(sources, kind="stable")
+    neighbours: list[int] = destinations[order].tolist()
+    offsets: list[int] = np.searchsorted(
+        sources[order],
+        np.arange(number_of_leaves + 1),
+    ).tolist()
+
+    indices = [-1] * number_of_leaves
+    low = [0] * number_of_leaves
+    labels = [-1] * number_of_leaves
+    stack: list[int] = []
+    next_index = 0
+    next_label = 0
+
+    for root in range(number_of_leaves):
+        if indices[root] >= 0:
+            continue
+
+        # Every frame is a leaf with the position of the next edge to visit
+        frames = [(root, offsets[root])]
+        indices[root] = low[root] = next_index
+        next_index += 1
+        stack.append(root)
+        while frames:
+            leaf, position = frames[-1]
+            if position < offsets[leaf + 1]:
+                frames[-1] = (leaf, position + 1)
+                neighbour = neighbours[position]
+                if indices[neighbour] < 0:
+                    indices[neighbour] = low[neighbour] = next_index
+                    next_index += 1
+                    stack.append(neighbour)
+                    frames.append((neighbour, offsets[neighbour]))
+                elif labels[neighbour] < 0:
+                    low[leaf] = min(low[leaf], indices[neighbour])
+                continue
+
+            frames.pop()
+            if frames:
+                parent = frames[-1][0]
+                low[parent] = min(low[parent], low[leaf])
+            if low[leaf] == indices[leaf]:
+                while True:
+                    member = stack.pop()
+                    labels[member] = next_label
+                    if member == leaf:
+                        break
+                next_label += 1
+
+    return np.array(labels, dtype=np.int64)
+
+
+def find_reachable_components(
+    labels: IndexArray,
+    sources: IndexArray,
+    destinations: IndexArray,
+) -> npt.NDArray[np.uint8]:
+    """
+    Find which other strongly connected components every component reaches, as a bitset per component packed into bytes. Components are visited in label order, so the bitsets of all successors of a component are complete by the time they are combined into its own
+    """
+    number_of_components = int(labels.max(initial=-1)) + 1
+    tails = labels[sources]
+    heads = labels[destinations]
+    between = tails != heads
+    links = np.unique(tails[between] * number_of_components + heads[between])
+    link_tails, link_heads = np.divmod(links, number_of_components)
+    link_offsets: list[int] = np.searchsorted(
+        link_tails,
+        np.arange(number_of_components + 1),
+    ).tolist()
+
+    reachable = np.zeros(
+        (number_of_components, (number_of_components + 7) // 8),
+        dtype=np.uint8,
+    )
+    for component in range(number_of_components):
+        successors = link_heads[link_offsets[component] : link_offsets[component + 1]]
+        if len(successors) > 0:
+            reachable[component] = np.bitwise_or.reduce(reachable[successors], axis=0)
+            np.bitwise_or.at(
+                reachable[component],
+                successors >> 3,
+                (1 << (successors & 7)).astype(np.uint8),
+            )
+    return reachable
@@ -8,6 +8,12 @@ from ..models.node import Node
 from ..models.topology import Topology
 
 
+"""
+Types of topologies that are read, of which compact topologies are read back as plain topologies of the same leaves
+"""
+TOPOLOGY_TYPES = ["Topology", "CompactTopology"]
+
+
 class NodeSchema(TypedDict):
     type: str
     id: str
@@ -53,11 +59,13 @@ class JsonTopologyInput(JsonInput[Node]):
                 self._parse_error(
                     f"Key `destination` has invalid value in data: {data}",
                 )
+            if "distance" in data and not isinstance(data["distance"], (int, float)):
+                self._parse_error(f"Key `distance` has invalid type in data: {data}")
         return True
 
     def __parse_node(self, data: Json, leaves: dict[str, Leaf]) -> Node:
         if self.__validate_node(data):
-            if data["type"] == "Topology":
+            if data["type"] in TOPOLOGY_TYPES:
                 topology_data = cast(Json, data)
                 if self.__validate_topology(topology_data):
                     topology = Topology(topology_data["id"])
@@ -71,7 +79,11 @@ class JsonTopologyInput(JsonInput[Node]):
                     leaf = leaves[leaf_data["id"]]
                     for edge in leaf_data["edges"]:
                         self.__validate_edge(edge, leaves)
-                        leaf.add_edge(leaves[edge["destination"]], edge["bandwidth"])
+                        leaf.add_edge(
+                            leaves[edge["destination"]],
+                            edge["bandwidth"],
+                            edge.get("distance"),
+                        )
                     return leaf
 
         self._parse_error(f"Key `type` has invalid value in node data: {data}")
@@ -82,7 +94,7 @@ class JsonTopologyInput(JsonInput[Node]):
         leaves: dict[str, Leaf] = dict(),
     ) -> dict[str, Leaf]:
         if self.__validate_node(data):
-            if data["type"] == "Topology":
+            if data["type"] in TOPOLOGY_TYPES:
                 topology_data = cast(Json, data)
                 if self.__validate_topology(topology_data):
                     for node in topology_data["nodes"]:
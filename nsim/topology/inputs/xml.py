@@ -7,6 +7,12 @@ from ..models.node import Node
 from ..models.topology import Topology
 
 
+"""
+Tags of topologies that are read, of which compact topologies are read back as plain topologies of the same leaves
+"""
+TOPOLOGY_TAGS = ["topology", "compacttopology"]
+
+
 class XmlTopologyInput(XmlInput[Node]):
     def __parse_topology(
         self,
@@ -39,7 +45,12 @@ class XmlTopologyInput(XmlInput[Node]):
             if e_attr["destination"] not in leaves:
                 self._parse_error(f"Unknown destination: {e_attr['destination']}")
 
-            leaf.add_edge(leaves[e_attr["destination"]], e_attr["bandwidth"])
+            distance: float | None = None
+            if "distance" in edge_element.attrib:
+                d_attr = self._parse_attributes(edge_element, {"distance": float})
+                distance = d_attr["distance"]
+
+            leaf.add_edge(leaves[e_attr["destination"]], e_attr["bandwidth"], distance)
         return leaf
 
     def __parse_node(
@@ -48,7 +59,7 @@ class XmlTopologyInput(XmlInput[Node]):
         leaves: dict[str, Leaf],
     ) -> Node:
         node_type = element.tag
-        if node_type == "topology":
+        if node_type in TOPOLOGY_TAGS:
             return self.__parse_topology(element, leaves)
         if node_type == "host" or node_type == "switch":
             return self.__parse_leaf(element, leaves)
@@ -60,7 +71,7 @@ class XmlTopologyInput(XmlInput[Node]):
         leaves: dict[str, Leaf] = dict(),
     ) -> dict[str, Leaf]:
         node_type = element.tag
-        if node_type == "topology":
+        if node_type in TOPOLOGY_TAGS:
             for node_element in element:
                 leaves = self.__scan_leaves(node_element, leaves)
         if node_type == "host" or node_type == "switch":
@@ -0,0 +1,319 @@
+from __future__ import annotations
+
+import numpy as np
+import numpy.typing as npt
+
+from .edge import Edge
+from .leaf import Leaf, LeafType
+from .node import Node
+from ...util import fatal
+from .topology import Topology
+from ..sampling import IndexArray
+
+
+LEAF_TYPES = list(LeafType)
+
+
+class CompactLeaf(Leaf):
+    """
+    Lightweight view of a single leaf in a CompactTopology, created on demand
+    """
+
+    __topology: CompactTopology
+    __index: int
+
+    def __init__(self, topology: CompactTopology, index: int) -> None:
+        super().__init__(topology.get_leaf_id(index), topology.get_leaf_type(index))
+        self.__topology = topology
+        self.__index = index
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, CompactLeaf):
+            return self.__topology is other.__topology and self.__index == other.__index
+        return False
+
+    def __hash__(self) -> int:
+        return hash((id(self.__topology), self.__index))
+
+    def add_edge(
+        self,
+        destination: Leaf,
+        bandwidth: int,
+        distance: float | None = None,
+    ) -> None:
+        if (
+            isinstance(destination, CompactLeaf)
+            and destination.__topology is self.__topology
+        ):
+            self.__topology.add_leaf_edge(
+                self.__index, destination.__index, bandwidth, distance
+            )
+        else:
+            edge = Edge(self, destination, bandwidth, distance)
+            self.__topology.add_outside_edge(self.__index, edge)
+
+    def get_edges(self) -> list[Edge]:
+        return self.__topology.get_leaf_edges(self.__index)
+
+    def get_index(self) -> int:
+        return self.__index
+
+
+class CompactTopology(Topology):
+    """
+    Topology of leaves stored as an id table with adjacency arrays in compressed sparse row form, which takes a fraction of the memory of Leaf and Edge objects. Edges that are added to its leaves afterwards, for example when it is connected to another node, are buffered and merged into the arrays when they are next read, except for edges to leaves outside of it, which are kept as Edge objects. Nodes cannot be added to it
+    """
+
+    __ids: list[str]
+    __types: npt.NDArray[np.uint8]
+    __offsets: IndexArray
+    __destinations: npt.NDArray[np.int32]
+    __bandwidths: npt.NDArray[np.int64]
+    __distances: npt.NDArray[np.float64] | None
+    __indices_by_id: dict[str, int] | None
+    __added: list[tuple[int, int, int, float | None]]  # Edges not merged yet
+    __outside_edges: dict[int, list[Edge]]  # Edges to leaves outside, by source
+
+    def __init__(
+        self,
+        topology_id: str,
+        ids: list[str],
+        types: npt.NDArray[np.uint8],
+        offsets: IndexArray,
+        destinations: npt.NDArray[np.int32],
+        bandwidths: npt.NDArray[np.int64],
+        distances: npt.NDArray[np.float64] | None = None,
+    ) -> None:
+        super().__init__(topology_id)
+        self.__ids = ids
+        self.__types = types
+        self.__indices_by_id = None
+        self.__added = []
+        self.__outside_edges = {}
+
+        types.setflags(write=False)
+        self.__set_edges(offsets, destinations, bandwidths, distances)
+
+    def __set_edges(
+        self,
+        offsets: IndexArray,
+        destinations: npt.NDArray[np.int32],
+        bandwidths: npt.NDArray[np.int64],
+        distances: npt.NDArray[np.float64] | None,
+    ) -> None:
+        self.__offsets = offsets
+        self.__destinations = destinations
+        self.__bandwidths = bandwidths
+        self.__distances = distances
+
+        offsets.setflags(write=False)
+        destinations.setflags(write=False)
+        bandwidths.setflags(write=False)
+        if distances is not None:
+            distances.setflags(write=False)
+
+    def __merge_added(self) -> None:
+        # The arrays are rebuilt once for all edges added since they were last read,
+        # rather than once for every added edge
+        if len(self.__added) == 0:
+            return
+
+        sources, destinations, bandwidths, added_distances = zip(*self.__added)
+        self.__added = []
+        distances = None
+        if self.__distances is not None or any(
+            distance is not None for distance in added_distances
+        ):
+            distances = np.concatenate(
+                [
+                    (
+                        np.full(len(self.__destinations), np.nan)
+                        if self.__distances is None
+                        else self.__distances
+                    ),
+                    np.array(added_distances, dtype=np.float64),
+                ]
+            )
+        self.__set_edges(
+            *to_csr(
+                len(self.__ids),
+                np.concatenate(
+                    [
+                        np.repeat(
+                            np.arange(len(self.__ids), dtype=np.int64),
+                            np.diff(self.__offsets),
+                        ),
+                        np.array(sources, dtype=np.int64),
+                    ]
+                ),
+                np.concatenate([self.__destinations, np.array(destinations)]),
+                np.concatenate([self.__bandwidths, np.array(bandwidths)]),
+                distances,
+            )
+        )
+
+    @staticmethod
+    def from_edges(
+        topology_id: str,
+        ids: list[str],
+        types: npt.NDArray[np.uint8],
+        sources: IndexArray,
+        destinations: IndexArray,
+        bandwidths: npt.NDArray[np.int64],
+        distances: npt.NDArray[np.float64] | None = None,
+    ) -> CompactTopology:
+        """
+        Build a compact topology from arrays of directed edges between leaf indices. The edges of every leaf are ordered by destination
+        """
+        return CompactTopology(
+            topology_id,
+            ids,
+            types,
+            *to_csr(len(ids), sources, destinations, bandwidths, distances),
+        )
+
+    @staticmethod
+    def from_links(
+        topology_id: str,
+        ids: list[str],
+        types: npt.NDArray[np.uint8],
+        a: IndexArray,
+        b: IndexArray,
+        bandwidths: npt.NDArray[np.int64],
+        distances: npt.NDArray[np.float64] | None = None,
+    ) -> CompactTopology:
+        """
+        Build a compact topology from arrays of bidirectional links, which are stored as an edge in each direction
+        """
+        return CompactTopology.from_edges(
+            topology_id,
+            ids,
+            types,
+            np.concatenate([a, b]),
+            np.concatenate([b, a]),
+            np.concatenate([bandwidths, bandwidths]),
+            None if distances is None else np.concatenate([distances, distances]),
+        )
+
+    def add_leaf_edge(
+        self,
+        source: int,
+        destination: int,
+        bandwidth: int,
+        distance: float | None = None,
+    ) -> None:
+        """
+        Add an edge between two leaves of this topology by their indices
+        """
+        self.__added.append((source, destination, bandwidth, distance))
+
+    def add_outside_edge(self, source: int, edge: Edge) -> None:
+        """
+        Add an edge from a leaf of this topology to a leaf outside of it
+        """
+        self.__outside_edges.setdefault(source, []).append(edge)
+
+    def add_node(self, node: Node) -> None:
+        fatal(f"Cannot add node {node.get_id()} to compact topology {self.get_id()}")
+
+    def get_nodes(self) -> list[Node]:
+        return [self.get_leaf(index) for index in range(len(self.__ids))]
+
+    def flatten(self) -> list[Leaf]:
+        return [self.get_leaf(index) for index in range(len(self.__ids))]
+
+    def get_leaf(self, index: int) -> CompactLeaf:
+        return CompactLeaf(self, index)
+
+    def get_leaf_by_id(self, leaf_id: str) -> Leaf | None:
+        if self.__indices_by_id is None:
+            self.__indices_by_id = {
+                leaf_id: index for index, leaf_id in enumerate(self.__ids)
+            }
+        index = self.__indices_by_id.get(leaf_id)
+        return None if index is None else self.get_leaf(index)
+
+    def get_leaf_id(self, index: int) -> str:
+        return self.__ids[index]
+
+    def get_leaf_type(self, index: int) -> LeafType:
+        return LEAF_TYPES[int(self.__types[index])]
+
+    def get_leaf_edges(self, index: int) -> list[Edge]:
+        self.__merge_added()
+        source = self.get_leaf(index)
+        start = int(self.__offsets[index])
+        end = int(self.__offsets[index + 1])
+        destinations: list[int] = self.__destinations[start:end].tolist()
+        bandwidths: list[int] = self.__bandwidths[start:end].tolist()
+        distances: list[float | None] = (
+            [None] * (end - start)
+            if self.__distances is None
+            else [
+                None if np.isnan(distance) else distance
+                for distance in self.__distances[start:end].tolist()
+            ]
+        )
+        return [
+            Edge(source, self.get_leaf(destination), bandwidth, distance)
+            for destination, bandwidth, distance in zip(
+                destinations,
+                bandwidths,
+                distances,
+            )
+        ] + self.__outside_edges.get(index, [])
+
+    def get_number_of_leaves(self) -> int:
+        return len(self.__ids)
+
+    def get_offsets(self) -> IndexArray:
+        """
+        Get the offsets of the edges of every leaf in the edge arrays, which leave out edges to leaves outside of this topology
+        """
+        self.__merge_added()
+        return self.__offsets
+
+    def get_sources(self) -> IndexArray:
+        offsets = self.get_offsets()
+        return np.repeat(np.arange(len(self.__ids), dtype=np.int64), np.diff(offsets))
+
+    def get_destinations(self) -> npt.NDArray[np.int32]:
+        self.__merge_added()
+        return self.__destinations
+
+    def get_bandwidths(self) -> npt.NDArray[np.int64]:
+        self.__merge_added()
+        return self.__bandwidths
+
+    def get_distances(self) -> npt.NDArray[np.float64] | None:
+        """
+        Get the distances of the edges, which are NaN for edges without a distance
+        """
+        self.__merge_added()
+        return self.__distances
+
+
+def to_csr(
+    number_of_leaves: int,
+    sources: IndexArray,
+    destinations: IndexArray | npt.NDArray[np.int32],
+    bandwidths: npt.NDArray[np.int64],
+    distances: npt.NDArray[np.float64] | None = None,
+) -> tuple[
+    IndexArray,
+    npt.NDArray[np.int32],
+    npt.NDArray[np.int64],
+    npt.NDArray[np.float64] | None,
+]:
+    """
+    Turn arrays of directed edges between leaf indices into offsets and edge arrays in compressed sparse row form. The edges of every leaf are ordered by destination
+    """
+    order = np.lexsort((destinations, sources))
+    offsets = np.zeros(number_of_leaves + 1, dtype=np.int64)
+    np.cumsum(np.bincount(sources, minlength=number_of_leaves), out=offsets[1:])
+    return (
+        offsets,
+        destinations[order].astype(np.int32),
+        bandwidths[order].astype(np.int64),
+        None if distances is None else distances[order].astype(np.float64),
+    )
@@ -17,12 +17,24 @@ class Edge(Model):
     __source: Leaf
     __destination: Leaf
     __bandwidth: int
-
-    def __init__(self, source: Leaf, destination: Leaf, bandwidth: int) -> None:
-        super().__init__(f"{source.get_id()}_{destination.get_id()}_{bandwidth}")
+    __distance: float | None  # In meters, if the topology has a physical layout
+
+    def __init__(
+        self,
+        source: Leaf,
+        destination: Leaf,
+        bandwidth: int,
+        distance: float | None = None,
+    ) -> None:
+        # The id is derived on demand instead of passed to Model, as topologies can
+        # hold millions of edges whose ids are never asked for
         self.__source = source
         self.__destination = destination
         self.__bandwidth = bandwidth
+        self.__distance = distance
+
+    def get_id(self) -> str:
+        return f"{self.__source.get_id()}_{self.__destination.get_id()}_{self.__bandwidth}"
 
     def get_source(self) -> Leaf:
         return self.__source
@@ -32,3 +44,6 @@ class Edge(Model):
 
     def get_bandwidth(self) -> int:
         return self.__bandwidth
+
+    def get_distance(self) -> float | None:
+        return self.__distance
@@ -36,11 +36,17 @@ class Leaf(Node):
     def flatten(self) -> list[Leaf]:
         return [self]
 
-    def add_edge(self, destination: Leaf, bandwidth: int) -> None:
+    def add_edge(
+        self,
+        destination: Leaf,
+        bandwidth: int,
+        distance: float | None = None,
+    ) -> None:
         edge = Edge(
             source=self,
             destination=destination,
             bandwidth=bandwidth,
+            distance=distance,
         )
         self.__edges.append(edge)
 
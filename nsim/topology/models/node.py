@@ -1,17 +1,33 @@
 from __future__ import annotations
 
-import random
 from abc import abstractmethod
 from typing import TYPE_CHECKING
 
 from ...util import Connectivity
 from ...model import Model
+from ..sampling import sample_bipartite_links
 
 
 if TYPE_CHECKING:
     from .leaf import Leaf
 
 
+"""
+Common link speeds in bits per second that edges are given when no bandwidth is specified
+"""
+BANDWIDTHS = [
+    10000000,  # 10BASE-T, 10 Mbps, rarely used in modern settings
+    100000000,  # 100BASE-TX, 100 Mbps, in use for some home networks
+    1000000000,  # 1000BASE-T, 1 Gbps, common in modern home networks
+    10000000000,  # 10GBASE-T, 10 Gbps, used in enterprise networks and data centers
+    25000000000,  # 25GBASE-T, 25 Gbps, increasingly adopted in data centers
+    40000000000,  # 40GBASE-T, 40 Gbps, used in high-speed backbones of data center networks
+    100000000000,  # 100GBASE-T, 100 Gbps, used in large data centers and internet backbones
+    200000000000,  # 200GBASE-T, 200 Gbps, used in cloud / high-performance computing data centers
+    400000000000,  # 400GBASE-T, 400 Gbps
+]
+
+
 class Node(Model):
     """
     Represents anything that can be (sub-)connected to anything
@@ -27,23 +43,18 @@ class Node(Model):
         connectivity: Connectivity,
         bandwidth: int | None = None,
     ) -> None:
-        if bandwidth == None:
-            bandwidths = [
-                10000000,  # 10BASE-T, 10 Mbps, rarely used in modern settings
-                100000000,  # 100BASE-TX, 100 Mbps, in use for some home networks
-                1000000000,  # 1000BASE-T, 1 Gbps, common in modern home networks
-                10000000000,  # 10GBASE-T, 10 Gbps, used in enterprise networks and data centers
-                25000000000,  # 25GBASE-T, 25 Gbps, increasingly adopted in data centers
-                40000000000,  # 40GBASE-T, 40 Gbps, used in high-speed backbones of data center networks
-                100000000000,  # 100GBASE-T, 100 Gbps, used in large data centers and internet backbones
-                200000000000,  # 200GBASE-T, 200 Gbps, used in cloud / high-performance computing data centers
-                400000000000,  # 400GBASE-T, 400 Gbps
-            ]
-            bandwidth = random.choice(bandwidths)
-
-        for a in self.flatten():
-            for b in node_b.flatten():
-                if connectivity > random.random():
-                    bandwidth = random.choice(bandwidths)
-                    a.add_edge(b, bandwidth)
-                    b.add_edge(a, bandwidth)
+        """
+        Connect every leaf of this node to every leaf of `node_b` with probability `connectivity`, in both directions
+        """
+        leaves_a = self.flatten()
+        leaves_b = node_b.flatten()
+        links = sample_bipartite_links(
+            len(leaves_a),
+            len(leaves_b),
+            connectivity,
+            BANDWIDTHS,
+            bandwidth,
+        )
+        for i, j, edge_bandwidth in links:
+            leaves_a[i].add_edge(leaves_b[j], edge_bandwidth)
+            leaves_b[j].add_edge(leaves_a[i], edge_bandwidth)
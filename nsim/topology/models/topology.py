@@ -1,3 +1,5 @@
+from __future__ import annotations
+
 from .leaf import Leaf
 from .node import Node
 
@@ -7,16 +9,57 @@ class Topology(Node):
     Data structure that holds nested structures of Leaf nodes
     """
 
-    __nodes: list[Node] = []
+    __nodes: list[Node]
+    __parents: list[Topology]
+    __leaves: list[Leaf] | None  # Cached result of flatten, None when invalidated
+    __leaves_by_id: dict[str, Leaf] | None
+
+    def __init__(self, topology_id: str) -> None:
+        super().__init__(topology_id)
+        self.__nodes = []
+        self.__parents = []
+        self.__leaves = None
+        self.__leaves_by_id = None
+
+    def __invalidate(self) -> None:
+        # A topology without a cache has no ancestors with a cache either, as
+        # flattening an ancestor always flattens its descendants
+        if self.__leaves is None:
+            return
+
+        self.__leaves = None
+        self.__leaves_by_id = None
+        for parent in self.__parents:
+            parent.__invalidate()
 
     def add_node(self, node: Node) -> None:
         self.__nodes.append(node)
+        if isinstance(node, Topology):
+            node.__parents.append(self)
+
+        # New leaves are appended to the end of the cached index of this topology,
+        # but end up somewhere in the middle of the index of its ancestors
+        if self.__leaves is not None:
+            leaves = node.flatten()
+            self.__leaves.extend(leaves)
+            if self.__leaves_by_id is not None:
+                for leaf in leaves:
+                    self.__leaves_by_id[leaf.get_id()] = leaf
+        for parent in self.__parents:
+            parent.__invalidate()
 
     def get_nodes(self) -> list[Node]:
         return self.__nodes.copy()
 
     def flatten(self) -> list[Leaf]:
-        leaf_nodes: list[Leaf] = []
-        for node in self.__nodes:
-            leaf_nodes.extend(node.flatten())
-        return leaf_nodes
+        if self.__leaves is None:
+            self.__leaves = [leaf for node in self.__nodes for leaf in node.flatten()]
+        return self.__leaves.copy()
+
+    def get_leaf_by_id(self, leaf_id: str) -> Leaf | None:
+        """
+        Find a leaf anywhere in this topology by its id in constant time
+        """
+        if self.__leaves_by_id is None:
+            self.__leaves_by_id = {leaf.get_id(): leaf for leaf in self.flatten()}
+        return self.__leaves_by_id.get(leaf_id)
@@ -15,11 +15,16 @@ class ConsoleTopologyOutput(ConsoleOutput[Node]):
             else f"{(e_bps / 10**9):.0f} Gbps"
         )
 
+        e_distance = edge.get_distance()
+        e_details = (
+            e_bandwidth if e_distance is None else f"{e_bandwidth}, {e_distance:.0f} m"
+        )
+
         e_dest = edge.get_destination()
         e_dest_id = e_dest.get_id()
         e_dest_type = e_dest.get_type().value
 
-        self._print(e_dest_type, e_dest_id, f"({e_bandwidth})", depth)
+        self._print(e_dest_type, e_dest_id, f"({e_details})", depth)
 
     def __print_leaf(self, leaf: Leaf, depth: int = 0) -> None:
         l_type = leaf.get_type().value
@@ -52,7 +52,11 @@ class InetTopologyOutput(OmnestOutput):
                     }
                     bandwidth = edge.get_bandwidth()
                     sorted_bandwidths = sorted(bandwidths.items(), key=lambda x: abs(x[0] - bandwidth))
-                    self._print(f"{source}.ethg++ <--> {sorted_bandwidths[0][1]} <--> {destination}.ethg++;", 2)
+                    channel = sorted_bandwidths[0][1]
+                    distance = edge.get_distance()
+                    if distance is not None:
+                        channel = f"{channel} {{ length = {distance:.0f}m; }}"
+                    self._print(f"{source}.ethg++ <--> {channel} <--> {destination}.ethg++;", 2)
 
     def _print_ini_leaves(self, leaves: list[Leaf]) -> None:
         for leaf in leaves:
@@ -15,6 +15,8 @@ class JsonTopologyOutput(JsonOutput[Node]):
         data["source"] = edge.get_source().get_id()
         data["destination"] = edge.get_destination().get_id()
         data["bandwidth"] = edge.get_bandwidth()
+        if edge.get_distance() is not None:
+            data["distance"] = edge.get_distance()
         return data
 
     def __make_leaf_data(self, leaf: Leaf) -> Json:
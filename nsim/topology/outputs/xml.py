@@ -15,6 +15,8 @@ class XmlTopologyOutput(XmlOutput[Node]):
             "destination": edge.get_destination().get_id(),
             "bandwidth": str(edge.get_bandwidth()),
         }
+        if edge.get_distance() is not None:
+            attributes["distance"] = str(edge.get_distance())
         edge_type = edge.__class__.__name__.lower()
         return self._make_element(edge_type, edge.get_id(), attributes)
 
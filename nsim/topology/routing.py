@@ -0,0 +1,253 @@
+import os
+import hashlib
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import numpy.typing as npt
+
+from ..util import fatal
+from ..config import RoutingMetric
+from ..logger import logger
+from .sampling import IndexArray, FloatArray
+
+
+"""
+Array of positions of edges among the edges of their source, in the smallest unsigned integer type that fits
+"""
+PortArray = npt.NDArray[np.unsignedinteger[npt.NBitBase]]
+
+"""
+Bandwidth in bits per second of an edge that costs 1 under the bandwidth metric, as in OSPF. Faster edges are cheaper
+"""
+REFERENCE_BANDWIDTH = 100000000000
+
+"""
+Directory in which routing tables are cached between runs, keyed by the content of their topology
+"""
+CACHE_DIRECTORY = (
+    Path(os.environ.get("XDG_CACHE_HOME", Path.home() / ".cache")) / "nsim" / "routing"
+)
+
+"""
+Version of the format of cached routing tables, which is part of their key so that a change of format never loads stale tables
+"""
+CACHE_VERSION = 1
+
+"""
+The maximum number of (destination, leaf) or (destination, edge) states held at once while computing routes for a batch of destinations, which bounds the memory used per worker
+"""
+MAX_BATCH_STATES = 2**22
+
+
+def __get_costs(
+    bandwidths: npt.NDArray[np.int64],
+    metric: RoutingMetric,
+) -> FloatArray:
+    if metric == RoutingMetric.HOPS:
+        return np.ones(len(bandwidths), dtype=np.float64)
+    return REFERENCE_BANDWIDTH / np.maximum(bandwidths, 1).astype(np.float64)
+
+
+def __get_port_type(offsets: IndexArray) -> str:
+    max_degree = int(np.diff(offsets).max(initial=0))
+    for port_type in ("uint8", "uint16", "uint32"):
+        if max_degree < np.iinfo(port_type).max:
+            return port_type
+    return "uint64"
+
+
+def __route_batch(
+    batch: tuple[IndexArray, IndexArray, IndexArray, FloatArray, str],
+) -> PortArray:
+    targets, offsets, heads, costs, port_type = batch
+    number_of_leaves = len(offsets) - 1
+    number_of_edges = len(heads)
+    tails = np.repeat(np.arange(number_of_leaves, dtype=np.int64), np.diff(offsets))
+    reverse = np.argsort(heads, kind="stable")
+    reverse_offsets = np.zeros(number_of_leaves + 1, dtype=np.int64)
+    np.cumsum(np.bincount(heads, minlength=number_of_leaves), out=reverse_offsets[1:])
+
+    # Distances towards every target, which are relaxed along the incoming edges of
+    # the leaves whose distance improved in the previous round. With unit costs,
+    # this is a breadth-first search from all targets at once
+    rows = np.arange(len(targets), dtype=np.int64)
+    distances = np.full(len(targets) * number_of_leaves, np.inf)
+    frontier = rows * number_of_leaves + targets
+    distances[frontier] = 0
+    while len(frontier) > 0:
+        frontier_rows, frontier_leaves = np.divmod(frontier, number_of_leaves)
+        starts = reverse_offsets[frontier_leaves]
+        counts = reverse_offsets[frontier_leaves + 1] - starts
+        first = np.cumsum(counts) - counts
+        positions = np.repeat(starts - first, counts)
+        edges = reverse[positions + np.arange(int(counts.sum()), dtype=np.int64)]
+
+        states = np.repeat(frontier_rows, counts) * number_of_leaves + tails[edges]
+        candidates = np.repeat(distances[frontier], counts) + costs[edges]
+        better = candidates < distances[states]
+        np.minimum.at(distances, states[better], candidates[better])
+        frontier = np.unique(states[better])
+
+    # The next hop towards a target is the first edge that lies on a shortest path,
+    # i.e. whose cost plus the distance of its head is exactly the distance of its
+    # tail, as that is how the distance was computed
+    no_port = np.iinfo(port_type).max
+    ports = np.full(len(targets) * number_of_leaves, no_port, dtype=port_type)
+    edge_rows = np.repeat(rows, number_of_edges)
+    edges = np.tile(np.arange(number_of_edges, dtype=np.int64), len(targets))
+    tail_states = edge_rows * number_of_leaves + tails[edges]
+    tail_distances = distances[tail_states]
+    head_distances = distances[edge_rows * number_of_leaves + heads[edges]]
+    on_path = (head_distances + costs[edges] == tail_distances) & (
+        np.isfinite(tail_distances) & (tails[edges] != targets[edge_rows])
+    )
+
+    # Edges are ordered by tail state, so the first edge of every tail state is the
+    # one that follows a change of tail state
+    path_states = tail_states[on_path]
+    path_ports = (edges - offsets[tails[edges]])[on_path]
+    first = np.ones(len(path_states), dtype=bool)
+    first[1:] = path_states[1:] != path_states[:-1]
+    ports[path_states[first]] = path_ports[first]
+
+    return ports.reshape(len(targets), number_of_leaves)
+
+
+def __get_cache_path(
+    ids: list[str],
+    offsets: IndexArray,
+    heads: IndexArray,
+    costs: FloatArray,
+) -> Path:
+    key = hashlib.sha256(str(CACHE_VERSION).encode())
+    key.update("\0".join(ids).encode())
+    for array in (offsets, heads, costs):
+        key.update(np.ascontiguousarray(array).tobytes())
+    return CACHE_DIRECTORY / f"{key.hexdigest()}.npy"
+
+
+class RoutingTable:
+    """
+    Next hops along shortest paths between all pairs of leaves. For every destination and leaf, the table holds the position of the next hop among the edges of the leaf, in the smallest integer type that fits every degree
+    """
+
+    __offsets: IndexArray
+    __heads: IndexArray
+    __ports: PortArray
+
+    def __init__(
+        self,
+        offsets: IndexArray,
+        heads: IndexArray,
+        ports: PortArray,
+    ) -> None:
+        self.__offsets = offsets
+        self.__heads = heads
+        self.__ports = ports
+
+    def __getstate__(self) -> dict[str, object]:
+        # Tables that were loaded from the cache are memory-mapped, and handed to
+        # worker processes by their path rather than by their content
+        state = dict(self.__dict__)
+        ports: object = self.__ports
+        if isinstance(ports, np.memmap) and ports.filename is not None:
+            state["_RoutingTable__ports"] = Path(ports.filename)
+        return state
+
+    def __setstate__(self, state: dict[str, object]) -> None:
+        ports = state["_RoutingTable__ports"]
+        if isinstance(ports, Path):
+            state["_RoutingTable__ports"] = np.load(ports, mmap_mode="r")
+        self.__dict__.update(state)
+
+    def get_next_hop(self, source: int, destination: int) -> int | None:
+        port = int(self.__ports[destination, source])
+        if port == np.iinfo(self.__ports.dtype).max:
+            return None
+        return int(self.__heads[self.__offsets[source] + port])
+
+    def get_paths(
+        self,
+        sources: IndexArray,
+        destinations: IndexArray,
+    ) -> tuple[IndexArray, IndexArray]:
+        """
+        Follow the next hops of every route from its source to its destination at once. Returns the leaves on all paths in order, including their sources and destinations, and the offset of every path in those leaves
+        """
+        no_port = np.iinfo(self.__ports.dtype).max
+        routes = np.arange(len(sources), dtype=np.int64)
+        step_routes = [routes]
+        step_leaves = [sources]
+
+        active = routes[sources != destinations]
+        current = sources[active]
+        while len(active) > 0:
+            ports = np.asarray(self.__ports[destinations[active], current])
+            if (ports == no_port).any():
+                fatal(f"Cannot route between leaves that do not reach each other")
+            current = self.__heads[self.__offsets[current] + ports.astype(np.int64)]
+            step_routes.append(active)
+            step_leaves.append(current)
+
+            arrived = current == destinations[active]
+            active = active[~arrived]
+            current = current[~arrived]
+
+        # Steps are recorded in order, so sorting stably by route keeps paths in order
+        all_routes = np.concatenate(step_routes)
+        order = np.argsort(all_routes, kind="stable")
+        offsets = np.zeros(len(sources) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(all_routes, minlength=len(sources)), out=offsets[1:])
+        return offsets, np.concatenate(step_leaves)[order]
+
+
+def compute_routing_table(
+    ids: list[str],
+    sources: IndexArray,
+    destinations: IndexArray,
+    bandwidths: npt.NDArray[np.int64],
+    metric: RoutingMetric,
+    workers: int = 1,
+) -> RoutingTable:
+    """
+    Compute the routing table of the leaves `ids` and their edges ordered by source, or load it from the cache if the same topology was routed before. Destinations are split into batches that are spread over `workers` processes
+    """
+    offsets = np.zeros(len(ids) + 1, dtype=np.int64)
+    np.cumsum(np.bincount(sources, minlength=len(ids)), out=offsets[1:])
+    costs = __get_costs(bandwidths, metric)
+
+    cache_path = __get_cache_path(ids, offsets, destinations, costs)
+    if cache_path.exists():
+        logger.debug(f"Loading routing table from {cache_path}")
+        ports = np.load(cache_path, mmap_mode="r")
+        return RoutingTable(offsets, destinations, ports)
+
+    port_type = __get_port_type(offsets)
+    batch_size = max(MAX_BATCH_STATES // max(len(ids), len(destinations), 1), 1)
+    targets = np.arange(len(ids), dtype=np.int64)
+    batches = [
+        (targets[start : start + batch_size], offsets, destinations, costs, port_type)
+        for start in range(0, len(ids), batch_size)
+    ]
+
+    if workers > 1 and len(batches) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            tables = list(executor.map(__route_batch, batches))
+    else:
+        tables = [__route_batch(batch) for batch in batches]
+    ports = (
+        np.concatenate(tables) if len(tables) > 0 else np.empty((0, 0), dtype=port_type)
+    )
+
+    try:
+        CACHE_DIRECTORY.mkdir(parents=True, exist_ok=True)
+        temporary_path = cache_path.with_suffix(f".{os.getpid()}.tmp")
+        with open(temporary_path, "wb") as file:
+            np.save(file, ports)
+        os.replace(temporary_path, cache_path)
+        logger.debug(f"Saved routing table to {cache_path}")
+    except OSError as e:
+        logger.warn(f"Routing table could not be cached: {e}")
+
+    return RoutingTable(offsets, destinations, ports)
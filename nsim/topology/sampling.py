@@ -0,0 +1,314 @@
+import json
+from typing import cast
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import numpy.typing as npt
+
+from ..util import Connectivity
+from ..seed import Stream, spawn_seed
+from ..config import get_config
+
+
+"""
+Array of indices into the pairs of nodes of a topology, or into its nodes
+"""
+IndexArray = npt.NDArray[np.int64]
+
+"""
+Array of coordinates or distances
+"""
+FloatArray = npt.NDArray[np.float64]
+
+"""
+The number of blocks that candidate pairs are split into, each sampled with its own random stream, unless that makes blocks smaller than MIN_BLOCK_SIZE. Blocks depend on the number of pairs only, so the same seed results in the same edges no matter how many workers are used
+"""
+NUMBER_OF_BLOCKS = 2**10
+
+"""
+The smallest number of candidate pairs in a block, so that small samples are not split into blocks that take longer to seed than to sample
+"""
+MIN_BLOCK_SIZE = 2**16
+
+"""
+The maximum number of skips drawn at once, which bounds the memory used while sampling
+"""
+MAX_CHUNK_SIZE = 2**20
+
+"""
+Offsets of the neighbouring grid cells in which pairs of nearby points are searched. Only half of the neighbourhood is needed, as every pair of cells is then visited once
+"""
+GRID_NEIGHBOURS = [(0, 0), (0, 1), (1, -1), (1, 0), (1, 1)]
+
+
+def empty_indices() -> IndexArray:
+    """
+    Make an empty array of indices
+    """
+    return np.empty(0, dtype=np.int64)
+
+
+def to_index_list(
+    indices: IndexArray | npt.NDArray[np.int32] | npt.NDArray[np.uint16],
+) -> list[int]:
+    """
+    Convert an array of indices, or of other integers, to a list, for use by modules that do not handle NumPy arrays themselves
+    """
+    return cast(list[int], indices.tolist())
+
+
+def to_float_list(values: FloatArray) -> list[float]:
+    """
+    Convert an array of floats to a list, for use by modules that do not handle NumPy arrays themselves
+    """
+    return cast(list[float], values.tolist())
+
+
+def to_index_array(indices: list[int]) -> IndexArray:
+    """
+    Convert a list of indices to an array, for use by modules that do not handle NumPy arrays themselves
+    """
+    return np.array(indices, dtype=np.int64)
+
+
+def to_float_array(values: list[float]) -> FloatArray:
+    """
+    Convert a list of floats to an array, for use by modules that do not handle NumPy arrays themselves
+    """
+    return np.array(values, dtype=np.float64)
+
+
+def take_indices(indices: IndexArray, positions: IndexArray) -> IndexArray:
+    """
+    Take the indices, or other integers, at `positions` out of an array of them
+    """
+    return indices[positions]
+
+
+def sample_bandwidths(
+    number_of_links: int,
+    seed: np.random.SeedSequence,
+    bandwidths: list[int],
+) -> IndexArray:
+    """
+    Draw a bandwidth from `bandwidths` for each of `number_of_links` links
+    """
+    return np.random.default_rng(seed).choice(bandwidths, number_of_links)
+
+
+def __sample_block(
+    block: tuple[int, int, Connectivity, np.random.SeedSequence],
+) -> IndexArray:
+    start, end, connectivity, seed = block
+    rng = np.random.default_rng(seed)
+
+    expected = (end - start) * connectivity
+    chunk_size = min(int(expected + 4 * np.sqrt(expected)) + 16, MAX_CHUNK_SIZE)
+
+    chunks: list[IndexArray] = []
+    position = start - 1
+    while position < end:
+        positions = position + np.cumsum(rng.geometric(connectivity, size=chunk_size))
+        chunks.append(positions[positions < end])
+        position = int(positions[-1])
+
+    return np.concatenate(chunks)
+
+
+def sample_blocks(
+    blocks: list[tuple[int, int, Connectivity, np.random.SeedSequence]],
+) -> IndexArray:
+    """
+    Sample the connected pairs of consecutive blocks, which is the share of the pairs that is handed to one worker
+    """
+    return np.concatenate([__sample_block(block) for block in blocks])
+
+
+def sample_pair_indices(
+    number_of_pairs: int,
+    connectivity: Connectivity,
+    seed: np.random.SeedSequence,
+    workers: int = 1,
+) -> IndexArray:
+    """
+    Sample which of `number_of_pairs` candidate pairs are connected, each with probability `connectivity`. Instead of drawing a number for every pair, the gaps between connected pairs are drawn from a geometric distribution, so the cost grows with the number of edges rather than the number of pairs. The pairs are split into blocks that are each sampled with their own random stream, and every one of `workers` processes samples an equal share of consecutive blocks
+    """
+    if number_of_pairs <= 0 or connectivity <= 0:
+        return np.empty(0, dtype=np.int64)
+    if connectivity >= 1:
+        return np.arange(number_of_pairs, dtype=np.int64)
+
+    block_size = max(-(-number_of_pairs // NUMBER_OF_BLOCKS), MIN_BLOCK_SIZE)
+    starts = range(0, number_of_pairs, block_size)
+    blocks = [
+        (start, min(start + block_size, number_of_pairs), connectivity, block_seed)
+        for start, block_seed in zip(starts, seed.spawn(len(starts)))
+    ]
+
+    workers = min(workers, len(blocks))
+    if workers <= 1:
+        return sample_blocks(blocks)
+
+    shares = [
+        blocks[len(blocks) * worker // workers : len(blocks) * (worker + 1) // workers]
+        for worker in range(workers)
+    ]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return np.concatenate(list(executor.map(sample_blocks, shares)))
+
+
+def sample_coupled_pair_indices(
+    number_of_pairs: int,
+    connectivities: list[Connectivity],
+    seed: np.random.SeedSequence,
+    mark_seed: np.random.SeedSequence,
+    workers: int = 1,
+) -> tuple[IndexArray, list[IndexArray]]:
+    """
+    Sample which of `number_of_pairs` candidate pairs are connected at each of `connectivities` at once, such that a pair that is connected at a connectivity is also connected at every higher connectivity. Conceptually, every pair gets one uniform mark and is connected at the connectivities above it. Only the pairs connected at the highest connectivity are sampled, the same as by `sample_pair_indices`, and their marks are uniform below that connectivity. Sorting these marks once makes the pairs of every connectivity a prefix. Returns the pairs connected at the highest connectivity, and for every connectivity the positions of its pairs among them, in order
+    """
+    peak = max(connectivities, default=0)
+    indices = sample_pair_indices(number_of_pairs, peak, seed, workers)
+    marks = np.random.default_rng(mark_seed).random(len(indices)) * peak
+    order = np.argsort(marks, kind="stable")
+    sorted_marks = marks[order]
+    return indices, [
+        (
+            np.sort(order[: np.searchsorted(sorted_marks, connectivity)])
+            if connectivity < peak
+            else np.arange(len(indices), dtype=np.int64)
+        )
+        for connectivity in connectivities
+    ]
+
+
+def to_connectivities(text: str) -> list[Connectivity]:
+    """
+    Parse a list of connectivities, which is a JSON list of floats
+    """
+    data = json.loads(text)
+    if not isinstance(data, list):
+        raise ValueError(f"{text} is not a JSON list")
+    try:
+        return [float(connectivity) for connectivity in data]
+    except TypeError as e:
+        raise ValueError(e)
+
+
+def sample_bipartite_links(
+    number_of_nodes_a: int,
+    number_of_nodes_b: int,
+    connectivity: Connectivity,
+    bandwidths: list[int],
+    bandwidth: int | None = None,
+) -> list[tuple[int, int, int]]:
+    """
+    Sample which pairs (a, b) between two groups of nodes are linked, each with probability `connectivity`, and give every link a bandwidth drawn from `bandwidths`, unless one `bandwidth` is given for all. Returns the links as (a, b, bandwidth), ordered by a and then by b
+    """
+    pair_seed, bandwidth_seed = spawn_seed(Stream.EDGES).spawn(2)
+    indices = sample_pair_indices(
+        number_of_nodes_a * number_of_nodes_b,
+        connectivity,
+        pair_seed,
+        get_config().generation.workers,
+    )
+    a, b = to_bipartite_pairs(indices, number_of_nodes_b)
+    link_bandwidths = (
+        sample_bandwidths(len(a), bandwidth_seed, bandwidths)
+        if bandwidth is None
+        else np.full(len(a), bandwidth)
+    )
+    return list(zip(a.tolist(), b.tolist(), link_bandwidths.tolist()))
+
+
+def to_mesh_pairs(indices: IndexArray) -> tuple[IndexArray, IndexArray]:
+    """
+    Map pair indices onto the lower triangle of an adjacency matrix, i.e. onto the pairs (a, b) with b < a, ordered by a and then by b
+    """
+    a = ((1 + np.sqrt(1 + 8 * indices.astype(np.float64))) // 2).astype(np.int64)
+
+    # Correct for rounding errors in the square root for very large indices
+    a -= a * (a - 1) // 2 > indices
+    a += (a + 1) * a // 2 <= indices
+
+    b = indices - a * (a - 1) // 2
+    return a, b
+
+
+def to_bipartite_pairs(
+    indices: IndexArray,
+    number_of_nodes_b: int,
+) -> tuple[IndexArray, IndexArray]:
+    """
+    Map pair indices onto the pairs (a, b) between two groups of nodes, ordered by a and then by b
+    """
+    return indices // number_of_nodes_b, indices % number_of_nodes_b
+
+
+def find_nearby_pairs(
+    x: FloatArray,
+    y: FloatArray,
+    radius: float,
+) -> tuple[IndexArray, IndexArray, FloatArray]:
+    """
+    Find all pairs of points (a, b) with b < a that lie within `radius` of each other, and the distances between them. Points are put into a grid of cells that are at least `radius` wide, so that only points in neighbouring cells have to be compared, which takes near-linear time for sparse layouts
+    """
+    number_of_points = len(x)
+    if number_of_points == 0:
+        return np.empty(0, np.int64), np.empty(0, np.int64), np.empty(0, np.float64)
+
+    # Cells grow for tiny radii, so there are never many more cells than points
+    extent = max(float(x.max()), float(y.max()), radius)
+    width = max(radius, extent / np.ceil(np.sqrt(number_of_points)))
+    cx = (x // width).astype(np.int64)
+    cy = (y // width).astype(np.int64)
+    columns = int(cx.max()) + 1
+    rows = int(cy.max()) + 1
+
+    order = np.argsort(cx * rows + cy, kind="stable")
+    cx = cx[order]
+    cy = cy[order]
+    counts = np.bincount(cx * rows + cy, minlength=columns * rows)
+    starts = np.cumsum(counts) - counts
+
+    a_chunks: list[IndexArray] = []
+    b_chunks: list[IndexArray] = []
+    distance_chunks: list[FloatArray] = []
+    for chunk_start in range(0, number_of_points, MAX_CHUNK_SIZE // 16):
+        p = np.arange(
+            chunk_start,
+            min(chunk_start + MAX_CHUNK_SIZE // 16, number_of_points),
+            dtype=np.int64,
+        )
+        for dx, dy in GRID_NEIGHBOURS:
+            ncx = cx[p] + dx
+            ncy = cy[p] + dy
+            valid = (ncx >= 0) & (ncx < columns) & (ncy >= 0) & (ncy < rows)
+            cells = np.where(valid, ncx * rows + ncy, 0)
+            candidate_starts = np.where(valid, starts[cells], 0)
+            candidate_counts = np.where(valid, counts[cells], 0)
+
+            # Within the same cell, only points that come later are candidates
+            if (dx, dy) == (0, 0):
+                candidate_counts = candidate_starts + candidate_counts - p - 1
+                candidate_starts = p + 1
+
+            total = int(candidate_counts.sum())
+            first = np.cumsum(candidate_counts) - candidate_counts
+            sources = np.repeat(p, candidate_counts)
+            candidates = np.repeat(candidate_starts - first, candidate_counts)
+            candidates += np.arange(total, dtype=np.int64)
+
+            a = order[sources]
+            b = order[candidates]
+            distances = np.hypot(x[a] - x[b], y[a] - y[b])
+            nearby = distances <= radius
+            a_chunks.append(np.maximum(a, b)[nearby])
+            b_chunks.append(np.minimum(a, b)[nearby])
+            distance_chunks.append(distances[nearby])
+
+    return (
+        np.concatenate(a_chunks),
+        np.concatenate(b_chunks),
+        np.concatenate(distance_chunks),
+    )
@@ -0,0 +1,44 @@
+import numpy as np
+
+from .sampling import IndexArray, to_mesh_pairs
+from .models.leaf import LeafType
+from .models.compact import LEAF_TYPES, CompactTopology
+
+
+def make_mesh(
+    topology_id: str,
+    name: str,
+    number_of_nodes: int,
+    indices: IndexArray,
+    bandwidths: IndexArray,
+) -> CompactTopology:
+    """
+    Make a mesh of `number_of_nodes` hosts, in which the pairs with `indices` are connected with `bandwidths`. The mesh is built from the arrays of its edges at once, as a compact topology
+    """
+    a, b = to_mesh_pairs(indices)
+    ids = [f"{name}_{i}" for i in range(number_of_nodes)]
+    types = np.full(number_of_nodes, LEAF_TYPES.index(LeafType.HOST), np.uint8)
+    return CompactTopology.from_links(topology_id, ids, types, a, b, bandwidths)
+
+
+def make_star(
+    topology_id: str,
+    name: str,
+    number_of_nodes: int,
+    indices: IndexArray,
+    bandwidths: IndexArray,
+) -> CompactTopology:
+    """
+    Make a star of `number_of_nodes` hosts around a switch, to which the hosts with `indices` are connected with `bandwidths`. The star is built from the arrays of its edges at once, as a compact topology whose first leaf is the switch
+    """
+    ids = [f"{name}_center", *(f"{name}_{i}" for i in range(number_of_nodes))]
+    types = np.full(number_of_nodes + 1, LEAF_TYPES.index(LeafType.HOST), np.uint8)
+    types[0] = LEAF_TYPES.index(LeafType.SWITCH)
+    return CompactTopology.from_links(
+        topology_id,
+        ids,
+        types,
+        np.zeros(len(indices), dtype=np.int64),
+        indices + 1,
+        bandwidths,
+    )
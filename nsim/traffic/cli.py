@@ -1,7 +1,17 @@
 import typer
 
 from .inputs import traffic_inputs
-from ..config import LoggingLevelOption, LoggingLevelDefault, get_config
+from ..config import (
+    SeedOption,
+    SeedDefault,
+    RoutingOption,
+    WorkersOption,
+    RoutingDefault,
+    WorkersDefault,
+    LoggingLevelOption,
+    LoggingLevelDefault,
+    get_config,
+)
 from ..logger import logger
 from .outputs import traffic_outputs
 from ..version import VersionOption, VersionDefault
@@ -11,10 +21,12 @@ from ..commands import (
     OutputTypeOption,
     InputFileArgument,
     OutputTypeDefault,
+    OutputDirectoryOption,
+    OutputDirectoryDefault,
     GeneratorConfigOption,
     GeneratorConfigDefault,
 )
-from .generators import traffic_generators
+from .generators import traffic_generators, traffic_sweep_generators
 
 
 traffic_app = typer.Typer()
@@ -48,6 +60,9 @@ def traffic_generate(
     generator: GeneratorOption,
     output_type: OutputTypeOption = OutputTypeDefault,
     generator_config: GeneratorConfigOption = GeneratorConfigDefault,
+    workers: WorkersOption = WorkersDefault,
+    seed: SeedOption = SeedDefault,
+    routing: RoutingOption = RoutingDefault,
     version: VersionOption = VersionDefault,
     logging_level: LoggingLevelOption = LoggingLevelDefault,
 ) -> None:
@@ -63,6 +78,31 @@ def traffic_generate(
     )
 
 
+@traffic_app.command("sweep")  # type: ignore [misc]
+def traffic_sweep(
+    generator: GeneratorOption,
+    output_type: OutputTypeOption = OutputTypeDefault,
+    output_directory: OutputDirectoryOption = OutputDirectoryDefault,
+    generator_config: GeneratorConfigOption = GeneratorConfigDefault,
+    workers: WorkersOption = WorkersDefault,
+    seed: SeedOption = SeedDefault,
+    routing: RoutingOption = RoutingDefault,
+    version: VersionOption = VersionDefault,
+    logging_level: LoggingLevelOption = LoggingLevelDefault,
+) -> None:
+    """
+    Generate random network traffic at a number of rates in one pass using a given sweep generator, and write each to its own file in a directory
+    """
+    Commands.sweep(
+        traffic_sweep_generators,
+        generator,
+        traffic_outputs,
+        output_type,
+        generator_config,
+        output_directory,
+    )
+
+
 @traffic_app.command("convert")  # type: ignore [misc]
 def traffic_convert(
     input_file: InputFileArgument,
@@ -1,13 +1,29 @@
 from nsim.generator import Generator
 
+from .flow import FlowTrafficGenerator
 from .train import TrainTrafficGenerator
-from .poisson import PoissonTrafficGenerator
+from .on_off import OnOffTrafficGenerator
+from .diurnal import DiurnalTrafficGenerator
+from .source import SourceTrafficGenerator
+from .matrix import MatrixTrafficGenerator
+from .gravity import GravityTrafficGenerator
+from .poisson import PoissonTrafficGenerator, PoissonSweepTrafficGenerator
 from .constant import ConstantTrafficGenerator
 from ..models.traffic import Traffic
 
 
 traffic_generators: dict[str, Generator[Traffic]] = {
     "constant": ConstantTrafficGenerator(),
+    "diurnal": DiurnalTrafficGenerator(),
+    "flow": FlowTrafficGenerator(),
+    "gravity": GravityTrafficGenerator(),
+    "matrix": MatrixTrafficGenerator(),
+    "on-off": OnOffTrafficGenerator(),
     "poisson": PoissonTrafficGenerator(),
+    "source": SourceTrafficGenerator(),
     "train": TrainTrafficGenerator(),
 }
+
+traffic_sweep_generators: dict[str, Generator[list[Traffic]]] = {
+    "poisson": PoissonSweepTrafficGenerator(),
+}
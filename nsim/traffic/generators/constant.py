@@ -1,8 +1,39 @@
+import math
+from functools import partial
+from collections.abc import Iterator
+
+import numpy as np
+
+from ...seed import Stream, spawn_seed
+from ...config import get_config
 from ...generator import Generator
+from ..windows import WINDOW_SIZE, iter_windows
+from ..sizes import SizeDistribution
+from ..sampling import iter_constant_times
+from ..models.block import ArrivalBlock
+from ..streams import make_random_block
 from ..models.traffic import Traffic
 from ..models.traversal import Traversal
 
 
+def make_constant_window(
+    rate: float,
+    duration: float,
+    size_distribution: SizeDistribution,
+    traversal: Traversal,
+    window: int,
+    seed: np.random.SeedSequence,
+) -> Iterator[ArrivalBlock]:
+    """
+    Make the `window`-th window of WINDOW_SIZE arrivals that occur every `rate` seconds
+    """
+    rng = np.random.default_rng(seed)
+    count = math.ceil(duration / rate)
+    end = min((window + 1) * WINDOW_SIZE, count) + 1
+    for times in iter_constant_times(rate, duration, window * WINDOW_SIZE + 1, end):
+        yield make_random_block(traversal, times, rng, size_distribution)
+
+
 class ConstantTrafficGenerator(Generator[Traffic]):
     """
     Generates network traffic with a constant arrival pattern
@@ -19,12 +50,21 @@ class ConstantTrafficGenerator(Generator[Traffic]):
             lambda n: n >= 0,
         )
 
-        traffic = Traffic(f"{node.get_id()}-traffic")
-        traversal = Traversal(node)
+        size_distribution = self._get_input_sizes()
 
-        time = rate
-        while time < duration:
-            traffic.add_random_arrival(traversal, time)
-            time += rate
+        traversal = Traversal(node)
+        count = math.ceil(duration / rate) if rate > 0 else 0
+        number_of_windows = -(-count // WINDOW_SIZE)
+        seeds = spawn_seed(Stream.INTER_ARRIVAL_TIMES).spawn(number_of_windows)
+        traffic = Traffic(
+            f"{node.get_id()}-traffic",
+            traversal.get_leaf_ids(),
+            iter_windows(
+                traversal,
+                partial(make_constant_window, rate, duration, size_distribution),
+                seeds,
+                get_config().generation.workers,
+            ),
+        )
 
         return traffic
@@ -0,0 +1,111 @@
+import json
+from functools import partial
+from collections.abc import Iterator
+
+import numpy as np
+
+from ...seed import Stream, spawn_seed
+from ...config import get_config
+from ...generator import Generator
+from ..windows import WINDOW_SIZE, iter_windows
+from ..sizes import SizeDistribution
+from ..sampling import iter_varying_poisson_times
+from ...topology.sampling import FloatArray
+from ..models.block import ArrivalBlock
+from ..streams import make_random_block
+from ..models.traffic import Traffic
+from ..models.traversal import Traversal
+
+
+def to_rate_table(text: str) -> tuple[FloatArray, FloatArray]:
+    """
+    Parse a table of rates over one period, which is a JSON list or the path to a JSON file with a list of [time, rate] pairs
+    """
+    try:
+        if text.lstrip().startswith("["):
+            data = json.loads(text)
+        else:
+            with open(text) as file:
+                data = json.load(file)
+        table = np.array(data, dtype=np.float64).reshape(-1, 2)
+    except (OSError, TypeError) as e:
+        raise ValueError(e)
+    return table[:, 0], table[:, 1]
+
+
+def is_rate_table(table: tuple[FloatArray, FloatArray]) -> bool:
+    times, rates = table
+    return bool(
+        len(times) >= 2
+        and times[0] == 0
+        and np.all(np.diff(times) > 0)
+        and np.all(np.isfinite(times))
+        and np.all((rates >= 0) & np.isfinite(rates))
+    )
+
+
+def make_diurnal_window(
+    table_times: FloatArray,
+    table_rates: FloatArray,
+    duration: float,
+    size_distribution: SizeDistribution,
+    traversal: Traversal,
+    window: int,
+    seed: np.random.SeedSequence,
+) -> Iterator[ArrivalBlock]:
+    """
+    Make the arrivals of a Poisson process with a varying rate in the `window`-th window of WINDOW_SIZE expected candidates at the peak rate
+    """
+    rng = np.random.default_rng(seed)
+    window_duration = WINDOW_SIZE / float(table_rates.max())
+    end = min((window + 1) * window_duration, duration)
+    for times in iter_varying_poisson_times(
+        table_times,
+        table_rates,
+        end,
+        rng,
+        window * window_duration,
+    ):
+        yield make_random_block(traversal, times, rng, size_distribution)
+
+
+class DiurnalTrafficGenerator(Generator[Traffic]):
+    """
+    Generates network traffic with an exponential arrival pattern whose rate follows a periodic table, such as a daily load curve
+    """
+
+    def run(self) -> Traffic:
+        node = self._get_input_node()
+        duration = self._get_input_duration()
+        table_times, table_rates = self._get_input(
+            "rates",
+            "the table of mean rates at which arrivals occur per second over one period",
+            "a JSON list or JSON file path of at least two [time, rate] pairs, with times from 0 increasing to the period, and rates >= 0",
+            to_rate_table,
+            is_rate_table,
+        )
+
+        size_distribution = self._get_input_sizes()
+
+        traversal = Traversal(node)
+        peak = float(table_rates.max())
+        number_of_windows = int(np.ceil(duration * peak / WINDOW_SIZE))
+        seeds = spawn_seed(Stream.INTER_ARRIVAL_TIMES).spawn(number_of_windows)
+        traffic = Traffic(
+            f"{node.get_id()}-traffic",
+            traversal.get_leaf_ids(),
+            iter_windows(
+                traversal,
+                partial(
+                    make_diurnal_window,
+                    table_times,
+                    table_rates,
+                    duration,
+                    size_distribution,
+                ),
+                seeds,
+                get_config().generation.workers,
+            ),
+        )
+
+        return traffic
@@ -0,0 +1,71 @@
+import numpy as np
+
+from ...seed import Stream, spawn_seed
+from ...generator import Generator
+from ..sampling import iter_poisson_times
+from ..models.block import FlowBlock
+from ..streams import make_flow_block
+from ..models.traffic import Traffic
+from ..models.traversal import Traversal
+from ...topology.sampling import FloatArray
+
+
+class FlowTrafficGenerator(Generator[Traffic]):
+    """
+    Generates network traffic as flows that start with an exponential arrival pattern, each of which sends a geometrically distributed number of packets at a constant gap over its own random route
+    """
+
+    def run(self) -> Traffic:
+        node = self._get_input_node()
+        duration = self._get_input_duration()
+        rate = self._get_input(
+            "lambda",
+            "the mean rate at which flows start per second",
+            "a float with value >= 0",
+            float,
+            lambda n: n >= 0,
+        )
+        mean_count = self._get_input(
+            "mean_count",
+            "the average number of packets in a flow",
+            "a float with value >= 1",
+            float,
+            lambda n: n >= 1,
+        )
+        gap = self._get_input(
+            "gap",
+            "the time in simulation seconds between packets within a flow",
+            "a float with value > 0",
+            float,
+            lambda n: n > 0,
+        )
+        size_distribution = self._get_input_sizes()
+
+        traversal = Traversal(node)
+        rng = np.random.default_rng(spawn_seed(Stream.INTER_ARRIVAL_TIMES))
+
+        # Flows are cut off at the end of the duration, so that all of their packets
+        # arrive within it
+        def make_block(starts: FloatArray) -> FlowBlock:
+            sources, destinations = traversal.get_random_routes(len(starts), rng)
+            counts = rng.geometric(1 / mean_count, len(starts))
+            counts = np.minimum(counts, np.ceil((duration - starts) / gap))
+            return make_flow_block(
+                traversal,
+                starts,
+                sources,
+                destinations,
+                counts.astype(np.int64),
+                np.full(len(starts), gap),
+                size_distribution,
+            )
+
+        traffic = Traffic(
+            f"{node.get_id()}-traffic",
+            traversal.get_leaf_ids(),
+            flows=(
+                make_block(starts) for starts in iter_poisson_times(rate, duration, rng)
+            ),
+        )
+
+        return traffic
@@ -0,0 +1,159 @@
+import json
+from collections.abc import Iterator
+
+import numpy as np
+
+from ...util import fatal
+from ...seed import Stream, spawn_seed
+from ...generator import Generator
+from ..sampling import MAX_ALIAS_BATCH_SIZE, AliasTable, iter_poisson_times
+from ...topology.sampling import IndexArray, FloatArray
+from ..models.block import ArrivalBlock
+from ..streams import make_routed_block
+from ..models.traffic import Traffic
+from ..reachability import REJECTION_ROUNDS
+from ..models.traversal import Traversal
+
+
+def to_weights(text: str) -> dict[str, tuple[float, float]]:
+    """
+    Parse the weights of leaves in a gravity model, which is a JSON object or the path to a JSON file that maps leaf IDs to their [out rate, in weight] pairs
+    """
+    try:
+        if text.lstrip().startswith("{"):
+            data = json.loads(text)
+        else:
+            with open(text) as file:
+                data = json.load(file)
+        return {
+            str(leaf_id): (float(out_rate), float(in_weight))
+            for leaf_id, (out_rate, in_weight) in data.items()
+        }
+    except (OSError, AttributeError, TypeError) as e:
+        raise ValueError(e)
+
+
+def check_gravity(
+    traversal: Traversal,
+    out_rates: FloatArray,
+    in_weights: FloatArray,
+) -> None:
+    """
+    Exit if any leaf with an out rate cannot reach a leaf with an in weight
+    """
+    ids = traversal.get_leaf_ids()
+    senders = np.flatnonzero(out_rates > 0)
+    receivers = np.flatnonzero(in_weights > 0)
+    batch_size = max(MAX_ALIAS_BATCH_SIZE // max(len(receivers), 1), 1)
+    for start in range(0, len(senders), batch_size):
+        batch = senders[start : start + batch_size]
+        reached = traversal.reaches(
+            np.repeat(batch, len(receivers)),
+            np.tile(receivers, len(batch)),
+        )
+        stuck = ~reached.reshape(len(batch), len(receivers)).any(axis=1)
+        if stuck.any():
+            leaf_id = ids[int(batch[stuck][0])]
+            fatal(
+                f"Leaf {leaf_id} has an out rate, but cannot reach any leaf with an in weight"
+            )
+
+
+class GravityTrafficGenerator(Generator[Traffic]):
+    """
+    Generates network traffic with an exponential arrival pattern, in which every leaf sends at its own rate to the leaves it can reach in proportion to their weights
+    """
+
+    def run(self) -> Traffic:
+        node = self._get_input_node()
+        duration = self._get_input_duration()
+        weights = self._get_input(
+            "weights",
+            "the out rate at which every leaf sends arrivals per second, and the in weight by which it attracts arrivals",
+            "a JSON object or JSON file path that maps leaf IDs to [out rate, in weight] pairs of floats >= 0",
+            to_weights,
+            lambda w: all(0 <= value < np.inf for pair in w.values() for value in pair),
+        )
+
+        size_distribution = self._get_input_sizes()
+
+        traversal = Traversal(node)
+        ids = traversal.get_leaf_ids()
+        indices = {leaf_id: index for index, leaf_id in enumerate(ids)}
+        out_rates = np.zeros(len(ids), dtype=np.float64)
+        in_weights = np.zeros(len(ids), dtype=np.float64)
+        for leaf_id, (out_rate, in_weight) in weights.items():
+            if leaf_id not in indices:
+                fatal(f"Leaf {leaf_id} was given weights, but is not in the topology")
+            out_rates[indices[leaf_id]] = out_rate
+            in_weights[indices[leaf_id]] = in_weight
+        check_gravity(traversal, out_rates, in_weights)
+        rate = float(out_rates.sum())
+
+        # The aggregate process is drawn once, and every arrival is assigned a
+        # source by out rate and a destination by in weight. Destinations that are
+        # the source or that it cannot reach are drawn again for a few rounds,
+        # after which they are drawn from the receivers that the source reaches
+        rng = np.random.default_rng(spawn_seed(Stream.INTER_ARRIVAL_TIMES))
+        receivers = np.flatnonzero(in_weights > 0)
+        reachable_tables: dict[int, tuple[IndexArray, AliasTable]] = {}
+
+        def get_reachable_table(source: int) -> tuple[IndexArray, AliasTable]:
+            if source not in reachable_tables:
+                sources = np.full(len(receivers), source, dtype=np.int64)
+                reachable = receivers[traversal.reaches(sources, receivers)]
+                reachable_tables[source] = (
+                    reachable,
+                    AliasTable(in_weights[reachable]),
+                )
+            return reachable_tables[source]
+
+        def draw_destinations(
+            table: AliasTable,
+            sources: IndexArray,
+        ) -> IndexArray:
+            destinations = table.sample(rng, len(sources))
+            pending = np.flatnonzero(~traversal.reaches(sources, destinations))
+            for _ in range(REJECTION_ROUNDS):
+                if len(pending) == 0:
+                    break
+                destinations[pending] = table.sample(rng, len(pending))
+                reached = traversal.reaches(sources[pending], destinations[pending])
+                pending = pending[~reached]
+
+            # Sources whose reachable receivers have little of the in weight draw
+            # from a table of those receivers, which is built once per source
+            order = np.argsort(sources[pending], kind="stable")
+            groups, starts = np.unique(sources[pending][order], return_index=True)
+            ends = np.append(starts[1:], len(pending))
+            for source, start, end in zip(groups.tolist(), starts, ends):
+                routes = pending[order[start:end]]
+                reachable, reachable_table = get_reachable_table(source)
+                destinations[routes] = reachable[
+                    reachable_table.sample(rng, len(routes))
+                ]
+            return destinations
+
+        def iter_blocks() -> Iterator[ArrivalBlock]:
+            if rate <= 0:
+                return
+            source_table = AliasTable(out_rates)
+            destination_table = AliasTable(in_weights)
+            for times in iter_poisson_times(rate, duration, rng):
+                sources = source_table.sample(rng, len(times))
+                destinations = draw_destinations(destination_table, sources)
+                yield make_routed_block(
+                    traversal,
+                    times,
+                    sources,
+                    destinations,
+                    size_distribution=size_distribution,
+                )
+
+        traffic = Traffic(
+            f"{node.get_id()}-traffic",
+            traversal.get_leaf_ids(),
+            iter_blocks(),
+        )
+
+        return traffic
@@ -0,0 +1,104 @@
+from collections.abc import Iterator
+
+import numpy as np
+import numpy.typing as npt
+
+from ...util import fatal
+from ...seed import Stream, spawn_seed
+from ...generator import Generator
+from ..sampling import MAX_ALIAS_BATCH_SIZE, AliasTable, AliasMatrix, iter_poisson_times
+from ...topology.sampling import FloatArray
+from ..models.block import ArrivalBlock
+from ..streams import make_routed_block
+from ..models.traffic import Traffic
+from ..models.traversal import Traversal
+
+
+def to_matrix(file_path: str) -> npt.NDArray[np.float64]:
+    """
+    Load a matrix from a NumPy file, memory-mapped so that large matrices are only read from disk as they are used
+    """
+    try:
+        matrix: npt.NDArray[np.float64] = np.load(file_path, mmap_mode="r")
+    except OSError as e:
+        raise ValueError(e)
+    return matrix
+
+
+def get_row_sums(traversal: Traversal, matrix: npt.NDArray[np.float64]) -> FloatArray:
+    """
+    Sum the rates of every row of a matrix of rates between the leaves of `traversal`, in batches of rows. Exits if any rate is invalid, or if a leaf has a rate to a leaf that it cannot reach
+    """
+    ids = traversal.get_leaf_ids()
+    if matrix.shape[0] != len(ids):
+        fatal(f"Matrix has {matrix.shape[0]} rows, but topology has {len(ids)} leaves")
+
+    sums = np.empty(len(ids), dtype=np.float64)
+    batch_size = max(MAX_ALIAS_BATCH_SIZE // max(len(ids), 1), 1)
+    for start in range(0, len(ids), batch_size):
+        batch = np.asarray(matrix[start : start + batch_size], dtype=np.float64)
+        if not np.all((batch >= 0) & np.isfinite(batch)):
+            fatal(f"Matrix has rates that are negative or not finite")
+
+        sources, destinations = np.nonzero(batch)
+        sources += start
+        unreachable = ~traversal.reaches(sources, destinations)
+        if unreachable.any():
+            source = ids[int(sources[unreachable][0])]
+            destination = ids[int(destinations[unreachable][0])]
+            fatal(
+                f"Leaf {source} has a rate to leaf {destination}, which it cannot reach"
+            )
+        sums[start : start + batch_size] = batch.sum(axis=1)
+    return sums
+
+
+class MatrixTrafficGenerator(Generator[Traffic]):
+    """
+    Generates network traffic with an exponential arrival pattern, whose arrivals are spread over pairs of leaves by a matrix of rates
+    """
+
+    def run(self) -> Traffic:
+        node = self._get_input_node()
+        duration = self._get_input_duration()
+        matrix = self._get_input(
+            "matrix",
+            "the file path of a NumPy matrix of the mean rates at which arrivals occur per second from every leaf (row) to every leaf (column), with leaves in the order of the topology",
+            "a valid .npy file path of a square matrix",
+            to_matrix,
+            lambda m: m.ndim == 2 and m.shape[0] == m.shape[1],
+        )
+
+        size_distribution = self._get_input_sizes()
+
+        traversal = Traversal(node)
+        sums = get_row_sums(traversal, matrix)
+        rate = float(sums.sum())
+
+        # The aggregate process is drawn once, and every arrival is assigned a
+        # source by the sums of the rows, and then a destination by its row
+        rng = np.random.default_rng(spawn_seed(Stream.INTER_ARRIVAL_TIMES))
+
+        def iter_blocks() -> Iterator[ArrivalBlock]:
+            if rate <= 0:
+                return
+            source_table = AliasTable(sums)
+            destination_table = AliasMatrix(matrix)
+            for times in iter_poisson_times(rate, duration, rng):
+                sources = source_table.sample(rng, len(times))
+                destinations = destination_table.sample(rng, sources)
+                yield make_routed_block(
+                    traversal,
+                    times,
+                    sources,
+                    destinations,
+                    size_distribution=size_distribution,
+                )
+
+        traffic = Traffic(
+            f"{node.get_id()}-traffic",
+            traversal.get_leaf_ids(),
+            iter_blocks(),
+        )
+
+        return traffic
@@ -0,0 +1,86 @@
+import numpy as np
+
+from ...seed import Stream, spawn_seed
+from ...generator import Generator
+from ..sampling import iter_on_off_times
+from ..streams import make_routed_block
+from ..models.traffic import Traffic
+from ..models.traversal import Traversal
+
+
+class OnOffTrafficGenerator(Generator[Traffic]):
+    """
+    Generates self-similar network traffic as the superposition of many sources that alternate between Pareto distributed ON and OFF periods, each with a random route
+    """
+
+    def run(self) -> Traffic:
+        node = self._get_input_node()
+        duration = self._get_input_duration()
+
+        number_of_sources = self._get_input(
+            "number_of_sources",
+            "the number of sources that are superposed",
+            "an integer with value >= 1",
+            int,
+            lambda n: n >= 1,
+        )
+        rate = self._get_input(
+            "rate",
+            "the rate at which a source sends arrivals per second while it is ON",
+            "a float with value > 0",
+            float,
+            lambda n: n > 0,
+        )
+        mean_on_time = self._get_input(
+            "mean_on_time",
+            "the average time in simulation seconds that a source is ON",
+            "a float with value > 0",
+            float,
+            lambda n: n > 0,
+        )
+        mean_off_time = self._get_input(
+            "mean_off_time",
+            "the average time in simulation seconds that a source is OFF",
+            "a float with value > 0",
+            float,
+            lambda n: n > 0,
+        )
+        shape = self._get_input(
+            "shape",
+            "the shape of the Pareto distribution of periods, where values below 2 give long-range dependence",
+            "a float with value > 1",
+            float,
+            lambda n: n > 1,
+        )
+
+        size_distribution = self._get_input_sizes()
+
+        traversal = Traversal(node)
+        rng = np.random.default_rng(spawn_seed(Stream.INTER_ARRIVAL_TIMES))
+
+        # Every arrival of a source follows the route of the source
+        sources, destinations = traversal.get_random_routes(number_of_sources)
+        traffic = Traffic(
+            f"{node.get_id()}-traffic",
+            traversal.get_leaf_ids(),
+            (
+                make_routed_block(
+                    traversal,
+                    times,
+                    sources[on_off_sources],
+                    destinations[on_off_sources],
+                    size_distribution=size_distribution,
+                )
+                for times, on_off_sources in iter_on_off_times(
+                    number_of_sources,
+                    rate,
+                    mean_on_time,
+                    mean_off_time,
+                    shape,
+                    duration,
+                    rng,
+                )
+            ),
+        )
+
+        return traffic
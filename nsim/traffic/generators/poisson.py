@@ -1,10 +1,59 @@
-import random
+import math
+from functools import partial
+from collections.abc import Iterator
 
+import numpy as np
+
+from ...seed import Stream, spawn_seed
+from ...config import get_config
 from ...generator import Generator
+from ..windows import WINDOW_SIZE, iter_windows
+from ..sizes import SizeDistribution
+from ..sampling import to_lambdas, iter_poisson_times
+from ..sweep import ThinnedStreams
+from ..models.block import ArrivalBlock
+from ..streams import make_random_block
 from ..models.traffic import Traffic
 from ..models.traversal import Traversal
 
 
+def make_poisson_window(
+    rate: float,
+    duration: float,
+    size_distribution: SizeDistribution,
+    traversal: Traversal,
+    window: int,
+    seed: np.random.SeedSequence,
+) -> Iterator[ArrivalBlock]:
+    """
+    Make the arrivals of a Poisson process in the `window`-th window of WINDOW_SIZE expected arrivals. Arrivals in disjoint windows are independent, so windows can be made in any order
+    """
+    rng = np.random.default_rng(seed)
+    window_duration = WINDOW_SIZE / rate
+    end = min((window + 1) * window_duration, duration)
+    for times in iter_poisson_times(rate, end, rng, window * window_duration):
+        yield make_random_block(traversal, times, rng, size_distribution)
+
+
+def iter_poisson_blocks(
+    traversal: Traversal,
+    rate: float,
+    duration: float,
+    size_distribution: SizeDistribution,
+) -> Iterator[ArrivalBlock]:
+    """
+    Make the arrivals of a Poisson process with `rate` arrivals per second until `duration`, in windows that are spread over the configured number of workers
+    """
+    number_of_windows = math.ceil(duration * rate / WINDOW_SIZE) if rate > 0 else 0
+    seeds = spawn_seed(Stream.INTER_ARRIVAL_TIMES).spawn(number_of_windows)
+    return iter_windows(
+        traversal,
+        partial(make_poisson_window, rate, duration, size_distribution),
+        seeds,
+        get_config().generation.workers,
+    )
+
+
 class PoissonTrafficGenerator(Generator[Traffic]):
     """
     Generates network traffic with an exponential arrival pattern
@@ -21,13 +70,14 @@ class PoissonTrafficGenerator(Generator[Traffic]):
             lambda n: n >= 0,
         )
 
-        traffic = Traffic(f"{node.get_id()}-traffic")
-        traversal = Traversal(node)
+        size_distribution = self._get_input_sizes()
 
-        time = random.expovariate(l)
-        while time < duration:
-            traffic.add_random_arrival(traversal, time)
-            time += random.expovariate(l)
+        traversal = Traversal(node)
+        traffic = Traffic(
+            f"{node.get_id()}-traffic",
+            traversal.get_leaf_ids(),
+            iter_poisson_blocks(traversal, l, duration, size_distribution),
+        )
 
         # Test poisson property
         # arrivals_per_time_unit: dict[int, int] = {}
@@ -46,3 +96,42 @@ class PoissonTrafficGenerator(Generator[Traffic]):
         # print()
 
         return traffic
+
+
+class PoissonSweepTrafficGenerator(Generator[list[Traffic]]):
+    """
+    Generates network traffic with an exponential arrival pattern for each of a list of rates in one pass. Only the traffic at the highest rate is generated, and the traffic at every lower rate is thinned from it, so that all traffic is coupled: every arrival at a rate is also an arrival at every higher rate
+    """
+
+    def run(self) -> list[Traffic]:
+        node = self._get_input_node()
+        duration = self._get_input_duration()
+        lambdas = self._get_input(
+            "lambdas",
+            "the mean rates at which arrivals occur per second",
+            "a JSON list of distinct floats with value >= 0",
+            to_lambdas,
+            lambda l: len(l) > 0
+            and len(set(l)) == len(l)
+            and all(0 <= n < np.inf for n in l),
+        )
+        size_distribution = self._get_input_sizes()
+
+        # The traffic at the highest rate is the same as that of the Poisson
+        # generator at that rate, as its windows are seeded first
+        traversal = Traversal(node)
+        peak = max(lambdas)
+        source = iter_poisson_blocks(traversal, peak, duration, size_distribution)
+        streams = ThinnedStreams(
+            source,
+            [l / peak if peak > 0 else 0 for l in lambdas],
+            np.random.default_rng(spawn_seed(Stream.INTER_ARRIVAL_TIMES)),
+        )
+        return [
+            Traffic(
+                f"{node.get_id()}-traffic-{l}",
+                traversal.get_leaf_ids(),
+                streams.iter_stream(index),
+            )
+            for index, l in enumerate(lambdas)
+        ]
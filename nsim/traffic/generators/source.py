@@ -0,0 +1,88 @@
+import json
+
+import numpy as np
+
+from ...util import fatal
+from ...seed import Stream, spawn_seed
+from ...generator import Generator
+from ..sampling import iter_source_times
+from ..streams import make_routed_block
+from ..models.traffic import Traffic
+from ..models.traversal import Traversal
+
+
+def to_rates(text: str) -> float | dict[str, float]:
+    """
+    Parse the arrival rates of sources, which are either one rate for every leaf, or a JSON object or the path to a JSON file that maps leaf IDs to their rates
+    """
+    try:
+        return float(text)
+    except ValueError:
+        pass
+
+    try:
+        if text.lstrip().startswith("{"):
+            data = json.loads(text)
+        else:
+            with open(text) as file:
+                data = json.load(file)
+        return {str(leaf_id): float(rate) for leaf_id, rate in data.items()}
+    except (OSError, AttributeError, TypeError) as e:
+        raise ValueError(e)
+
+
+class SourceTrafficGenerator(Generator[Traffic]):
+    """
+    Generates network traffic where every leaf sends with its own exponential arrival pattern, to random destinations
+    """
+
+    def run(self) -> Traffic:
+        node = self._get_input_node()
+        duration = self._get_input_duration()
+        rates_by_id = self._get_input(
+            "rates",
+            "the mean rate at which every leaf sends arrivals per second",
+            "a float with value >= 0, or a JSON object or JSON file path that maps leaf IDs to such floats",
+            to_rates,
+            lambda r: all(
+                0 <= rate < np.inf
+                for rate in (r.values() if isinstance(r, dict) else [r])
+            ),
+        )
+
+        size_distribution = self._get_input_sizes()
+
+        traversal = Traversal(node)
+        ids = traversal.get_leaf_ids()
+        if isinstance(rates_by_id, dict):
+            indices = {leaf_id: index for index, leaf_id in enumerate(ids)}
+            rates = np.zeros(len(ids), dtype=np.float64)
+            for leaf_id, rate in rates_by_id.items():
+                if leaf_id not in indices:
+                    fatal(
+                        f"Leaf {leaf_id} was given a rate, but is not in the topology"
+                    )
+                rates[indices[leaf_id]] = rate
+        else:
+            rates = np.full(len(ids), rates_by_id, dtype=np.float64)
+
+        # Check before any traffic is streamed out
+        traversal.check_sources(np.flatnonzero(rates > 0))
+
+        rng = np.random.default_rng(spawn_seed(Stream.INTER_ARRIVAL_TIMES))
+        traffic = Traffic(
+            f"{node.get_id()}-traffic",
+            ids,
+            (
+                make_routed_block(
+                    traversal,
+                    times,
+                    sources,
+                    traversal.get_random_destinations(sources),
+                    size_distribution=size_distribution,
+                )
+                for times, sources in iter_source_times(rates, duration, rng)
+            ),
+        )
+
+        return traffic
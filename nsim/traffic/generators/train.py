@@ -1,8 +1,9 @@
-import random
-from typing import Callable
+import numpy as np
 
+from ...seed import Stream, spawn_seed
 from ...generator import Generator
-from ..models.arrival import Arrival
+from ..sampling import iter_train_times
+from ..streams import make_train_block
 from ..models.traffic import Traffic
 from ..models.traversal import Traversal
 
@@ -19,9 +20,9 @@ class TrainTrafficGenerator(Generator[Traffic]):
         inter_train_time = self._get_input(
             "inter_train_time",
             "the average time in simulation seconds between the starts of consecutive packet trains",
-            "a float with value >= 0",
+            "a float with value > 0",
             float,
-            lambda n: n >= 0,
+            lambda n: n > 0,
         )
         inter_car_time = self._get_input(
             "inter_car_time",
@@ -33,27 +34,29 @@ class TrainTrafficGenerator(Generator[Traffic]):
         max_train_length = self._get_input(
             "max_train_length",
             "the maximum number of packets in a train",
-            "an integer with value >= 0",
+            "an integer with value >= 1",
             int,
-            lambda n: n >= 0,
+            lambda n: n >= 1,
         )
 
-        traffic = Traffic(f"{node.get_id()}-traffic")
-        traversal = Traversal(node)
+        size_distribution = self._get_input_sizes()
 
-        r: Callable[[float], float] = lambda x: random.expovariate(1.0 / x)
-
-        time = r(inter_train_time)
-        while time < duration:
-            route = traversal.get_random_route()
-            source = route.get_source().get_id()
-            destination = route.get_destination().get_id()
-            for i in range(random.randint(1, max_train_length)):
-                if i != 0:
-                    time += r(inter_car_time)
-                if time > duration:
-                    break
-                traffic.add_arrival(Arrival(time, source, destination))
-            time += r(inter_train_time)
+        traversal = Traversal(node)
+        rng = np.random.default_rng(spawn_seed(Stream.INTER_ARRIVAL_TIMES))
+
+        traffic = Traffic(
+            f"{node.get_id()}-traffic",
+            traversal.get_leaf_ids(),
+            (
+                make_train_block(traversal, times, trains, size_distribution)
+                for times, trains in iter_train_times(
+                    inter_train_time,
+                    inter_car_time,
+                    max_train_length,
+                    duration,
+                    rng,
+                )
+            ),
+        )
 
         return traffic
@@ -1,7 +1,9 @@
-from typing import TypedDict, TypeGuard
+from typing import TypedDict, TypeGuard, cast
 
 from ...util import Json
 from ...input import JsonInput
+from ..sizes import SizeDistribution
+from ..models.flow import Flow
 from ..models.arrival import Arrival
 from ..models.traffic import Traffic
 
@@ -15,6 +17,17 @@ class ArrivalSchema(TypedDict):
     size: int
 
 
+class FlowSchema(TypedDict):
+    type: str
+    id: str
+    start: float
+    source: str
+    destination: str
+    count: int
+    gap: float
+    sizes: list[list[float]]
+
+
 class TrafficSchema(TypedDict):
     type: str
     id: str
@@ -24,7 +37,23 @@ class TrafficSchema(TypedDict):
 class JsonTrafficInput(JsonInput[Traffic]):
     def __validate_arrival(self, data: Json) -> TypeGuard[ArrivalSchema]:
         schema: Json = ArrivalSchema.__annotations__
-        return self._validate_schema(data, schema)
+        self._validate_schema(data, schema)
+        if "path" in data and not (
+            isinstance(data["path"], list)
+            and all(isinstance(leaf_id, str) for leaf_id in data["path"])
+        ):
+            self._parse_error(f"Key `path` has invalid type in data: {data}")
+        return True
+
+    def __validate_flow(self, data: Json) -> TypeGuard[FlowSchema]:
+        schema: Json = FlowSchema.__annotations__
+        self._validate_schema(data, schema)
+        if "path" in data and not (
+            isinstance(data["path"], list)
+            and all(isinstance(leaf_id, str) for leaf_id in data["path"])
+        ):
+            self._parse_error(f"Key `path` has invalid type in data: {data}")
+        return True
 
     def __validate_traffic(self, data: Json) -> TypeGuard[TrafficSchema]:
         schema: Json = TrafficSchema.__annotations__
@@ -37,14 +66,42 @@ class JsonTrafficInput(JsonInput[Traffic]):
                 data["source"],
                 data["destination"],
                 data["size"],
+                cast(list[str] | None, data.get("path")),
             )
         self._parse_error(f'Unrecognised arrival type: {data["type"]}')
 
+    def __parse_flow(self, data: Json) -> Flow:
+        if self.__validate_flow(data) and data["type"] == "Flow":
+            try:
+                size_distribution = SizeDistribution(
+                    [
+                        (int(low), int(high), weight)
+                        for low, high, weight in data["sizes"]
+                    ]
+                )
+            except (ValueError, TypeError) as e:
+                self._parse_error(f"Key `sizes` is not a valid list of ranges: {e}")
+            return Flow(
+                data["start"],
+                data["source"],
+                data["destination"],
+                data["count"],
+                data["gap"],
+                size_distribution,
+                cast(list[str] | None, data.get("path")),
+            )
+        self._parse_error(f'Unrecognised flow type: {data["type"]}')
+
     def __parse_traffic(self, data: Json) -> Traffic:
         if self.__validate_traffic(data) and data["type"] == "Traffic":
             traffic = Traffic(data["id"])
             for arrival in data["arrivals"]:
                 traffic.add_arrival(self.__parse_arrival(arrival))
+            flows = cast(list[Json], data.get("flows", []))
+            if not isinstance(flows, list):
+                self._parse_error(f"Key `flows` has invalid type in data: {data}")
+            for flow in flows:
+                traffic.add_flow(self.__parse_flow(flow))
             return traffic
 
         self._parse_error(f'Unrecognised traffic type: {data["type"]}')
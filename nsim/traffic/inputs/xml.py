@@ -2,6 +2,8 @@ import xml.etree.ElementTree as ElementTree
 
 from nsim.input import Schema, XmlInput
 
+from ..sizes import to_size_distribution
+from ..models.flow import Flow
 from ..models.arrival import Arrival
 from ..models.traffic import Traffic
 
@@ -16,13 +18,52 @@ class XmlTrafficInput(XmlInput[Traffic]):
             "size": int,
         }
         attr = self._parse_attributes(element, schema)
-        return Arrival(attr["time"], attr["source"], attr["destination"], attr["size"])
+
+        path: list[str] | None = None
+        if "path" in element.attrib:
+            path = self._parse_attributes(element, {"path": str})["path"].split()
+
+        return Arrival(
+            attr["time"],
+            attr["source"],
+            attr["destination"],
+            attr["size"],
+            path,
+        )
+
+    def __parse_flow(self, element: ElementTree.Element) -> Flow:
+        schema: Schema = {
+            "id": str,
+            "start": float,
+            "source": str,
+            "destination": str,
+            "count": int,
+            "gap": float,
+            "sizes": to_size_distribution,
+        }
+        attr = self._parse_attributes(element, schema)
+
+        path: list[str] | None = None
+        if "path" in element.attrib:
+            path = self._parse_attributes(element, {"path": str})["path"].split()
+
+        return Flow(
+            attr["start"],
+            attr["source"],
+            attr["destination"],
+            attr["count"],
+            attr["gap"],
+            attr["sizes"],
+            path,
+        )
 
     def __parse_traffic(self, element: ElementTree.Element) -> Traffic:
         attr = self._parse_attributes(element, {"id": str})
         traffic = Traffic(attr["id"])
         for arrival in element.findall("arrival"):
             traffic.add_arrival(self.__parse_arrival(arrival))
+        for flow in element.findall("flow"):
+            traffic.add_flow(self.__parse_flow(flow))
         return traffic
 
     def run(self, data: ElementTree.Element) -> Traffic:
@@ -1,6 +1,6 @@
-import random
-
+from ...seed import Stream, get_random
 from ...model import Model
+from ..sizes import MIN_SIZE, MAX_SIZE
 
 
 class Arrival(Model):
@@ -12,6 +12,7 @@ class Arrival(Model):
     __source: str  # Node ID
     __destination: str  # Node ID
     __size: int  # In bytes
+    __path: list[str] | None  # Node IDs from source to destination, if routed
 
     def __init__(
         self,
@@ -19,14 +20,21 @@ class Arrival(Model):
         source: str,
         destination: str,
         size_optional: int | None = None,
+        path: list[str] | None = None,
     ) -> None:
-        size: int = size_optional or random.randint(512, 1500)  # Typical TCP/IP traffic
+        rng = get_random(Stream.SIZES)
+        size: int = size_optional or rng.randint(MIN_SIZE, MAX_SIZE)
 
-        super().__init__(f"{time}_{source}_{destination}_{size}")
+        # The id is derived on demand instead of passed to Model, as traffic can hold
+        # millions of arrivals whose ids are never asked for
         self.__time = time
         self.__source = source
         self.__destination = destination
         self.__size = size
+        self.__path = path
+
+    def get_id(self) -> str:
+        return f"{self.__time}_{self.__source}_{self.__destination}_{self.__size}"
 
     def get_time(self) -> float:
         return self.__time
@@ -39,3 +47,6 @@ class Arrival(Model):
 
     def get_size(self) -> int:
         return self.__size
+
+    def get_path(self) -> list[str] | None:
+        return self.__path
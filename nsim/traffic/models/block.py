@@ -0,0 +1,232 @@
+from __future__ import annotations
+
+import numpy as np
+import numpy.typing as npt
+
+from ...topology.sampling import IndexArray, FloatArray
+from ..sizes import SizeDistribution
+
+
+def take_paths(
+    offsets: IndexArray,
+    nodes: npt.NDArray[np.int32],
+    indices: IndexArray,
+) -> tuple[IndexArray, npt.NDArray[np.int32]]:
+    """
+    Take the paths at `indices` out of paths stored as the offsets of every path in their concatenated nodes, in the same form
+    """
+    starts = offsets[indices]
+    lengths = offsets[indices + 1] - starts
+    taken_offsets = np.zeros(len(indices) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=taken_offsets[1:])
+    positions = np.repeat(starts - taken_offsets[:-1], lengths)
+    taken_nodes = nodes[positions + np.arange(int(taken_offsets[-1]), dtype=np.int64)]
+    return taken_offsets, taken_nodes
+
+
+def to_paths(paths: list[list[int]]) -> tuple[IndexArray, IndexArray]:
+    """
+    Store lists of node indices as the offsets of every path in their concatenated nodes
+    """
+    offsets = np.zeros(len(paths) + 1, dtype=np.int64)
+    np.cumsum(np.array([len(path) for path in paths], dtype=np.int64), out=offsets[1:])
+    nodes = np.array([node for path in paths for node in path], dtype=np.int64)
+    return offsets, nodes
+
+
+class ArrivalBlock:
+    """
+    Arrivals stored as columns, whose sources, destinations and paths are indices into the node ID table of their traffic. An arrival takes 18 bytes without a path, instead of a Python object with its own ID strings
+    """
+
+    __times: FloatArray
+    __sources: npt.NDArray[np.int32]
+    __destinations: npt.NDArray[np.int32]
+    __sizes: npt.NDArray[np.uint16]
+    __path_offsets: IndexArray | None
+    __path_nodes: npt.NDArray[np.int32] | None
+
+    def __init__(
+        self,
+        times: FloatArray,
+        sources: IndexArray | npt.NDArray[np.int32],
+        destinations: IndexArray | npt.NDArray[np.int32],
+        sizes: IndexArray | npt.NDArray[np.uint16],
+        path_offsets: IndexArray | None = None,
+        path_nodes: IndexArray | npt.NDArray[np.int32] | None = None,
+    ) -> None:
+        self.__times = times.astype(np.float64, copy=False)
+        self.__sources = sources.astype(np.int32)
+        self.__destinations = destinations.astype(np.int32)
+        self.__sizes = sizes.astype(np.uint16)
+        self.__path_offsets = path_offsets
+        self.__path_nodes = None if path_nodes is None else path_nodes.astype(np.int32)
+
+    @staticmethod
+    def from_lists(
+        times: list[float],
+        sources: list[int],
+        destinations: list[int],
+        sizes: list[int],
+        paths: list[list[int]] | None = None,
+    ) -> ArrivalBlock:
+        """
+        Make a block of arrivals from lists of their columns, and of the node indices on their paths if they are routed
+        """
+        return ArrivalBlock(
+            np.array(times, dtype=np.float64),
+            np.array(sources, dtype=np.int64),
+            np.array(destinations, dtype=np.int64),
+            np.array(sizes, dtype=np.int64),
+            *((None, None) if paths is None else to_paths(paths)),
+        )
+
+    def __len__(self) -> int:
+        return len(self.__times)
+
+    def get_times(self) -> FloatArray:
+        return self.__times
+
+    def get_sources(self) -> npt.NDArray[np.int32]:
+        return self.__sources
+
+    def get_destinations(self) -> npt.NDArray[np.int32]:
+        return self.__destinations
+
+    def get_sizes(self) -> npt.NDArray[np.uint16]:
+        return self.__sizes
+
+    def get_path_offsets(self) -> IndexArray | None:
+        return self.__path_offsets
+
+    def get_path_nodes(self) -> npt.NDArray[np.int32] | None:
+        return self.__path_nodes
+
+    def take(self, indices: IndexArray) -> ArrivalBlock:
+        """
+        Make a block of the arrivals at `indices`, in that order
+        """
+        if self.__path_offsets is None or self.__path_nodes is None:
+            return ArrivalBlock(
+                self.__times[indices],
+                self.__sources[indices],
+                self.__destinations[indices],
+                self.__sizes[indices],
+            )
+        return ArrivalBlock(
+            self.__times[indices],
+            self.__sources[indices],
+            self.__destinations[indices],
+            self.__sizes[indices],
+            *take_paths(self.__path_offsets, self.__path_nodes, indices),
+        )
+
+    def relabel(self, indices: IndexArray) -> ArrivalBlock:
+        """
+        Make a block of the same arrivals, whose sources, destinations and paths are mapped through `indices` into another node ID table
+        """
+        return ArrivalBlock(
+            self.__times,
+            indices[self.__sources],
+            indices[self.__destinations],
+            self.__sizes,
+            self.__path_offsets,
+            None if self.__path_nodes is None else indices[self.__path_nodes],
+        )
+
+
+class FlowBlock:
+    """
+    Flows stored as columns, in the same way as arrivals. A flow stands for `count` packets from its source to its destination, the first at its start and each next one `gap` seconds later, with sizes drawn from one of the size distributions of the block
+    """
+
+    __starts: FloatArray
+    __sources: npt.NDArray[np.int32]
+    __destinations: npt.NDArray[np.int32]
+    __counts: IndexArray
+    __gaps: FloatArray
+    __size_distributions: list[SizeDistribution]
+    __distributions: npt.NDArray[np.int32]  # Index of every size distribution
+    __path_offsets: IndexArray | None
+    __path_nodes: npt.NDArray[np.int32] | None
+
+    def __init__(
+        self,
+        starts: FloatArray,
+        sources: IndexArray | npt.NDArray[np.int32],
+        destinations: IndexArray | npt.NDArray[np.int32],
+        counts: IndexArray,
+        gaps: FloatArray,
+        size_distributions: list[SizeDistribution],
+        distributions: IndexArray | npt.NDArray[np.int32] | None = None,
+        path_offsets: IndexArray | None = None,
+        path_nodes: IndexArray | npt.NDArray[np.int32] | None = None,
+    ) -> None:
+        self.__starts = starts.astype(np.float64, copy=False)
+        self.__sources = sources.astype(np.int32)
+        self.__destinations = destinations.astype(np.int32)
+        self.__counts = counts.astype(np.int64, copy=False)
+        self.__gaps = gaps.astype(np.float64, copy=False)
+        self.__size_distributions = size_distributions
+        self.__distributions = (
+            np.zeros(len(starts), dtype=np.int32)
+            if distributions is None
+            else distributions.astype(np.int32)
+        )
+        self.__path_offsets = path_offsets
+        self.__path_nodes = None if path_nodes is None else path_nodes.astype(np.int32)
+
+    @staticmethod
+    def from_lists(
+        starts: list[float],
+        sources: list[int],
+        destinations: list[int],
+        counts: list[int],
+        gaps: list[float],
+        size_distributions: list[SizeDistribution],
+        distributions: list[int],
+        paths: list[list[int]] | None = None,
+    ) -> FlowBlock:
+        """
+        Make a block of flows from lists of their columns, and of the node indices on their paths if they are routed
+        """
+        return FlowBlock(
+            np.array(starts, dtype=np.float64),
+            np.array(sources, dtype=np.int64),
+            np.array(destinations, dtype=np.int64),
+            np.array(counts, dtype=np.int64),
+            np.array(gaps, dtype=np.float64),
+            size_distributions,
+            np.array(distributions, dtype=np.int64),
+            *((None, None) if paths is None else to_paths(paths)),
+        )
+
+    def __len__(self) -> int:
+        return len(self.__starts)
+
+    def get_starts(self) -> FloatArray:
+        return self.__starts
+
+    def get_sources(self) -> npt.NDArray[np.int32]:
+        return self.__sources
+
+    def get_destinations(self) -> npt.NDArray[np.int32]:
+        return self.__destinations
+
+    def get_counts(self) -> IndexArray:
+        return self.__counts
+
+    def get_gaps(self) -> FloatArray:
+        return self.__gaps
+
+    def get_size_distributions(self) -> list[SizeDistribution]:
+        return self.__size_distributions
+
+    def get_distributions(self) -> npt.NDArray[np.int32]:
+        return self.__distributions
+
+    def get_path_offsets(self) -> IndexArray | None:
+        return self.__path_offsets
+
+    def get_path_nodes(self) -> npt.NDArray[np.int32] | None:
+        return self.__path_nodes
@@ -0,0 +1,59 @@
+from ...model import Model
+from ..sizes import SizeDistribution
+
+
+class Flow(Model):
+    """
+    Represents a number of messages with the same source and destination entering the network at a constant gap
+    """
+
+    __start: float  # Simulation time of the first message
+    __source: str  # Node ID
+    __destination: str  # Node ID
+    __count: int  # Number of messages
+    __gap: float  # Simulation seconds between messages
+    __size_distribution: SizeDistribution
+    __path: list[str] | None  # Node IDs from source to destination, if routed
+
+    def __init__(
+        self,
+        start: float,
+        source: str,
+        destination: str,
+        count: int,
+        gap: float,
+        size_distribution: SizeDistribution,
+        path: list[str] | None = None,
+    ) -> None:
+        # The id is derived on demand, as for arrivals
+        self.__start = start
+        self.__source = source
+        self.__destination = destination
+        self.__count = count
+        self.__gap = gap
+        self.__size_distribution = size_distribution
+        self.__path = path
+
+    def get_id(self) -> str:
+        return f"{self.__start}_{self.__source}_{self.__destination}_{self.__count}"
+
+    def get_start(self) -> float:
+        return self.__start
+
+    def get_source(self) -> str:
+        return self.__source
+
+    def get_destination(self) -> str:
+        return self.__destination
+
+    def get_count(self) -> int:
+        return self.__count
+
+    def get_gap(self) -> float:
+        return self.__gap
+
+    def get_size_distribution(self) -> SizeDistribution:
+        return self.__size_distribution
+
+    def get_path(self) -> list[str] | None:
+        return self.__path
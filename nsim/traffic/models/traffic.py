@@ -1,23 +1,299 @@
+from collections.abc import Iterable, Iterator
+
+import numpy as np
+import numpy.typing as npt
+
+from ...util import fatal
 from ...model import Model
+from ..sizes import SizeDistribution
+from ..streams import make_routed_block, iter_flow_packets, iter_merged_blocks
+from ...topology.sampling import (
+    IndexArray,
+    FloatArray,
+    to_float_list,
+    to_index_list,
+    to_float_array,
+    to_index_array,
+)
+from .block import ArrivalBlock, FlowBlock
+from .flow import Flow
 from .arrival import Arrival
 from .traversal import Traversal
 
 
+"""
+The largest size in bytes that an arrival can have, as sizes are stored in 16 bits
+"""
+MAX_ARRIVAL_SIZE = np.iinfo(np.uint16).max
+
+
 class Traffic(Model):
     """
-    Data structure that holds arrivals
+    Data structure that holds arrivals, in blocks of columns that refer to nodes by their index in an ID table. Generated traffic can instead hold a stream of blocks, which are only made while they are iterated, so that traffic of any duration can be written in constant memory. Traffic can also hold flows, in blocks and streams in the same way, which are only expanded into arrivals when those are asked for
     """
 
-    __arrivals: list[Arrival] = []
+    __ids: list[str]
+    __indices_by_id: dict[str, int] | None
+    __blocks: list[ArrivalBlock]
+    __pending: list[Arrival]  # Added one at a time, and not yet put in a block
+    __chunks: Iterator[ArrivalBlock] | None
+    __streamed: bool
+    __flow_blocks: list[FlowBlock]
+    __pending_flows: list[Flow]
+    __flow_chunks: Iterator[FlowBlock] | None
+    __flows_streamed: bool
+
+    def __init__(
+        self,
+        traffic_id: str,
+        ids: list[str] | None = None,
+        chunks: Iterable[ArrivalBlock] | None = None,
+        flows: Iterable[FlowBlock] | None = None,
+    ) -> None:
+        super().__init__(traffic_id)
+        self.__ids = [] if ids is None else ids
+        self.__indices_by_id = None
+        self.__blocks = []
+        self.__pending = []
+        self.__chunks = None if chunks is None else iter(chunks)
+        self.__streamed = False
+        self.__flow_blocks = []
+        self.__pending_flows = []
+        self.__flow_chunks = None if flows is None else iter(flows)
+        self.__flows_streamed = False
+
+    def __get_index(self, node_id: str) -> int:
+        if self.__indices_by_id is None:
+            self.__indices_by_id = {
+                node_id: index for index, node_id in enumerate(self.__ids)
+            }
+        index = self.__indices_by_id.get(node_id)
+        if index is None:
+            index = len(self.__ids)
+            self.__ids.append(node_id)
+            self.__indices_by_id[node_id] = index
+        return index
+
+    def __flush(self) -> None:
+        if len(self.__pending) == 0:
+            return
+
+        routed = any(arrival.get_path() is not None for arrival in self.__pending)
+        self.__blocks.append(
+            ArrivalBlock.from_lists(
+                [arrival.get_time() for arrival in self.__pending],
+                [self.__get_index(a.get_source()) for a in self.__pending],
+                [self.__get_index(a.get_destination()) for a in self.__pending],
+                [arrival.get_size() for arrival in self.__pending],
+                (
+                    [
+                        [self.__get_index(n) for n in a.get_path() or []]
+                        for a in self.__pending
+                    ]
+                    if routed
+                    else None
+                ),
+            )
+        )
+        self.__pending = []
+
+    def __flush_flows(self) -> None:
+        if len(self.__pending_flows) == 0:
+            return
+
+        # Flows are expanded in order of start, and share their size distributions
+        flows = sorted(self.__pending_flows, key=Flow.get_start)
+        size_distributions: list[SizeDistribution] = []
+        distributions: dict[int, int] = {}
+        for flow in flows:
+            size_distribution = flow.get_size_distribution()
+            if id(size_distribution) not in distributions:
+                distributions[id(size_distribution)] = len(size_distributions)
+                size_distributions.append(size_distribution)
+
+        routed = any(flow.get_path() is not None for flow in flows)
+        self.__flow_blocks.append(
+            FlowBlock.from_lists(
+                [flow.get_start() for flow in flows],
+                [self.__get_index(f.get_source()) for f in flows],
+                [self.__get_index(f.get_destination()) for f in flows],
+                [flow.get_count() for flow in flows],
+                [flow.get_gap() for flow in flows],
+                size_distributions,
+                [distributions[id(f.get_size_distribution())] for f in flows],
+                (
+                    [[self.__get_index(n) for n in f.get_path() or []] for f in flows]
+                    if routed
+                    else None
+                ),
+            )
+        )
+        self.__pending_flows = []
 
     def add_arrival(self, arrival: Arrival) -> None:
-        self.__arrivals.append(arrival)
+        if arrival.get_size() > MAX_ARRIVAL_SIZE:
+            fatal(f"Arrival {arrival.get_id()} is larger than {MAX_ARRIVAL_SIZE} bytes")
+        self.__pending.append(arrival)
+
+    def add_block(self, block: ArrivalBlock) -> None:
+        """
+        Add a block of arrivals whose nodes index the ID table of this traffic
+        """
+        self.__flush()
+        self.__blocks.append(block)
+
+    def add_flow(self, flow: Flow) -> None:
+        if flow.get_size_distribution().get_max() > MAX_ARRIVAL_SIZE:
+            fatal(
+                f"Flow {flow.get_id()} has sizes larger than {MAX_ARRIVAL_SIZE} bytes"
+            )
+        if flow.get_gap() <= 0:
+            fatal(f"Flow {flow.get_id()} must have a gap > 0 between its packets")
+        self.__pending_flows.append(flow)
+
+    def add_flow_block(self, block: FlowBlock) -> None:
+        """
+        Add a block of flows whose nodes index the ID table of this traffic, and that start after the flows that were added before
+        """
+        self.__flush_flows()
+        self.__flow_blocks.append(block)
+
+    def has_flows(self) -> bool:
+        return (
+            len(self.__flow_blocks) > 0
+            or len(self.__pending_flows) > 0
+            or self.__flow_chunks is not None
+        )
 
     def add_random_arrival(self, traversal: Traversal, time: float) -> None:
-        route = traversal.get_random_route()
-        source = route.get_source().get_id()
-        destination = route.get_destination().get_id()
-        self.add_arrival(Arrival(time, source, destination))
+        self.add_random_arrivals(traversal, to_float_array([time]))
+
+    def add_random_arrivals(self, traversal: Traversal, times: FloatArray) -> None:
+        sources, destinations = traversal.get_random_routes(len(times))
+        self.add_routed_arrivals(traversal, times, sources, destinations)
+
+    def add_routed_arrivals(
+        self,
+        traversal: Traversal,
+        times: FloatArray,
+        sources: IndexArray,
+        destinations: IndexArray,
+    ) -> None:
+        # Leaves of the traversal are indexed in this traffic's own ID table
+        indices = to_index_array(
+            [self.__get_index(leaf_id) for leaf_id in traversal.get_leaf_ids()]
+        )
+        block = make_routed_block(traversal, times, sources, destinations)
+        self.add_block(block.relabel(indices))
+
+    def get_ids(self) -> list[str]:
+        return self.__ids
+
+    def iter_blocks(self, expand_flows: bool = True) -> Iterator[ArrivalBlock]:
+        """
+        Iterate over the blocks of arrivals without holding on to streamed ones, which can therefore only be iterated once. The packets of flows are merged in by time, unless `expand_flows` is off
+        """
+        if self.__streamed:
+            fatal(f"Arrivals of traffic {self.get_id()} were already streamed")
+        if expand_flows and self.has_flows():
+            yield from iter_merged_blocks(
+                [
+                    self.iter_blocks(expand_flows=False),
+                    iter_flow_packets(self.iter_flow_blocks()),
+                ]
+            )
+            return
+        self.__flush()
+        yield from self.__blocks
+        if self.__chunks is not None:
+            self.__streamed = True
+            yield from self.__chunks
+
+    def iter_arrivals(self, expand_flows: bool = True) -> Iterator[Arrival]:
+        for block in self.iter_blocks(expand_flows):
+            yield from self.__make_arrivals(block)
+
+    def iter_flow_blocks(self) -> Iterator[FlowBlock]:
+        """
+        Iterate over the blocks of flows as they are, in the same way as the blocks of arrivals
+        """
+        if self.__flows_streamed:
+            fatal(f"Flows of traffic {self.get_id()} were already streamed")
+        self.__flush_flows()
+        yield from self.__flow_blocks
+        if self.__flow_chunks is not None:
+            self.__flows_streamed = True
+            yield from self.__flow_chunks
+
+    def iter_flows(self) -> Iterator[Flow]:
+        for block in self.iter_flow_blocks():
+            yield from self.__make_flows(block)
+
+    def __make_paths(
+        self,
+        length: int,
+        path_offsets: IndexArray | None,
+        path_nodes: npt.NDArray[np.int32] | None,
+    ) -> list[list[str] | None]:
+        if path_offsets is None or path_nodes is None:
+            return [None] * length
+        ids = self.__ids
+        path_ids = [ids[n] for n in to_index_list(path_nodes)]
+        offsets = to_index_list(path_offsets)
+        return [path_ids[offsets[i] : offsets[i + 1]] for i in range(length)]
+
+    def __make_flows(self, block: FlowBlock) -> Iterator[Flow]:
+        ids = self.__ids
+        size_distributions = block.get_size_distributions()
+        paths = self.__make_paths(
+            len(block), block.get_path_offsets(), block.get_path_nodes()
+        )
+
+        starts = to_float_list(block.get_starts())
+        sources = to_index_list(block.get_sources())
+        destinations = to_index_list(block.get_destinations())
+        counts = to_index_list(block.get_counts())
+        gaps = to_float_list(block.get_gaps())
+        distributions = to_index_list(block.get_distributions())
+        for index, path in enumerate(paths):
+            yield Flow(
+                starts[index],
+                ids[sources[index]],
+                ids[destinations[index]],
+                counts[index],
+                gaps[index],
+                size_distributions[distributions[index]],
+                path,
+            )
+
+    def __make_arrivals(self, block: ArrivalBlock) -> Iterator[Arrival]:
+        ids = self.__ids
+        paths = self.__make_paths(
+            len(block), block.get_path_offsets(), block.get_path_nodes()
+        )
+
+        for time, source, destination, size, path in zip(
+            to_float_list(block.get_times()),
+            to_index_list(block.get_sources()),
+            to_index_list(block.get_destinations()),
+            to_index_list(block.get_sizes()),
+            paths,
+        ):
+            yield Arrival(time, ids[source], ids[destination], size, path)
 
     def get_arrivals(self) -> list[Arrival]:
-        return self.__arrivals.copy()
+        if self.__chunks is not None and not self.__streamed:
+            self.__flush()
+            self.__blocks.extend(self.__chunks)
+            self.__chunks = None
+        if self.has_flows() and not self.__flows_streamed:
+            self.__flush()
+            self.__blocks = list(
+                iter_merged_blocks(
+                    [self.__blocks, iter_flow_packets(self.iter_flow_blocks())]
+                )
+            )
+            self.__flow_blocks = []
+            self.__flow_chunks = None
+            self.__flows_streamed = False
+        return list(self.iter_arrivals())
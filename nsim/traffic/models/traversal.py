@@ -1,52 +1,125 @@
-from queue import Queue
-from random import choice
 from typing import cast
 
+import numpy as np
+
 from .route import Route
+from ..reachability import BoolArray, Reachability
+from ...seed import Stream, spawn_seed
 from ...util import fatal
+from ...config import get_config
+from ...topology.graph import to_edge_arrays
+from ...topology.routing import RoutingTable, compute_routing_table
+from ...topology.sampling import IndexArray, to_index_list, empty_indices
 from ...topology.models.leaf import Leaf
 from ...topology.models.node import Node
 
 
 class Traversal:
-    __leaves: list[Leaf]
-    __reachable: dict[Leaf, set[Leaf]]
-    __has_route: bool
+    """
+    Knows which leaves of a node can reach each other, from which random routes are drawn
+    """
+
+    __leaves: list[Leaf] | None  # None in worker processes, which only need the IDs
+    __ids: list[str]
+    __rng: np.random.Generator
+    __reachability: Reachability
+    __routing: RoutingTable | None
 
     def __init__(self, node: Node) -> None:
-        self.__leaves = node.flatten()
-        self.__reachable = {}
-        self.__has_route = False
+        leaves, sources, destinations, bandwidths = to_edge_arrays(node)
+        self.__leaves = leaves
+        self.__ids = [leaf.get_id() for leaf in leaves]
+        self.__rng = np.random.default_rng(spawn_seed(Stream.ROUTES))
+
+        metric = get_config().generation.routing
+        self.__routing = (
+            None
+            if metric is None
+            else compute_routing_table(
+                self.__ids,
+                sources,
+                destinations,
+                bandwidths,
+                metric,
+                get_config().generation.workers,
+            )
+        )
+        self.__reachability = Reachability(len(leaves), sources, destinations)
+
+    def __getstate__(self) -> dict[str, object]:
+        # Worker processes get the arrays of a traversal, but not the graph of its
+        # leaves and edges, which is deep enough to exceed the recursion limit of
+        # pickle, and is not needed to draw or route arrivals. Attributes are stored
+        # under their mangled names, as in the __dict__ of a traversal
+        return {
+            "_Traversal__leaves": None,
+            "_Traversal__ids": self.__ids,
+            "_Traversal__rng": self.__rng,
+            "_Traversal__reachability": self.__reachability,
+            "_Traversal__routing": self.__routing,
+        }
+
+    def get_leaf_ids(self) -> list[str]:
+        return list(self.__ids)
+
+    def get_paths(
+        self,
+        sources: IndexArray,
+        destinations: IndexArray,
+    ) -> tuple[IndexArray, IndexArray] | None:
+        """
+        Get the leaves on the shortest path of every route, and the offset of every path in those leaves, or None if routing is disabled
+        """
+        if self.__routing is None:
+            return None
+        return self.__routing.get_paths(sources, destinations)
 
-        for leaf in self.__leaves:
-            queue: Queue[Leaf] = Queue()
-            queue.put(leaf)
-            reachable: set[Leaf] = {leaf}
+    def reaches(self, sources: IndexArray, destinations: IndexArray) -> BoolArray:
+        """
+        Check for every pair of source and destination leaf indices whether there is a route from the source to the destination
+        """
+        return self.__reachability.reaches(sources, destinations)
 
-            while not queue.empty():
-                for neighbour in queue.get().get_edges():
-                    if neighbour.get_destination() not in reachable:
-                        reachable.add(neighbour.get_destination())
-                        queue.put(neighbour.get_destination())
+    def check_sources(self, sources: IndexArray) -> None:
+        """
+        Exit if any of the source leaf indices cannot reach another leaf
+        """
+        unroutable = self.__reachability.find_unroutable(sources)
+        if unroutable is not None:
+            fatal(f"Leaf {self.__ids[unroutable]} cannot reach any other leaf")
 
-            reachable.remove(leaf)
-            self.__reachable[leaf] = reachable
+    def get_random_destinations(
+        self,
+        sources: IndexArray,
+        rng: np.random.Generator | None = None,
+    ) -> IndexArray:
+        """
+        Draw a destination for every source leaf index, uniformly from the leaves that the source can reach. Destinations are drawn from the route stream unless another generator `rng` is given
+        """
+        rng = self.__rng if rng is None else rng
+        self.check_sources(sources)
+        return self.__reachability.get_random_destinations(sources, rng)
 
-        self.__has_route = any(self.__is_valid_source(leaf) for leaf in self.__leaves)
+    def get_random_routes(
+        self,
+        number_of_routes: int,
+        rng: np.random.Generator | None = None,
+    ) -> tuple[IndexArray, IndexArray]:
+        """
+        Draw routes between leaves that can reach each other, as arrays of source and destination leaf indices. Sources are drawn uniformly from all leaves that have a route, and destinations uniformly from the leaves that their source can reach. Routes are drawn from the route stream unless another generator `rng` is given
+        """
+        rng = self.__rng if rng is None else rng
+        if not self.__reachability.has_routes():
+            if number_of_routes > 0:
+                fatal(f"Topology has no valid routes")
+            return empty_indices(), empty_indices()
 
-    def __is_valid_source(self, leaf: Leaf) -> bool:
-        return len(self.__reachable[leaf]) > 0
+        sources = self.__reachability.get_random_sources(number_of_routes, rng)
+        return sources, self.get_random_destinations(sources, rng)
 
     def get_random_route(self) -> Route:
-        if not self.__has_route:
-            fatal(f"Topology has no valid routes")
-
-        def get_source() -> Leaf:
-            source: Leaf | None = None
-            while source == None or not self.__is_valid_source(cast(Leaf, source)):
-                source = choice(self.__leaves)
-            return cast(Leaf, source)
-
-        source = get_source()
-        destination = choice(list(self.__reachable[source]))
-        return Route(source, destination)
+        sources, destinations = self.get_random_routes(1)
+        leaves = cast(list[Leaf], self.__leaves)
+        source = to_index_list(sources)[0]
+        destination = to_index_list(destinations)[0]
+        return Route(leaves[source], leaves[destination])
@@ -7,17 +7,21 @@ class ConsoleTrafficOutput(ConsoleOutput[Traffic]):
     def __print_arrival(self, arrival: Arrival) -> None:
         a_type = arrival.__class__.__name__
         a_id = arrival.get_id()
-        self._print(a_type, a_id, depth=1)
+        a_path = arrival.get_path()
+        a_message = "" if a_path is None else f"via {' > '.join(a_path)}"
+        self._print(a_type, a_id, message=a_message, depth=1)
 
     def __print_traffic(self, traffic: Traffic) -> None:
         t_type = traffic.__class__.__name__
         t_id = traffic.get_id()
-        t_arrivals = traffic.get_arrivals()
+        t_arrivals = traffic.iter_arrivals()
+        t_first = next(t_arrivals, None)
 
-        if len(t_arrivals) == 0:
+        if t_first is None:
             self._print(t_type, t_id, message="has no traffic")
         else:
             self._print(t_type, t_id, message="has arrivals:")
+            self.__print_arrival(t_first)
             for arrival in t_arrivals:
                 self.__print_arrival(arrival)
 
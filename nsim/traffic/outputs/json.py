@@ -1,12 +1,19 @@
 import json
+import textwrap
+from collections.abc import Callable, Iterator
+from typing import TypeVar
 
 from nsim.output import JsonOutput
 
 from ...util import Json
+from ..models.flow import Flow
 from ..models.arrival import Arrival
 from ..models.traffic import Traffic
 
 
+TItem = TypeVar("TItem")
+
+
 class JsonTrafficOutput(JsonOutput[Traffic]):
     def __make_arrival_data(self, arrival: Arrival) -> Json:
         data = self._make_item(arrival.__class__.__name__, arrival.get_id())
@@ -14,16 +21,53 @@ class JsonTrafficOutput(JsonOutput[Traffic]):
         data["source"] = arrival.get_source()
         data["destination"] = arrival.get_destination()
         data["size"] = arrival.get_size()
+        if arrival.get_path() is not None:
+            data["path"] = arrival.get_path()
         return data
 
-    def __make_traffic_data(self, traffic: Traffic) -> Json:
-        data = self._make_item(traffic.__class__.__name__, traffic.get_id())
-        arrivals_data: list[Json] = []
-        data["arrivals"] = arrivals_data
-        for arrival in traffic.get_arrivals():
-            data["arrivals"].append(self.__make_arrival_data(arrival))
+    def __make_flow_data(self, flow: Flow) -> Json:
+        data = self._make_item(flow.__class__.__name__, flow.get_id())
+        data["start"] = flow.get_start()
+        data["source"] = flow.get_source()
+        data["destination"] = flow.get_destination()
+        data["count"] = flow.get_count()
+        data["gap"] = flow.get_gap()
+        data["sizes"] = flow.get_size_distribution().get_ranges()
+        if flow.get_path() is not None:
+            data["path"] = flow.get_path()
         return data
 
+    def __print_items(
+        self,
+        items: Iterator[TItem],
+        make_data: Callable[[TItem], Json],
+    ) -> None:
+        item = next(items, None)
+        if item is None:
+            print("[]", end="")
+            return
+
+        print("[")
+        while item is not None:
+            item_text = json.dumps(make_data(item), indent=2)
+            item = next(items, None)
+            separator = "," if item is not None else ""
+            print(textwrap.indent(item_text, "    ") + separator)
+        print("  ]", end="")
+
     def run(self, traffic: Traffic) -> None:
-        data = self.__make_traffic_data(traffic)
-        print(json.dumps(data, indent=2))
+        # Arrivals and flows are written one at a time as they are streamed, in the
+        # layout of json.dumps with an indent of 2 for the complete traffic. Fields
+        # of the traffic itself are dumped as an object whose closing brace is left
+        # off. Flows are written as they are, rather than as their packets
+        data = self._make_item(traffic.__class__.__name__, traffic.get_id())
+        print(json.dumps(data, indent=2).removesuffix("\n}") + ",")
+        print('  "arrivals": ', end="")
+        self.__print_items(
+            traffic.iter_arrivals(expand_flows=False),
+            self.__make_arrival_data,
+        )
+        if traffic.has_flows():
+            print(',\n  "flows": ', end="")
+            self.__print_items(traffic.iter_flows(), self.__make_flow_data)
+        print("\n}")
@@ -1,7 +1,10 @@
+import json
 from xml.etree import ElementTree
+from itertools import chain
 
 from nsim.output import XmlOutput
 
+from ..models.flow import Flow
 from ..models.arrival import Arrival
 from ..models.traffic import Traffic
 
@@ -14,19 +17,51 @@ class XmlTrafficOutput(XmlOutput[Traffic]):
             "destination": arrival.get_destination(),
             "size": str(arrival.get_size()),
         }
+        a_path = arrival.get_path()
+        if a_path is not None:
+            attributes["path"] = " ".join(a_path)
         arrival_type = arrival.__class__.__name__.lower()
         return self._make_element(arrival_type, arrival.get_id(), attributes)
 
-    def __make_traffic_element(self, traffic: Traffic) -> ElementTree.Element:
+    def __make_flow_element(self, flow: Flow) -> ElementTree.Element:
+        attributes: dict[str, str] = {
+            "start": str(flow.get_start()),
+            "source": flow.get_source(),
+            "destination": flow.get_destination(),
+            "count": str(flow.get_count()),
+            "gap": str(flow.get_gap()),
+            "sizes": json.dumps(flow.get_size_distribution().get_ranges()),
+        }
+        f_path = flow.get_path()
+        if f_path is not None:
+            attributes["path"] = " ".join(f_path)
+        flow_type = flow.__class__.__name__.lower()
+        return self._make_element(flow_type, flow.get_id(), attributes)
+
+    def run(self, traffic: Traffic) -> None:
+        # Arrivals and flows are written one at a time as they are streamed, in the
+        # layout of ElementTree.indent for the complete traffic. Flows are written as
+        # they are, rather than as their packets
         element = self._make_element(
             traffic.__class__.__name__.lower(),
             traffic.get_id(),
         )
-        for arrival in traffic.get_arrivals():
-            element.append(self.__make_arrival_element(arrival))
-        return element
+        text = ElementTree.tostring(element, encoding="unicode")
 
-    def run(self, traffic: Traffic) -> None:
-        element = self.__make_traffic_element(traffic)
-        ElementTree.indent(element)
-        print(ElementTree.tostring(element, encoding="unicode"))
+        elements = chain(
+            map(
+                self.__make_arrival_element,
+                traffic.iter_arrivals(expand_flows=False),
+            ),
+            map(self.__make_flow_element, traffic.iter_flows()),
+        )
+        child = next(elements, None)
+        if child is None:
+            print(text)
+            return
+
+        print(text.removesuffix(" />") + ">")
+        while child is not None:
+            print(f"  {ElementTree.tostring(child, encoding='unicode')}")
+            child = next(elements, None)
+        print(f"</{element.tag}>")
@@ -0,0 +1,233 @@
+from typing import cast
+
+import numpy as np
+import numpy.typing as npt
+
+from .sampling import AliasTable
+from ..topology.graph import (
+    is_symmetric,
+    find_components,
+    find_strong_components,
+    find_reachable_components,
+)
+from ..topology.sampling import MAX_CHUNK_SIZE, IndexArray
+
+
+"""
+Number of set bits in every byte value, for counting the bits of packed bitsets
+"""
+POPCOUNTS = np.unpackbits(np.arange(256, dtype=np.uint8)[:, None], axis=1).sum(axis=1)
+
+"""
+Number of rounds in which destinations are drawn uniformly from all leaves until one is reachable, after which the reachable leaves of the remaining routes are listed
+"""
+REJECTION_ROUNDS = 8
+
+"""
+Array of flags, such as whether pairs of leaves reach each other
+"""
+BoolArray = npt.NDArray[np.bool_]
+
+
+class Reachability:
+    """
+    Which leaves of a graph, given as arrays of edges between leaf indices, can reach each other, stored per component of leaves, from which random routes are drawn
+    """
+
+    __number_of_leaves: int
+    __labels: IndexArray  # Component of every leaf
+    __members: IndexArray  # Leaves grouped by component
+    __offsets: IndexArray  # Start of every component in the members
+    __positions: IndexArray  # Position of every leaf in the members
+    __sources: IndexArray  # Leaves that reach at least one other leaf
+    __routable: BoolArray  # Whether every leaf is one of the sources
+    __components: AliasTable | None  # Components weighted by size, if symmetric
+    __reachable: npt.NDArray[np.uint8] | None  # Bitsets of reachable components
+
+    def __init__(
+        self,
+        number_of_leaves: int,
+        sources: IndexArray,
+        destinations: IndexArray,
+    ) -> None:
+        self.__number_of_leaves = number_of_leaves
+
+        # Every edge goes both ways in most topologies, so leaves reach exactly the
+        # other leaves in their connected component. Otherwise, leaves reach the
+        # other leaves in their strongly connected component, and every leaf of the
+        # components that it reaches
+        symmetric = is_symmetric(number_of_leaves, sources, destinations)
+        self.__labels = (
+            find_components(number_of_leaves, sources, destinations)
+            if symmetric
+            else find_strong_components(number_of_leaves, sources, destinations)
+        )
+        sizes = np.bincount(self.__labels, minlength=number_of_leaves)
+        self.__members = np.argsort(self.__labels, kind="stable")
+        self.__offsets = np.concatenate([[0], np.cumsum(sizes)])
+        self.__positions = np.empty(number_of_leaves, dtype=np.int64)
+        self.__positions[self.__members] = np.arange(number_of_leaves)
+
+        if symmetric:
+            counts = sizes - 1
+            self.__components = (
+                AliasTable(np.where(counts > 0, sizes, 0)) if counts.any() else None
+            )
+            self.__reachable = None
+        else:
+            self.__reachable = find_reachable_components(
+                self.__labels, sources, destinations
+            )
+            sizes = sizes[: len(self.__reachable)]
+            counts = sizes - 1 + self.__count_reachable(self.__reachable, sizes)
+            self.__components = None
+
+        self.__routable = counts[self.__labels] > 0
+        self.__sources = np.flatnonzero(self.__routable)
+
+    def __count_reachable(
+        self,
+        reachable: npt.NDArray[np.uint8],
+        sizes: IndexArray,
+    ) -> IndexArray:
+        # Count reachable components by their set bits, and then add the extra leaves
+        # of the few components that have more than one
+        counts = np.zeros(len(sizes), dtype=np.int64)
+        chunk_size = max(MAX_CHUNK_SIZE // max(reachable.shape[1], 1), 1)
+        for start in range(0, len(sizes), chunk_size):
+            chunk = reachable[start : start + chunk_size]
+            counts[start : start + chunk_size] = POPCOUNTS[chunk].sum(axis=1)
+        for component in np.flatnonzero(sizes > 1).tolist():
+            bits = reachable[:, component >> 3] >> (component & 7) & 1
+            counts += bits.astype(np.int64) * (sizes[component] - 1)
+        return counts
+
+    def __get_random_directed_destinations(
+        self,
+        sources: IndexArray,
+        rng: np.random.Generator,
+    ) -> IndexArray:
+        reachable = cast(npt.NDArray[np.uint8], self.__reachable)
+        number_of_routes = len(sources)
+        source_components = self.__labels[sources]
+        destinations = np.empty(number_of_routes, dtype=np.int64)
+
+        # Most sources reach a large share of the leaves, so drawing from all leaves
+        # until a reachable one comes up is fast, and just as uniform
+        pending = np.arange(number_of_routes, dtype=np.int64)
+        for _ in range(REJECTION_ROUNDS):
+            candidates = rng.integers(0, self.__number_of_leaves, len(pending))
+            components = self.__labels[candidates]
+            pending_components = source_components[pending]
+            bits = reachable[pending_components, components >> 3] >> (components & 7)
+            accepted = (candidates != sources[pending]) & (
+                (components == pending_components) | (bits & 1 == 1)
+            )
+            destinations[pending[accepted]] = candidates[accepted]
+            pending = pending[~accepted]
+
+        # Sources that reach few leaves draw from a list of their reachable leaves,
+        # which is built once for all pending routes from the same component
+        draws = rng.random(len(pending))
+        sizes = np.diff(self.__offsets)
+        order = np.argsort(source_components[pending], kind="stable")
+        groups, starts = np.unique(source_components[pending][order], return_index=True)
+        ends = np.append(starts[1:], len(pending))
+        for component, start, end in zip(groups.tolist(), starts, ends):
+            routes = order[start:end]
+            bits = np.unpackbits(
+                reachable[component],
+                count=len(reachable),
+                bitorder="little",
+            )
+            candidates = np.concatenate([[component], np.flatnonzero(bits)])
+            weights = sizes[candidates]
+            weights[0] -= 1
+            cumulative = np.cumsum(weights)
+
+            # Pick the k-th leaf among the candidate components, skipping the source
+            # within its own component
+            k = (draws[routes] * cumulative[-1]).astype(np.int64)
+            picked = np.searchsorted(cumulative, k, side="right")
+            offsets = k - cumulative[picked] + weights[picked]
+            own = picked == 0
+            own_positions = self.__positions[sources[pending[routes[own]]]]
+            offsets[own] += offsets[own] >= own_positions - self.__offsets[component]
+            destinations[pending[routes]] = self.__members[
+                self.__offsets[candidates[picked]] + offsets
+            ]
+
+        return destinations
+
+    def __get_random_symmetric_destinations(
+        self,
+        sources: IndexArray,
+        rng: np.random.Generator,
+    ) -> IndexArray:
+        # Destinations are drawn from the other leaves in the component of their
+        # source, by skipping over the source
+        starts = self.__offsets[self.__labels[sources]]
+        sizes = self.__offsets[self.__labels[sources] + 1] - starts
+        offsets = (rng.random(len(sources)) * (sizes - 1)).astype(np.int64)
+        offsets += offsets >= self.__positions[sources] - starts
+        destinations: IndexArray = self.__members[starts + offsets]
+        return destinations
+
+    def reaches(self, sources: IndexArray, destinations: IndexArray) -> BoolArray:
+        """
+        Check for every pair of source and destination leaf indices whether there is a route from the source to the destination
+        """
+        source_labels = self.__labels[sources]
+        destination_labels = self.__labels[destinations]
+        reached: BoolArray = (source_labels == destination_labels) & (
+            sources != destinations
+        )
+        if self.__reachable is not None:
+            bits = self.__reachable[source_labels, destination_labels >> 3]
+            reached |= (bits >> (destination_labels & 7) & 1).astype(bool)
+        return reached
+
+    def has_routes(self) -> bool:
+        return len(self.__sources) > 0
+
+    def find_unroutable(self, sources: IndexArray) -> int | None:
+        """
+        Find the first of the source leaf indices that cannot reach another leaf, if any
+        """
+        unroutable = sources[~self.__routable[sources]]
+        return int(unroutable[0]) if len(unroutable) > 0 else None
+
+    def get_random_destinations(
+        self,
+        sources: IndexArray,
+        rng: np.random.Generator,
+    ) -> IndexArray:
+        """
+        Draw a destination for every source leaf index, uniformly from the leaves that the source can reach. Every source must reach another leaf
+        """
+        if self.__reachable is not None:
+            return self.__get_random_directed_destinations(sources, rng)
+        return self.__get_random_symmetric_destinations(sources, rng)
+
+    def get_random_sources(
+        self,
+        number_of_routes: int,
+        rng: np.random.Generator,
+    ) -> IndexArray:
+        """
+        Draw sources uniformly from all leaves that have a route, of which there must be one
+        """
+        if self.__reachable is not None:
+            sources: IndexArray = self.__sources[
+                rng.integers(0, len(self.__sources), number_of_routes)
+            ]
+            return sources
+
+        # Picking a component by size and then a leaf within it picks sources
+        # uniformly
+        components = cast(AliasTable, self.__components).sample(rng, number_of_routes)
+        starts = self.__offsets[components]
+        sizes = self.__offsets[components + 1] - starts
+        offsets = (rng.random(number_of_routes) * sizes).astype(np.int64)
+        sources = self.__members[starts + offsets]
+        return sources
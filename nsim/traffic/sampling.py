@@ -0,0 +1,472 @@
+import json
+import heapq
+import tempfile
+from collections.abc import Iterator
+
+import numpy as np
+import numpy.typing as npt
+
+from ..seed import Stream, spawn_seed
+from ..topology.sampling import IndexArray, FloatArray
+from .sizes import SIZE_RANGES, SizeDistribution
+
+
+"""
+The maximum number of arrivals drawn at once, which bounds the memory used while traffic is streamed
+"""
+MAX_CHUNK_SIZE = 2**16
+
+"""
+The number of arrivals drawn at once for every source of a merged process, which bounds the memory used per source
+"""
+SOURCE_CHUNK_SIZE = 32
+
+"""
+The maximum number of ON/OFF cycles drawn at once for every source that is behind
+"""
+MAX_CYCLES = 32
+
+"""
+The number of weights whose alias tables are built at once, which bounds the memory used while building them
+"""
+MAX_ALIAS_BATCH_SIZE = 2**22
+
+
+class AliasTable:
+    """
+    Discrete distribution over the indices of a list of weights, from which any number of indices are drawn in constant time each with Vose's alias method. Every index owns a column that it fills up to its probability, and the rest of the column is given to an index with more than its share
+    """
+
+    __probabilities: FloatArray
+    __aliases: IndexArray
+
+    def __init__(self, weights: npt.ArrayLike) -> None:
+        scaled = np.asarray(weights, dtype=np.float64)
+        scaled = scaled * (len(scaled) / scaled.sum())
+        probabilities = np.ones(len(scaled), dtype=np.float64)
+        aliases = np.arange(len(scaled), dtype=np.int64)
+
+        remaining: list[float] = scaled.tolist()
+        small = [i for i, weight in enumerate(remaining) if weight < 1]
+        large = [i for i, weight in enumerate(remaining) if weight >= 1]
+        while small and large:
+            i = small.pop()
+            j = large.pop()
+            probabilities[i] = remaining[i]
+            aliases[i] = j
+            remaining[j] -= 1 - remaining[i]
+            (small if remaining[j] < 1 else large).append(j)
+
+        self.__probabilities = probabilities
+        self.__aliases = aliases
+
+    def __len__(self) -> int:
+        return len(self.__aliases)
+
+    def sample(self, rng: np.random.Generator, size: int) -> IndexArray:
+        columns = rng.integers(0, len(self.__aliases), size, dtype=np.int64)
+        keep = rng.random(size) < self.__probabilities[columns]
+        return np.where(keep, columns, self.__aliases[columns])
+
+
+class AliasMatrix:
+    """
+    Discrete distributions over the columns of every row of a matrix of weights, from which a column is drawn for any number of rows in constant time each, with an alias table per row. Tables are built by sweeping, which gives the same tables as AliasTable when small and large columns are taken in order, but with prefix sums rather than a loop: every small column is filled up from the large column whose excess covers the start of its deficit, and a large column that drops below its share is filled up from the next large column. Tables take 8 bytes per weight, so tables that do not fit in one batch are memory-mapped to temporary files rather than held in memory
+    """
+
+    __probabilities: npt.NDArray[np.float32]
+    __aliases: npt.NDArray[np.int32]
+
+    def __init__(self, weights: npt.NDArray[np.float64]) -> None:
+        number_of_rows, number_of_columns = weights.shape
+        if number_of_rows * number_of_columns <= MAX_ALIAS_BATCH_SIZE:
+            self.__probabilities = np.empty(weights.shape, dtype=np.float32)
+            self.__aliases = np.empty(weights.shape, dtype=np.int32)
+        else:
+            with tempfile.TemporaryFile() as file:
+                self.__probabilities = np.memmap(
+                    file, dtype=np.float32, mode="w+", shape=weights.shape
+                )
+            with tempfile.TemporaryFile() as file:
+                self.__aliases = np.memmap(
+                    file, dtype=np.int32, mode="w+", shape=weights.shape
+                )
+
+        batch_size = max(MAX_ALIAS_BATCH_SIZE // max(number_of_columns, 1), 1)
+        for start in range(0, number_of_rows, batch_size):
+            end = min(start + batch_size, number_of_rows)
+            batch = np.asarray(weights[start:end], dtype=np.float64)
+            probabilities, aliases = self.__build(batch)
+            self.__probabilities[start:end] = probabilities
+            self.__aliases[start:end] = aliases
+
+    def __build(self, weights: FloatArray) -> tuple[FloatArray, IndexArray]:
+        number_of_rows, number_of_columns = weights.shape
+        sums = weights.sum(axis=1, keepdims=True)
+        scale = number_of_columns / np.where(sums > 0, sums, 1)
+        scaled = np.where(sums > 0, weights * scale, 1)
+
+        # Small columns come first and large columns last in every row. Deficits
+        # of small columns and excesses of large columns are laid out on one line
+        # per row, and rows are laid out after each other on the same line
+        order = np.argsort(scaled >= 1, axis=1, kind="stable")
+        scaled = np.take_along_axis(scaled, order, axis=1).ravel()
+        is_small = scaled < 1
+        smalls = np.flatnonzero(is_small)
+        larges = np.flatnonzero(~is_small)
+
+        # In a batch without small columns, such as one of rows of zeros, every
+        # column already has its full share. In a batch without large columns,
+        # which only rounding errors cause, no column has anything to give
+        if len(smalls) == 0 or len(larges) == 0:
+            return (
+                np.ones(weights.shape, dtype=np.float64),
+                np.tile(
+                    np.arange(number_of_columns, dtype=np.int64), (number_of_rows, 1)
+                ),
+            )
+        small_rows = smalls // number_of_columns
+        large_rows = larges // number_of_columns
+
+        row_offsets = np.repeat(
+            np.arange(number_of_rows) * (number_of_columns + 1.0),
+            number_of_columns,
+        )
+        ends = np.where(is_small, 1 - scaled, 0).reshape(weights.shape)
+        ends = np.cumsum(ends, axis=1).ravel() + row_offsets
+        small_ends = ends[smalls]
+        small_starts = small_ends - (1 - scaled[smalls])
+        ends = np.where(is_small, 0, scaled - 1).reshape(weights.shape)
+        ends = np.cumsum(ends, axis=1).ravel() + row_offsets
+        large_ends = ends[larges]
+
+        # Both are sorted, so merging them counts the larges that end at or before
+        # the start of every small, and the smalls that start before the end of
+        # every large
+        merged = np.argsort(np.concatenate([large_ends, small_starts]), kind="stable")
+        positions = np.empty(len(merged), dtype=np.int64)
+        positions[merged] = np.arange(len(merged))
+        larges_before = positions[len(larges) :] - np.arange(len(smalls))
+        smalls_before = positions[: len(larges)] - np.arange(len(larges))
+
+        # A small column is filled from the large column whose excess covers the
+        # start of its deficit. Rounding errors can push a start beyond the excess
+        # of the last large column of its row
+        large_counts = np.bincount(large_rows, minlength=number_of_rows)
+        last_larges = np.cumsum(large_counts) - 1
+        has_donor = large_counts[small_rows] > 0
+        donors = np.where(
+            has_donor, np.minimum(larges_before, last_larges[small_rows]), 0
+        )
+
+        # A large column serves every small column whose deficit starts within its
+        # excess, and whatever the last one needs beyond that is taken from its own
+        # column, which is filled from the next large column
+        served = np.maximum(smalls_before - 1, 0)
+        has_served = (smalls_before > 0) & (small_rows[served] == large_rows)
+        overshoots = np.where(has_served, small_ends[served] - large_ends, 0)
+        is_last = np.append(large_rows[1:] != large_rows[:-1], True)
+        next_larges = np.minimum(np.arange(1, len(larges) + 1), len(larges) - 1)
+
+        probabilities = np.ones(len(scaled), dtype=np.float64)
+        aliases = np.arange(len(scaled), dtype=np.int64)
+        probabilities[smalls] = np.where(has_donor, scaled[smalls], 1)
+        aliases[smalls] = np.where(has_donor, larges[donors], smalls)
+        probabilities[larges] = np.where(is_last, 1, 1 - np.clip(overshoots, 0, 1))
+        aliases[larges] = np.where(is_last, larges, larges[next_larges])
+
+        # Tables are built over the sorted columns, so map them back
+        columns = np.take_along_axis(
+            order,
+            (aliases % number_of_columns).reshape(weights.shape),
+            axis=1,
+        )
+        mapped_probabilities = np.empty(weights.shape, dtype=np.float64)
+        mapped_aliases = np.empty(weights.shape, dtype=np.int64)
+        np.put_along_axis(
+            mapped_probabilities, order, probabilities.reshape(weights.shape), axis=1
+        )
+        np.put_along_axis(mapped_aliases, order, columns, axis=1)
+        return mapped_probabilities, mapped_aliases
+
+    def sample(self, rng: np.random.Generator, rows: IndexArray) -> IndexArray:
+        number_of_columns = self.__aliases.shape[1]
+        columns = rng.integers(0, number_of_columns, len(rows), dtype=np.int64)
+        keep = rng.random(len(rows)) < self.__probabilities[rows, columns]
+        return np.where(keep, columns, self.__aliases[rows, columns].astype(np.int64))
+
+
+def iter_poisson_times(
+    rate: float,
+    duration: float,
+    rng: np.random.Generator,
+    start: float = 0,
+) -> Iterator[FloatArray]:
+    """
+    Sample the arrival times of a Poisson process with `rate` arrivals per second between `start` and `duration`, in chunks in time order. Exponential gaps are drawn in chunks that cover the expected number of arrivals with a margin, and summed into times
+    """
+    if rate <= 0 or start >= duration:
+        return
+
+    expected = (duration - start) * rate
+    chunk_size = min(int(expected + 4 * np.sqrt(expected)) + 16, MAX_CHUNK_SIZE)
+
+    time = start
+    while time < duration:
+        times = time + np.cumsum(rng.exponential(1 / rate, size=chunk_size))
+        yield times[times < duration]
+        time = float(times[-1])
+
+
+def to_lambdas(text: str) -> list[float]:
+    """
+    Parse a list of rates, which is a JSON list of floats
+    """
+    data = json.loads(text)
+    if not isinstance(data, list):
+        raise ValueError(f"{text} is not a JSON list")
+    try:
+        return [float(rate) for rate in data]
+    except TypeError as e:
+        raise ValueError(e)
+
+
+def iter_constant_times(
+    rate: float,
+    duration: float,
+    first: int,
+    end: int,
+) -> Iterator[FloatArray]:
+    """
+    Make the times of the `first`-th up to the `end`-th arrival, which occur every `rate` seconds until `duration`, in chunks in time order. Times are multiples of the interval, which does not accumulate rounding errors like repeatedly adding it does
+    """
+    for start in range(first, end, MAX_CHUNK_SIZE):
+        times = rate * np.arange(start, min(start + MAX_CHUNK_SIZE, end))
+        yield times[times < duration]
+
+
+def iter_varying_poisson_times(
+    table_times: FloatArray,
+    table_rates: FloatArray,
+    duration: float,
+    rng: np.random.Generator,
+    start: float = 0,
+) -> Iterator[FloatArray]:
+    """
+    Sample the arrival times of a Poisson process whose rate varies over time between `start` and `duration`, in chunks in time order. The rate is interpolated linearly between the points of a table that covers one period, from time 0 up to its last time, after which it repeats. Candidates are drawn at the peak rate, and each is kept with the probability of the rate at its time relative to the peak
+    """
+    peak = float(table_rates.max(initial=0))
+    period = float(table_times[-1])
+    for times in iter_poisson_times(peak, duration, rng, start):
+        rates = np.interp(times % period, table_times, table_rates)
+        yield times[rng.random(len(times)) * peak < rates]
+
+
+def iter_train_times(
+    inter_train_time: float,
+    inter_car_time: float,
+    max_train_length: int,
+    duration: float,
+    rng: np.random.Generator,
+) -> Iterator[tuple[FloatArray, IndexArray]]:
+    """
+    Sample the arrival times of packet trains of 1 to `max_train_length` cars before `duration`, in chunks of whole trains in time order, along with the number of the train of every car within its chunk. A train starts an exponential gap after the last car of the previous train, and its cars follow each other by exponential gaps, so all times are the cumulative sum of one sequence of gaps in which every train contributes a train gap followed by its car gaps
+    """
+    mean_length = (1 + max_train_length) / 2
+    mean_train_time = inter_train_time + (mean_length - 1) * inter_car_time
+    expected = duration / mean_train_time
+    chunk_size = min(
+        int(expected + 4 * np.sqrt(expected)) + 16,
+        max(MAX_CHUNK_SIZE // max_train_length, 1),
+    )
+
+    time = 0.0
+    while time < duration:
+        lengths = rng.integers(1, max_train_length + 1, chunk_size, dtype=np.int64)
+        starts = np.cumsum(lengths) - lengths
+        gaps = rng.exponential(inter_car_time, int(lengths.sum()))
+        gaps[starts] = rng.exponential(inter_train_time, chunk_size)
+
+        times = time + np.cumsum(gaps)
+        trains = np.repeat(np.arange(chunk_size, dtype=np.int64), lengths)
+        yield times[times < duration], trains[times < duration]
+        time = float(times[-1])
+
+
+def iter_source_times(
+    rates: FloatArray,
+    duration: float,
+    rng: np.random.Generator,
+) -> Iterator[tuple[FloatArray, IndexArray]]:
+    """
+    Sample the arrival times of an independent Poisson process for every source, with `rates[i]` arrivals per second for source i, merged in chunks in time order along with the source of every arrival. A heap of the sources ordered by the time up to which they have drawn yields the sources that draw their next chunk. Arrivals before the top of the heap are final, as no source draws any earlier ones, so memory grows with the number of sources rather than the duration
+    """
+    active = np.flatnonzero(rates > 0)
+    if len(active) == 0 or duration <= 0:
+        return
+
+    # Every round, the sources that have not drawn past a horizon draw their next
+    # chunk. Chunks cover about one horizon of their source, so that every round
+    # draws about as many arrivals as a chunk of traffic. Sizes are powers of two,
+    # so that sources with the same size draw their chunks at once
+    horizon = MAX_CHUNK_SIZE / float(rates[active].sum())
+    expected = np.maximum(rates * horizon, SOURCE_CHUNK_SIZE)
+    chunk_sizes = 2 ** np.ceil(np.log2(expected)).astype(np.int64)
+    heap = [(0.0, source) for source in active.tolist()]
+
+    staged_times: list[FloatArray] = []
+    staged_sources: list[IndexArray] = []
+    staged = 0
+    held = 0
+    while True:
+        limit = heap[0][0] + horizon
+        batch = [heapq.heappop(heap)]
+        while len(heap) > 0 and heap[0][0] < limit:
+            batch.append(heapq.heappop(heap))
+        starts = np.array([start for start, _ in batch], dtype=np.float64)
+        sources = np.array([source for _, source in batch], dtype=np.int64)
+
+        sizes = chunk_sizes[sources]
+        for size in np.unique(sizes).tolist():
+            group = sizes == size
+            gaps = rng.exponential(size=(int(group.sum()), size))
+            times = starts[group, None] + np.cumsum(
+                gaps / rates[sources[group], None], axis=1
+            )
+
+            for end, source in zip(times[:, -1].tolist(), sources[group].tolist()):
+                if end < duration:
+                    heapq.heappush(heap, (end, source))
+            before = times < duration
+            staged_times.append(times[before])
+            staged_sources.append(np.repeat(sources[group], before.sum(axis=1)))
+            staged += len(staged_times[-1])
+
+        # Arrivals that were held back are checked again at every merge, so merges
+        # wait until the newly drawn arrivals outnumber them
+        if staged < max(MAX_CHUNK_SIZE, held) and len(heap) > 0:
+            continue
+        watermark = heap[0][0] if len(heap) > 0 else duration
+        merged_times = np.concatenate(staged_times)
+        merged_sources = np.concatenate(staged_sources)
+        final = merged_times < watermark
+        order = np.argsort(merged_times[final])
+        final_times = merged_times[final][order]
+        final_sources = merged_sources[final][order]
+
+        for start in range(0, len(final_times), MAX_CHUNK_SIZE):
+            end = start + MAX_CHUNK_SIZE
+            yield final_times[start:end], final_sources[start:end]
+        if len(heap) == 0:
+            return
+        staged_times = [merged_times[~final]]
+        staged_sources = [merged_sources[~final]]
+        held = len(staged_times[0])
+        staged = 0
+
+
+def __sample_pareto(
+    rng: np.random.Generator,
+    mean: float,
+    shape: float,
+    size: tuple[int, int],
+) -> FloatArray:
+    scale = mean * (shape - 1) / shape
+    return (rng.pareto(shape, size) + 1) * scale
+
+
+def iter_on_off_times(
+    number_of_sources: int,
+    rate: float,
+    mean_on_time: float,
+    mean_off_time: float,
+    shape: float,
+    duration: float,
+    rng: np.random.Generator,
+) -> Iterator[tuple[FloatArray, IndexArray]]:
+    """
+    Sample the arrival times of `number_of_sources` sources that alternate between ON and OFF periods, merged in chunks in time order along with the source of every arrival. Periods follow Pareto distributions with the given means and `shape`, which give long-range dependence for shapes below 2, and sources send `rate` arrivals per second while ON. Time is split into windows of about one chunk of arrivals, in which every source that is behind draws its next cycles at once, and the arrivals of all ON periods are expanded at once. The ON period that crosses the end of a window is carried over into the next
+    """
+    if number_of_sources <= 0 or rate <= 0 or duration <= 0:
+        return
+
+    mean_cycle = mean_on_time + mean_off_time
+    expected_rate = number_of_sources * rate * mean_on_time / mean_cycle
+    window = MAX_CHUNK_SIZE / expected_rate
+    number_of_cycles = min(int(np.ceil(window / mean_cycle)) + 1, MAX_CYCLES)
+
+    # Sources start at random phases so that they are not in sync. Arrivals of an
+    # ON period are counted from its start, so that the windows they are split
+    # over agree on which arrivals fall on either side of their boundaries
+    cycle_ends = -rng.random(number_of_sources) * mean_cycle
+    on_starts = cycle_ends.copy()
+    on_ends = cycle_ends.copy()
+
+    def expand(
+        starts: FloatArray,
+        ends: FloatArray,
+        sources: IndexArray,
+        window_start: float,
+        window_end: float,
+    ) -> tuple[FloatArray, IndexArray]:
+        first = np.maximum(np.ceil((window_start - starts) * rate), 0)
+        last = np.ceil((np.minimum(ends, window_end) - starts) * rate)
+        counts = np.maximum(last - first, 0).astype(np.int64)
+        offsets = np.repeat(first - (np.cumsum(counts) - counts), counts)
+        offsets += np.arange(int(counts.sum()), dtype=np.float64)
+        return np.repeat(starts, counts) + offsets / rate, np.repeat(sources, counts)
+
+    all_sources = np.arange(number_of_sources, dtype=np.int64)
+    for window_number in range(int(np.ceil(duration / window))):
+        window_start = window_number * window
+        window_end = min((window_number + 1) * window, duration)
+        chunks = [expand(on_starts, on_ends, all_sources, window_start, window_end)]
+
+        behind = np.flatnonzero(cycle_ends < window_end)
+        while len(behind) > 0:
+            size = (len(behind), number_of_cycles)
+            on = __sample_pareto(rng, mean_on_time, shape, size)
+            lengths = on + __sample_pareto(rng, mean_off_time, shape, size)
+            ends = cycle_ends[behind, None] + np.cumsum(lengths, axis=1)
+            starts = ends - lengths
+            started = starts < window_end
+            sources = np.broadcast_to(behind[:, None], size)[started]
+            chunks.append(
+                expand(
+                    starts[started],
+                    (starts + on)[started],
+                    sources,
+                    window_start,
+                    window_end,
+                )
+            )
+
+            # The last cycle that started is carried over
+            rows = np.arange(len(behind))
+            last = started.sum(axis=1) - 1
+            on_starts[behind] = starts[rows, last]
+            on_ends[behind] = starts[rows, last] + on[rows, last]
+            cycle_ends[behind] = ends[rows, last]
+            behind = behind[cycle_ends[behind] < window_end]
+
+        times = np.concatenate([times for times, _ in chunks])
+        sources = np.concatenate([sources for _, sources in chunks])
+        order = np.argsort(times, kind="stable")
+        for start in range(0, len(order), MAX_CHUNK_SIZE):
+            chunk = order[start : start + MAX_CHUNK_SIZE]
+            yield times[chunk], sources[chunk]
+
+
+def sample_sizes(
+    number_of_sizes: int,
+    rng: np.random.Generator | None = None,
+    distribution: SizeDistribution | None = None,
+) -> IndexArray:
+    """
+    Sample the sizes in bytes of messages from `distribution`, or the default uniform distribution if none is given, from the size stream unless another generator `rng` is given
+    """
+    if rng is None:
+        rng = np.random.default_rng(spawn_seed(Stream.SIZES))
+    if distribution is None:
+        distribution = SizeDistribution(SIZE_RANGES["uniform"])
+    return distribution.sample(rng, number_of_sizes)
@@ -0,0 +1,124 @@
+import json
+
+import numpy as np
+
+from ..topology.sampling import IndexArray, FloatArray
+
+
+"""
+Range of message sizes in bytes, typical for TCP/IP traffic
+"""
+MIN_SIZE = 512
+MAX_SIZE = 1500
+
+"""
+Named distributions of message sizes, as ranges of sizes in bytes with their weights. IMIX is the simple Internet mix of 40, 576 and 1500 byte packets in a ratio of 7:4:1
+"""
+SIZE_RANGES = {
+    "uniform": [(MIN_SIZE, MAX_SIZE, 1.0)],
+    "imix": [(40, 40, 7.0), (576, 576, 4.0), (1500, 1500, 1.0)],
+}
+
+
+class SizeDistribution:
+    """
+    Distribution of message sizes in bytes, as a mixture of ranges of sizes that are each drawn uniformly. Any number of sizes are drawn at once by inverting the cumulative distribution of the mixture, with one random number per size
+    """
+
+    __mins: IndexArray
+    __counts: IndexArray  # Number of sizes in every range
+    __ends: FloatArray  # Cumulative probability at the end of every range
+    __probabilities: FloatArray
+
+    def __init__(self, ranges: list[tuple[int, int, float]]) -> None:
+        """
+        Make a mixture of the (min, max, weight) `ranges`, in which both min and max are included
+        """
+        if len(ranges) == 0:
+            raise ValueError("A size distribution needs at least one range")
+        mins, maxes, weights = (np.array(column) for column in zip(*ranges))
+        if (mins < 1).any() or (maxes < mins).any():
+            raise ValueError("Sizes must be >= 1, and ranges must end after they start")
+        if not ((weights >= 0) & np.isfinite(weights)).all() or weights.sum() <= 0:
+            raise ValueError("Weights must be >= 0, and at least one must be > 0")
+
+        # Ranges without weight are never drawn, so they are left out
+        used = weights > 0
+        self.__mins = mins[used].astype(np.int64)
+        self.__counts = (maxes - mins + 1)[used].astype(np.int64)
+        self.__probabilities = weights[used].astype(np.float64) / weights.sum()
+        self.__ends = np.cumsum(self.__probabilities)
+        self.__ends[-1] = 1
+
+    def get_ranges(self) -> list[tuple[int, int, float]]:
+        """
+        Get the (min, max, probability) ranges of the mixture, from which the same distribution can be made again
+        """
+        return list(
+            zip(
+                self.__mins.tolist(),
+                (self.__mins + self.__counts - 1).tolist(),
+                self.__probabilities.tolist(),
+            )
+        )
+
+    def get_max(self) -> int:
+        return int((self.__mins + self.__counts).max()) - 1
+
+    def sample(self, rng: np.random.Generator, size: int) -> IndexArray:
+        u = rng.random(size)
+        ranges = np.searchsorted(self.__ends, u, side="right")
+
+        # The position of u within its range is itself uniform, and picks the size
+        starts = self.__ends[ranges] - self.__probabilities[ranges]
+        fractions = (u - starts) / self.__probabilities[ranges]
+        offsets = (fractions * self.__counts[ranges]).astype(np.int64)
+        sizes: IndexArray = self.__mins[ranges] + np.clip(
+            offsets, 0, self.__counts[ranges] - 1
+        )
+        return sizes
+
+
+def make_empirical_sizes(points: list[tuple[int, float]]) -> SizeDistribution:
+    """
+    Make the distribution of sizes whose cumulative probability is given at the (size, cumulative probability) `points`, with sizes between two points drawn uniformly. Probabilities are scaled so that the last one is 1
+    """
+    sizes = [size for size, _ in points]
+    probabilities = [probability for _, probability in points]
+    if any(b <= a for a, b in zip(sizes, sizes[1:])):
+        raise ValueError("Sizes of a cumulative distribution must increase")
+    if any(b < a for a, b in zip(probabilities, probabilities[1:])):
+        raise ValueError("Probabilities of a cumulative distribution must not decrease")
+
+    # The first point is the probability of its size alone, and every next point
+    # adds the probability of the sizes after the previous point up to itself
+    return SizeDistribution(
+        [(sizes[0], sizes[0], probabilities[0])]
+        + [
+            (a + 1, b, q - p)
+            for a, b, p, q in zip(sizes, sizes[1:], probabilities, probabilities[1:])
+        ]
+    )
+
+
+def to_size_distribution(text: str) -> SizeDistribution:
+    """
+    Parse a distribution of sizes, which is the name of one of SIZE_RANGES, or a JSON list or the path to a JSON file of either [min, max, weight] ranges or [size, cumulative probability] points
+    """
+    if text in SIZE_RANGES:
+        return SizeDistribution(SIZE_RANGES[text])
+    try:
+        if text.lstrip().startswith("["):
+            data = json.loads(text)
+        else:
+            with open(text) as file:
+                data = json.load(file)
+        if all(len(item) == 2 for item in data):
+            return make_empirical_sizes(
+                [(int(size), float(probability)) for size, probability in data]
+            )
+        return SizeDistribution(
+            [(int(low), int(high), float(weight)) for low, high, weight in data]
+        )
+    except (OSError, TypeError) as e:
+        raise ValueError(e)
@@ -0,0 +1,252 @@
+from collections.abc import Iterable, Iterator
+
+import numpy as np
+import numpy.typing as npt
+
+from ..util import fatal
+from ..seed import Stream, spawn_seed
+from .sizes import SizeDistribution
+from .sampling import MAX_CHUNK_SIZE, sample_sizes
+from ..topology.sampling import IndexArray, FloatArray
+from .models.block import ArrivalBlock, FlowBlock, take_paths
+from .models.traversal import Traversal
+
+
+def make_random_block(
+    traversal: Traversal,
+    times: FloatArray,
+    rng: np.random.Generator | None = None,
+    size_distribution: SizeDistribution | None = None,
+) -> ArrivalBlock:
+    """
+    Make a block with an arrival at each of `times`, each over its own random route, with sources and destinations indexing the leaves of `traversal`. Routes and sizes are drawn from their own streams unless a generator `rng` is given
+    """
+    sources, destinations = traversal.get_random_routes(len(times), rng)
+    return make_routed_block(
+        traversal, times, sources, destinations, rng, size_distribution
+    )
+
+
+def make_routed_block(
+    traversal: Traversal,
+    times: FloatArray,
+    sources: IndexArray,
+    destinations: IndexArray,
+    rng: np.random.Generator | None = None,
+    size_distribution: SizeDistribution | None = None,
+) -> ArrivalBlock:
+    """
+    Make a block with an arrival at each of `times` from and to the leaves of `traversal` with the given indices, each with a size drawn from `size_distribution`, along with its path if routing is enabled
+    """
+    sizes = sample_sizes(len(times), rng, size_distribution)
+    paths = traversal.get_paths(sources, destinations)
+    if paths is None:
+        return ArrivalBlock(times, sources, destinations, sizes)
+    return ArrivalBlock(times, sources, destinations, sizes, *paths)
+
+
+def make_train_block(
+    traversal: Traversal,
+    times: FloatArray,
+    trains: IndexArray,
+    size_distribution: SizeDistribution | None = None,
+) -> ArrivalBlock:
+    """
+    Make a block with an arrival at each of `times`, the cars of the numbered `trains`, where every car follows the random route of its train. Trains are numbered from 0 within the block
+    """
+    number_of_trains = int(trains[-1]) + 1 if len(trains) > 0 else 0
+    sources, destinations = traversal.get_random_routes(number_of_trains)
+    return make_routed_block(
+        traversal,
+        times,
+        sources[trains],
+        destinations[trains],
+        size_distribution=size_distribution,
+    )
+
+
+def make_flow_block(
+    traversal: Traversal,
+    starts: FloatArray,
+    sources: IndexArray,
+    destinations: IndexArray,
+    counts: IndexArray,
+    gaps: FloatArray,
+    size_distribution: SizeDistribution,
+) -> FlowBlock:
+    """
+    Make a block with a flow at each of `starts` from and to the leaves of `traversal` with the given indices, whose packets have sizes drawn from `size_distribution`, along with its path if routing is enabled
+    """
+    paths = traversal.get_paths(sources, destinations)
+    if paths is None:
+        return FlowBlock(
+            starts, sources, destinations, counts, gaps, [size_distribution]
+        )
+    return FlowBlock(
+        starts,
+        sources,
+        destinations,
+        counts,
+        gaps,
+        [size_distribution],
+        None,
+        *paths,
+    )
+
+
+def __expand_flows(
+    block: FlowBlock,
+    flows: IndexArray,
+    firsts: IndexArray,
+    ends: IndexArray,
+    rng: np.random.Generator,
+) -> ArrivalBlock:
+    counts = ends - firsts
+    packet_flows = np.repeat(flows, counts)
+    packets = np.repeat(firsts - (np.cumsum(counts) - counts), counts)
+    packets += np.arange(len(packet_flows), dtype=np.int64)
+    times = block.get_starts()[packet_flows] + packets * block.get_gaps()[packet_flows]
+
+    distributions = block.get_distributions()[packet_flows]
+    sizes = np.empty(len(packet_flows), dtype=np.int64)
+    size_distributions = block.get_size_distributions()
+    for distribution in np.unique(distributions).tolist():
+        chosen = distributions == distribution
+        sizes[chosen] = size_distributions[distribution].sample(rng, int(chosen.sum()))
+
+    sources = block.get_sources()[packet_flows]
+    destinations = block.get_destinations()[packet_flows]
+    path_offsets = block.get_path_offsets()
+    path_nodes = block.get_path_nodes()
+    if path_offsets is None or path_nodes is None:
+        return ArrivalBlock(times, sources, destinations, sizes)
+    paths = take_paths(path_offsets, path_nodes, packet_flows)
+    return ArrivalBlock(times, sources, destinations, sizes, *paths)
+
+
+def __merge_blocks(blocks: list[ArrivalBlock]) -> ArrivalBlock:
+    times = np.concatenate([block.get_times() for block in blocks])
+    sources = np.concatenate([block.get_sources() for block in blocks])
+    destinations = np.concatenate([block.get_destinations() for block in blocks])
+    sizes = np.concatenate([block.get_sizes() for block in blocks])
+    order = np.argsort(times, kind="stable")
+
+    # Arrivals of blocks without paths get empty paths if any other block has paths
+    if all(block.get_path_offsets() is None for block in blocks):
+        return ArrivalBlock(times, sources, destinations, sizes).take(order)
+    lengths: list[IndexArray] = []
+    nodes: list[npt.NDArray[np.int32]] = []
+    for block in blocks:
+        path_offsets = block.get_path_offsets()
+        path_nodes = block.get_path_nodes()
+        if path_offsets is None or path_nodes is None:
+            lengths.append(np.zeros(len(block), dtype=np.int64))
+            continue
+        lengths.append(np.diff(path_offsets))
+        nodes.append(path_nodes)
+    offsets = np.zeros(len(times) + 1, dtype=np.int64)
+    np.cumsum(np.concatenate(lengths), out=offsets[1:])
+    merged = ArrivalBlock(
+        times, sources, destinations, sizes, offsets, np.concatenate(nodes)
+    )
+    return merged.take(order)
+
+
+def iter_flow_packets(
+    blocks: Iterable[FlowBlock],
+    rng: np.random.Generator | None = None,
+) -> Iterator[ArrivalBlock]:
+    """
+    Expand flows into blocks of their packets in order of time, lazily. Flows must come in order of start. Packets are made for one window of time at a time, which holds about MAX_CHUNK_SIZE packets of the flows that are active in it, so that flows of any length are expanded in constant memory. Sizes are drawn from the size stream unless another generator `rng` is given
+    """
+    if rng is None:
+        rng = np.random.default_rng(spawn_seed(Stream.SIZES))
+
+    # Blocks with flows that have packets left, along with those flows and the
+    # index of their next packet
+    active: list[tuple[FlowBlock, IndexArray, IndexArray]] = []
+    unread = iter(blocks)
+    last_start = -np.inf
+    exhausted = False
+    while True:
+        # The window ends where the active flows have made about MAX_CHUNK_SIZE
+        # packets. Flows that start before that are read first, as they may have
+        # packets in the window, and make it smaller
+        end = np.inf
+        if len(active) > 0:
+            first = min(
+                float((b.get_starts()[f] + n * b.get_gaps()[f]).min())
+                for b, f, n in active
+            )
+            rate = sum(float((1 / b.get_gaps()[f]).sum()) for b, f, _ in active)
+            end = first + MAX_CHUNK_SIZE / rate
+        if not exhausted and last_start < end:
+            block = next(unread, None)
+            if block is None:
+                exhausted = True
+                continue
+            if (block.get_gaps() <= 0).any():
+                fatal("Flows must have a gap > 0 between their packets")
+            flows = np.flatnonzero(block.get_counts() > 0)
+            if len(flows) > 0:
+                active.append((block, flows, np.zeros(len(flows), dtype=np.int64)))
+                last_start = max(last_start, float(block.get_starts().max()))
+            continue
+        if len(active) == 0:
+            return
+
+        # Every flow makes its packets before the end of the window, and all packets
+        # that are made later are at or after it
+        expanded: list[ArrivalBlock] = []
+        remaining: list[tuple[FlowBlock, IndexArray, IndexArray]] = []
+        for block, flows, nexts in active:
+            counts = block.get_counts()[flows]
+            ends = np.ceil((end - block.get_starts()[flows]) / block.get_gaps()[flows])
+            ends = np.clip(ends, nexts, counts).astype(np.int64)
+            making = ends > nexts
+            if making.any():
+                expanded.append(
+                    __expand_flows(
+                        block, flows[making], nexts[making], ends[making], rng
+                    )
+                )
+            left = ends < counts
+            if left.any():
+                remaining.append((block, flows[left], ends[left]))
+        active = remaining
+        yield __merge_blocks(expanded)
+
+
+def iter_merged_blocks(streams: list[Iterable[ArrivalBlock]]) -> Iterator[ArrivalBlock]:
+    """
+    Merge streams of blocks of arrivals that are each in order of time into one stream in order of time, lazily. The next block of every stream is held, and all arrivals up to the earliest last time among them are merged and yielded, after which that stream moves on to its next block. Arrivals at the same time keep the order of their streams
+    """
+    unread = [iter(stream) for stream in streams]
+    held: list[ArrivalBlock | None] = [None for _ in streams]
+    firsts = [0 for _ in streams]  # First arrival of every held block not yet yielded
+    while True:
+        for index, stream in enumerate(unread):
+            block = held[index]
+            while block is None or firsts[index] == len(block):
+                block = next(stream, None)
+                firsts[index] = 0
+                if block is None:
+                    break
+            held[index] = block
+        blocks = [block for block in held if block is not None]
+        if len(blocks) == 0:
+            return
+
+        # Every stream may still have arrivals after the last time of its held
+        # block, but none before it
+        watermark = min(float(block.get_times()[-1]) for block in blocks)
+        parts: list[ArrivalBlock] = []
+        for index, block in enumerate(held):
+            if block is None:
+                continue
+            times = block.get_times()
+            split = int(np.searchsorted(times, watermark, side="right"))
+            if split > firsts[index]:
+                parts.append(block.take(np.arange(firsts[index], split)))
+                firsts[index] = split
+        yield __merge_blocks(parts)
@@ -0,0 +1,111 @@
+import threading
+from collections import deque
+from collections.abc import Iterable, Iterator
+
+import numpy as np
+
+from ..topology.sampling import FloatArray
+from .models.block import ArrivalBlock
+
+
+"""
+The number of thinned blocks that a stream that is being iterated can have waiting, after which the source is not read further until it catches up, which bounds the memory used when one stream is written slower than the others
+"""
+MAX_WAITING_BLOCKS = 4
+
+
+class ThinnedStreams:
+    """
+    Streams of blocks of arrivals that are thinned from one source stream, each keeping its own share of the arrivals. Every arrival gets one uniform mark, and is kept by the streams whose share is above it, so that the arrivals of a stream are also in every stream with a larger share. The source is read only once, by whichever stream runs out of blocks first, and every block of the source is thinned for all streams at once. Streams are meant to be iterated at the same time, each in its own thread, as is done when they are written, while the blocks of a stream that is not iterated yet are held in memory until it is
+    """
+
+    __source: Iterator[ArrivalBlock]
+    __shares: FloatArray
+    __rng: np.random.Generator
+    __waiting: list[
+        deque[ArrivalBlock]
+    ]  # Thinned blocks that every stream has yet to yield
+    __started: list[bool]
+    __closed: list[bool]
+    __reading: bool  # Whether a stream is reading a block from the source
+    __exhausted: bool
+    __condition: threading.Condition
+
+    def __init__(
+        self,
+        source: Iterable[ArrivalBlock],
+        shares: list[float],
+        rng: np.random.Generator,
+    ) -> None:
+        self.__source = iter(source)
+        self.__shares = np.array(shares, dtype=np.float64)
+        self.__rng = rng
+        self.__waiting = [deque() for _ in shares]
+        self.__started = [False for _ in shares]
+        self.__closed = [False for _ in shares]
+        self.__reading = False
+        self.__exhausted = False
+        self.__condition = threading.Condition()
+
+    def __can_read(self) -> bool:
+        # Streams that are not iterated yet cannot catch up, so only streams that
+        # are being iterated hold back the source
+        return not self.__reading and all(
+            len(waiting) < MAX_WAITING_BLOCKS
+            for waiting, started, closed in zip(
+                self.__waiting, self.__started, self.__closed
+            )
+            if started and not closed
+        )
+
+    def __read(self) -> None:
+        # The source is read outside of the lock, so that other streams can yield
+        # their waiting blocks in the meantime
+        try:
+            block = next(self.__source, None)
+        except BaseException:
+            # Streams end early rather than wait forever when the source fails
+            block = None
+            raise
+        finally:
+            with self.__condition:
+                if block is None:
+                    self.__exhausted = True
+                else:
+                    marks = self.__rng.random(len(block))
+                    for stream, share in enumerate(self.__shares.tolist()):
+                        if not self.__closed[stream]:
+                            kept = block.take(np.flatnonzero(marks < share))
+                            self.__waiting[stream].append(kept)
+                self.__reading = False
+                self.__condition.notify_all()
+
+    def iter_stream(self, stream: int) -> Iterator[ArrivalBlock]:
+        """
+        Iterate over the blocks of arrivals of the `stream`-th share, which can only be done once
+        """
+        with self.__condition:
+            self.__started[stream] = True
+        try:
+            while True:
+                block = None
+                with self.__condition:
+                    while len(self.__waiting[stream]) == 0:
+                        if self.__exhausted:
+                            return
+                        if self.__can_read():
+                            self.__reading = True
+                            break
+                        self.__condition.wait()
+                    else:
+                        block = self.__waiting[stream].popleft()
+                        self.__condition.notify_all()
+                if block is None:
+                    self.__read()
+                else:
+                    yield block
+        finally:
+            with self.__condition:
+                self.__closed[stream] = True
+                self.__waiting[stream].clear()
+                self.__condition.notify_all()
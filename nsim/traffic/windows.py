@@ -0,0 +1,79 @@
+from collections import deque
+from itertools import islice
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import Future, ProcessPoolExecutor
+
+import numpy as np
+
+from .models.block import ArrivalBlock
+from .models.traversal import Traversal
+
+
+"""
+The expected number of arrivals in a time window, the unit of work that is handed to a worker. Windows do not depend on the number of workers, so the same seed results in the same traffic no matter how many workers are used
+"""
+WINDOW_SIZE = 2**20
+
+"""
+The number of windows per worker that are generated ahead of the one that is being written, which bounds the memory used when writing is slower than generating
+"""
+WINDOWS_AHEAD = 2
+
+"""
+Function that makes the blocks of arrivals of a window from its number and its own random stream
+"""
+WindowFunction = Callable[
+    [Traversal, int, np.random.SeedSequence], Iterable[ArrivalBlock]
+]
+
+"""
+Traversal of the topology in a worker process, which is handed over once when the worker starts rather than with every window. It is pickled as arrays without the graph of its leaves, so workers can be spawned as well as forked
+"""
+__traversal: Traversal | None = None
+
+
+def __set_traversal(traversal: Traversal) -> None:
+    global __traversal
+    __traversal = traversal
+
+
+def __make_window(
+    make_window: WindowFunction,
+    window: int,
+    seed: np.random.SeedSequence,
+) -> list[ArrivalBlock]:
+    assert __traversal is not None
+    return list(make_window(__traversal, window, seed))
+
+
+def iter_windows(
+    traversal: Traversal,
+    make_window: WindowFunction,
+    seeds: list[np.random.SeedSequence],
+    workers: int = 1,
+) -> Iterator[ArrivalBlock]:
+    """
+    Make the blocks of arrivals of consecutive time windows, one for each of `seeds`, and yield them in order. Windows are spread over `workers` processes, and yielded as soon as they and all earlier windows are complete
+    """
+    if workers <= 1 or len(seeds) <= 1:
+        for window, seed in enumerate(seeds):
+            yield from make_window(traversal, window, seed)
+        return
+
+    windows = enumerate(seeds)
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=__set_traversal,
+        initargs=(traversal,),
+    ) as executor:
+        pending: deque[Future[list[ArrivalBlock]]] = deque(
+            executor.submit(__make_window, make_window, window, seed)
+            for window, seed in islice(windows, workers * WINDOWS_AHEAD)
+        )
+        while len(pending) > 0:
+            blocks = pending.popleft().result()
+            for window, seed in islice(windows, 1):
+                pending.append(
+                    executor.submit(__make_window, make_window, window, seed)
+                )
+            yield from blocks
@@ -0,0 +1,315 @@
+import json
+from itertools import combinations
+
+import numpy as np
+import pytest
+from typer.testing import CliRunner
+
+from nsim import cli
+from nsim.config import LoggingLevelDefault, set_config
+from nsim.topology.graph import (
+    find_components,
+    find_strong_components,
+    find_reachable_components,
+)
+from nsim.topology.sampling import (
+    to_mesh_pairs,
+    find_nearby_pairs,
+    sample_pair_indices,
+    to_connectivities,
+    sample_coupled_pair_indices,
+)
+from nsim.topology.models.leaf import Leaf, LeafType
+from nsim.topology.models.compact import CompactTopology
+from nsim.topology.models.topology import Topology
+from nsim.traffic import reachability
+from nsim.traffic.models.traversal import Traversal
+
+
+runner = CliRunner()
+
+
+def test_sample_pair_indices_density():
+    indices = sample_pair_indices(10**7, 0.01, np.random.SeedSequence(0))
+    assert abs(len(indices) - 10**5) < 5 * np.sqrt(10**5)
+    assert np.all(np.diff(indices) > 0)
+    assert indices[0] >= 0 and indices[-1] < 10**7
+
+
+def test_sample_pair_indices_bounds():
+    seed = np.random.SeedSequence(0)
+    assert len(sample_pair_indices(100, 0, seed)) == 0
+    assert list(sample_pair_indices(5, 1, seed)) == [0, 1, 2, 3, 4]
+
+
+def test_sample_pair_indices_workers():
+    serial = sample_pair_indices(10**8, 0.0001, np.random.SeedSequence(0))
+    parallel = sample_pair_indices(10**8, 0.0001, np.random.SeedSequence(0), 3)
+    assert np.array_equal(serial, parallel)
+
+    # Smaller samples are split over the workers as well
+    serial = sample_pair_indices(10**6, 0.01, np.random.SeedSequence(0))
+    parallel = sample_pair_indices(10**6, 0.01, np.random.SeedSequence(0), 4)
+    assert np.array_equal(serial, parallel)
+
+
+def test_sample_coupled_pair_indices():
+    indices, positions = sample_coupled_pair_indices(
+        10**6, [0.01, 0.001, 0], np.random.SeedSequence(0), np.random.SeedSequence(1)
+    )
+    expected = sample_pair_indices(10**6, 0.01, np.random.SeedSequence(0))
+    assert np.array_equal(indices, expected)
+    assert np.array_equal(positions[0], np.arange(len(indices)))
+    assert abs(len(positions[1]) - 1000) < 5 * np.sqrt(1000)
+    assert len(positions[2]) == 0
+    assert np.all(np.diff(positions[1]) > 0)
+
+
+def test_to_mesh_pairs():
+    a, b = to_mesh_pairs(np.arange(45, dtype=np.int64))
+    expected = sorted((j, i) for i, j in combinations(range(10), 2))
+    assert list(zip(a.tolist(), b.tolist())) == expected
+
+
+def test_find_nearby_pairs():
+    rng = np.random.default_rng(0)
+    x, y = rng.random((2, 300))
+    a, b, distances = find_nearby_pairs(x, y, 0.1)
+
+    all_distances = np.hypot(x[:, None] - x[None, :], y[:, None] - y[None, :])
+    expected_a, expected_b = np.nonzero(np.tril(all_distances <= 0.1, -1))
+    assert set(zip(a.tolist(), b.tolist())) == set(
+        zip(expected_a.tolist(), expected_b.tolist()),
+    )
+    assert np.allclose(distances, all_distances[a, b])
+
+
+def test_find_components():
+    rng = np.random.default_rng(0)
+    a = rng.integers(0, 500, 300)
+    b = rng.integers(0, 500, 300)
+    labels = find_components(500, a, b)
+
+    # Compare against merging components one edge at a time
+    expected = list(range(500))
+    for i, j in zip(a.tolist(), b.tolist()):
+        old, new = max(expected[i], expected[j]), min(expected[i], expected[j])
+        expected = [new if label == old else label for label in expected]
+    assert labels.tolist() == expected
+
+
+def test_find_strong_components():
+    rng = np.random.default_rng(0)
+    a = rng.integers(0, 100, 130)
+    b = rng.integers(0, 100, 130)
+    labels = find_strong_components(100, a, b)
+    reachable = find_reachable_components(labels, a, b)
+
+    successors = {i: set() for i in range(100)}
+    for i, j in zip(a.tolist(), b.tolist()):
+        successors[i].add(j)
+    reach = {}
+    for i in range(100):
+        seen, queue = {i}, [i]
+        for leaf in queue:
+            for neighbour in successors[leaf] - seen:
+                seen.add(neighbour)
+                queue.append(neighbour)
+        reach[i] = seen
+
+    for i, j in combinations(range(100), 2):
+        both = j in reach[i] and i in reach[j]
+        assert (labels[i] == labels[j]) == both
+        for x, y in ((i, j), (j, i)):
+            bit = reachable[labels[x], labels[y] >> 3] >> (labels[y] & 7) & 1
+            assert bit == (y in reach[x] and not both)
+
+
+def test_random_directed_destinations(monkeypatch):
+    set_config(LoggingLevelDefault)
+    rng = np.random.default_rng(0)
+    a = rng.integers(0, 60, 80)
+    b = rng.integers(0, 60, 80)
+    links = sorted({(i, j) for i, j in zip(a.tolist(), b.tolist()) if i != j})
+    topology = Topology("t")
+    leaves = [Leaf(f"t_{i}", LeafType.HOST) for i in range(60)]
+    for leaf in leaves:
+        topology.add_node(leaf)
+    for i, j in links:
+        leaves[i].add_edge(leaves[j], 1000)
+
+    successors = {i: set() for i in range(60)}
+    for i, j in links:
+        successors[i].add(j)
+    reach = {}
+    for i in range(60):
+        seen, queue = {i}, [i]
+        for leaf in queue:
+            for neighbour in successors[leaf] - seen:
+                seen.add(neighbour)
+                queue.append(neighbour)
+        reach[i] = seen - {i}
+
+    # Destinations are drawn uniformly from the leaves that the source reaches,
+    # both by rejection and by picking from the reachable leaves
+    sources = [i for i in range(60) if len(reach[i]) > 0]
+    assert any(len(reach[i]) < 10 for i in sources)
+    assert any(len(reach[i]) > 30 for i in sources)
+    for rounds in (0, reachability.REJECTION_ROUNDS):
+        monkeypatch.setattr(reachability, "REJECTION_ROUNDS", rounds)
+        traversal = Traversal(topology)
+        draws = 3000
+        destinations = traversal.get_random_destinations(
+            np.repeat(np.array(sources, dtype=np.int64), draws),
+            np.random.default_rng(1),
+        ).reshape(len(sources), draws)
+        for source, row in zip(sources, destinations):
+            counts = np.bincount(row, minlength=60)
+            assert set(np.flatnonzero(counts).tolist()) == reach[source]
+            expected = draws / len(reach[source])
+            assert np.all(
+                np.abs(counts[list(reach[source])] - expected) < 5 * np.sqrt(expected)
+            )
+
+
+def test_compact_topology():
+    set_config(LoggingLevelDefault)
+    ids = ["a", "b", "c"]
+    types = np.zeros(3, dtype=np.uint8)
+    a = np.array([1, 2])
+    b = np.array([0, 1])
+    topology = CompactTopology.from_links("t", ids, types, a, b, np.array([10, 20]))
+
+    leaves = topology.flatten()
+    assert [leaf.get_id() for leaf in leaves] == ids
+    assert [edge.get_id() for edge in leaves[1].get_edges()] == ["b_a_10", "b_c_20"]
+    assert leaves[1].get_edges()[0].get_destination() == topology.flatten()[0]
+
+    # Edges added afterwards are merged into the arrays when they are next read,
+    # and edges to leaves of another topology are kept next to them
+    leaves[2].add_edge(leaves[0], 30, 5.0)
+    assert [edge.get_id() for edge in leaves[2].get_edges()] == ["c_a_30", "c_b_20"]
+    assert [edge.get_distance() for edge in leaves[2].get_edges()] == [5.0, None]
+    assert list(topology.get_offsets()) == [0, 1, 3, 5]
+    empty = np.zeros(0, dtype=np.int64)
+    other = CompactTopology.from_links("o", ["d"], types[:1], empty, empty, empty)
+    outer = Topology("outer")
+    outer.add_node(topology)
+    outer.add_node(other)
+    topology.connect(other, 1, 40)
+    assert list(topology.get_offsets()) == [0, 1, 3, 5]
+    assert [edge.get_id() for edge in leaves[0].get_edges()] == ["a_b_10", "a_d_40"]
+    assert len(outer.get_leaf_by_id("d").get_edges()) == 3
+
+
+def test_topology_leaf_index():
+    inner = Topology("inner")
+    outer = Topology("outer")
+    outer.add_node(Leaf("a", LeafType.HOST))
+    outer.add_node(inner)
+    outer.add_node(Leaf("c", LeafType.HOST))
+    assert [leaf.get_id() for leaf in outer.flatten()] == ["a", "c"]
+
+    inner.add_node(Leaf("b", LeafType.HOST))
+    assert [leaf.get_id() for leaf in outer.flatten()] == ["a", "b", "c"]
+    assert outer.get_leaf_by_id("b") is inner.flatten()[0]
+    assert outer.get_leaf_by_id("d") is None
+
+
+def test_generate_seed():
+    config = '{"name": "m", "number_of_nodes": "50", "connectivity": "0.1"}'
+    args = ["topology", "generate", "-g", "mesh", "-o", "json", "-c", config]
+    first = runner.invoke(cli.app, [*args, "--seed", "1"])
+    second = runner.invoke(cli.app, [*args, "--seed", "1", "--workers", "2"])
+    third = runner.invoke(cli.app, [*args, "--seed", "2"])
+    assert first.exit_code == 0
+    assert first.stdout == second.stdout
+    assert first.stdout != third.stdout
+
+
+def test_generate_sweep(tmp_path):
+    for generator in ("mesh", "star"):
+        config = '{"name": "m", "number_of_nodes": "100", "connectivity": "0.2"}'
+        args = ["topology", "generate", "-g", generator, "-o", "json", "-c", config]
+        expected = json.loads(runner.invoke(cli.app, [*args, "--seed", "1"]).stdout)
+
+        config = '{"name": "m", "number_of_nodes": "100", "connectivities": "[0.2, 0.05, 0.1]"}'
+        args = ["topology", "sweep", "-g", generator, "-o", "json", "-c", config]
+        directory = tmp_path / generator
+        result = runner.invoke(cli.app, [*args, "-d", str(directory), "--seed", "1"])
+        assert result.exit_code == 0
+
+        # The topology at the highest connectivity has the edges of the plain
+        # generator, and every edge at a connectivity is an edge at every higher one
+        edges = {}
+        for connectivity in ("0.05", "0.1", "0.2"):
+            data = json.loads((directory / f"m-{connectivity}.json").read_text())
+            edges[connectivity] = {
+                (node["id"], edge["destination"], edge["bandwidth"])
+                for node in data["nodes"]
+                for edge in node["edges"]
+            }
+        assert [node["edges"] for node in data["nodes"]] == [
+            node["edges"] for node in expected["nodes"]
+        ]
+        assert edges["0.05"] < edges["0.1"] < edges["0.2"]
+
+    # Files are named after the exact connectivities, which are parsed as floats only
+    config = '{"name": "m", "number_of_nodes": "10", "connectivities": "[0.1234561, 0.1234562]"}'
+    args = ["topology", "sweep", "-g", "mesh", "-o", "json", "-c", config]
+    result = runner.invoke(cli.app, [*args, "-d", str(tmp_path / "exact")])
+    assert result.exit_code == 0
+    assert len(list((tmp_path / "exact").iterdir())) == 2
+    with pytest.raises(ValueError):
+        to_connectivities('[{"c": 1}]')
+
+
+def test_generate_barabasi_albert():
+    config = '{"name": "b", "number_of_nodes": "2000", "number_of_links": "2"}'
+    args = ["topology", "generate", "-g", "barabasi-albert", "-o", "json", "-c", config]
+    result = runner.invoke(cli.app, [*args, "--seed", "1"])
+    assert result.exit_code == 0
+
+    data = json.loads(result.stdout)
+    degrees = [len(node["edges"]) for node in data["nodes"]]
+    assert min(degrees) >= 1 and max(degrees) > 20
+    for node in data["nodes"]:
+        destinations = [edge["destination"] for edge in node["edges"]]
+        assert node["id"] not in destinations
+        assert len(set(destinations)) == len(destinations)
+
+
+def test_generate_data_center(tmp_path):
+    generators = {
+        "fat-tree": ('{"name": "f", "k": "4"}', 36, {"f_core_0_0": 4, "f_host_0_0_0": 1}),
+        "torus": (
+            '{"name": "t", "dimensions": "2x3", "hosts_per_switch": "1"}',
+            12,
+            {"t_switch_0_0": 4, "t_host_1_2_0": 1},
+        ),
+        "dragonfly": (
+            '{"name": "d", "routers_per_group": "2", "hosts_per_router": "1", "global_links_per_router": "1"}',
+            12,
+            {"d_router_0_0": 3, "d_host_2_1_0": 1},
+        ),
+    }
+    for generator, (config, number_of_leaves, degrees) in generators.items():
+        args = ["topology", "generate", "-g", generator, "-o", "json", "-c", config]
+        result = runner.invoke(cli.app, args)
+        assert result.exit_code == 0
+
+        data = json.loads(result.stdout)
+        assert data["type"] == "CompactTopology"
+        assert len(data["nodes"]) == number_of_leaves
+        edges = {node["id"]: len(node["edges"]) for node in data["nodes"]}
+        for leaf_id, degree in degrees.items():
+            assert edges[leaf_id] == degree
+
+        # Compact topologies are read back as plain topologies of the same leaves
+        args = ["topology", "generate", "-g", generator, "-o", "xml", "-c", config]
+        result = runner.invoke(cli.app, args)
+        assert result.stdout.startswith("<compacttopology")
+        path = tmp_path / f"{generator}.xml"
+        path.write_text(result.stdout)
+        result = runner.invoke(cli.app, ["topology", "convert", str(path), "-o", "json"])
+        assert json.loads(result.stdout) == {**data, "type": "Topology"}
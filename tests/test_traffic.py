@@ -0,0 +1,654 @@
+import json
+import pickle
+import multiprocessing
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+import numpy as np
+import pytest
+from typer.testing import CliRunner
+
+from nsim import cli
+from nsim.config import LoggingLevelDefault, RoutingMetric, set_config
+from nsim.traffic import sweep, streams, windows
+from nsim.topology import routing
+from nsim.topology.models.leaf import Leaf, LeafType
+from nsim.topology.models.topology import Topology
+from nsim.traffic.models.traversal import Traversal
+from nsim.traffic.generators import poisson, constant
+from nsim.traffic.models.block import ArrivalBlock
+from nsim.traffic.models.arrival import Arrival
+from nsim.traffic import sampling as traffic_sampling
+from nsim.traffic.models.flow import Flow
+from nsim.traffic.models.block import FlowBlock
+from nsim.traffic.models.traffic import Traffic
+from nsim.traffic.streams import iter_flow_packets
+from nsim.traffic.sizes import SIZE_RANGES, SizeDistribution, to_size_distribution
+from nsim.traffic.sampling import (
+    AliasTable,
+    AliasMatrix,
+    iter_train_times,
+    iter_on_off_times,
+    iter_source_times,
+    iter_poisson_times,
+    iter_varying_poisson_times,
+)
+
+
+runner = CliRunner()
+
+
+def generate_topology(tmp_path, generator, config):
+    args = ["topology", "generate", "-g", generator, "-o", "json", "-c", config]
+    result = runner.invoke(cli.app, [*args, "--seed", "1"])
+    assert result.exit_code == 0
+    path = tmp_path / "topology.json"
+    path.write_text(result.stdout)
+    return str(path), json.loads(result.stdout)
+
+
+def generate_traffic(generator, config, seed="1", options=()):
+    args = ["traffic", "generate", "-g", generator, "-o", "json", "-c", config]
+    result = runner.invoke(cli.app, [*args, "--seed", seed, *options])
+    assert result.exit_code == 0
+    return json.loads(result.stdout)["arrivals"]
+
+
+def test_alias_table():
+    weights = [1, 0, 3, 6]
+    samples = AliasTable(weights).sample(np.random.default_rng(0), 100000)
+    frequencies = np.bincount(samples, minlength=4) / len(samples)
+    assert np.allclose(frequencies, np.array(weights) / 10, atol=0.01)
+
+
+def test_alias_matrix():
+    weights = np.array([[0, 1, 3], [2, 0, 2], [0, 0, 5]])
+    rows = np.repeat(np.arange(3), 100000)
+    samples = AliasMatrix(weights).sample(np.random.default_rng(0), rows)
+    for row in range(3):
+        frequencies = np.bincount(samples[rows == row], minlength=3) / 100000
+        assert np.allclose(frequencies, weights[row] / weights[row].sum(), atol=0.01)
+
+
+def test_alias_matrix_batches(monkeypatch):
+    # Batches of two rows, of which the first only has rows of zeros, and tables
+    # that are memory-mapped as they do not fit in one batch
+    monkeypatch.setattr(traffic_sampling, "MAX_ALIAS_BATCH_SIZE", 6)
+    weights = np.array([[0, 0, 0], [0, 0, 0], [1, 1, 1], [1, 3, 0], [1, 1, 1]])
+    rows = np.repeat(np.arange(2, 5), 100000)
+    samples = AliasMatrix(weights).sample(np.random.default_rng(0), rows)
+    for row in range(2, 5):
+        frequencies = np.bincount(samples[rows == row], minlength=3) / 100000
+        assert np.allclose(frequencies, weights[row] / weights[row].sum(), atol=0.01)
+    samples = AliasMatrix(np.ones((3, 3))).sample(np.random.default_rng(0), rows % 3)
+    assert np.allclose(np.bincount(samples) / len(samples), 1 / 3, atol=0.01)
+
+
+def test_size_distributions():
+    rng = np.random.default_rng(0)
+    sizes = to_size_distribution("imix").sample(rng, 120000)
+    assert set(np.unique(sizes)) == {40, 576, 1500}
+    assert np.allclose(
+        np.bincount(sizes)[[40, 576, 1500]] / 120000,
+        [7 / 12, 4 / 12, 1 / 12],
+        atol=0.01,
+    )
+
+    sizes = to_size_distribution("[[64, 64, 1], [1000, 1499, 3]]").sample(rng, 100000)
+    assert abs(np.mean(sizes == 64) - 0.25) < 0.01
+    assert sizes[sizes != 64].min() == 1000 and sizes.max() == 1499
+    assert abs(np.mean(sizes[sizes != 64]) - 1249.5) < 5
+
+    # Cumulative probabilities are exact at every point
+    sizes = to_size_distribution("[[100, 0.2], [200, 0.5], [1500, 1]]").sample(
+        rng, 100000
+    )
+    assert sizes.min() == 100 and sizes.max() == 1500
+    for size, probability in [(100, 0.2), (200, 0.5), (199, 0.2 + 0.3 * 99 / 100)]:
+        assert abs(np.mean(sizes <= size) - probability) < 0.01
+
+
+def test_traffic_blocks():
+    traffic = Traffic("t", ["a", "b"])
+    traffic.add_arrival(Arrival(0.5, "a", "c", 600, ["a", "b", "c"]))
+    traffic.add_block(
+        ArrivalBlock(
+            np.array([1.0, 2.0]),
+            np.array([1, 0]),
+            np.array([0, 2]),
+            np.array([700, 800]),
+        )
+    )
+    traffic.add_arrival(Arrival(3.0, "d", "a", 900))
+
+    arrivals = traffic.get_arrivals()
+    assert traffic.get_ids() == ["a", "b", "c", "d"]
+    assert [arrival.get_id() for arrival in arrivals] == [
+        "0.5_a_c_600",
+        "1.0_b_a_700",
+        "2.0_a_c_800",
+        "3.0_d_a_900",
+    ]
+    assert arrivals[0].get_path() == ["a", "b", "c"]
+    assert arrivals[1].get_path() is None
+
+
+def test_expand_flows(monkeypatch):
+    monkeypatch.setattr(streams, "MAX_CHUNK_SIZE", 50)
+    sizes = to_size_distribution("imix")
+    blocks = [
+        FlowBlock(
+            np.array([0.0, 0.5]),
+            np.array([0, 1]),
+            np.array([1, 0]),
+            np.array([100, 3]),
+            np.array([0.1, 1.0]),
+            [sizes],
+        ),
+        FlowBlock(
+            np.array([2.0]),
+            np.array([2]),
+            np.array([0]),
+            np.array([40]),
+            np.array([0.25]),
+            [sizes],
+        ),
+    ]
+
+    # Packets of overlapping flows are merged in order of time, in small blocks
+    expanded = list(iter_flow_packets(blocks, np.random.default_rng(0)))
+    assert len(expanded) > 2 and all(len(block) <= 100 for block in expanded)
+    times = np.concatenate([block.get_times() for block in expanded])
+    sources = np.concatenate([block.get_sources() for block in expanded])
+    expected = np.concatenate(
+        [np.arange(100) * 0.1, 0.5 + np.arange(3), 2 + np.arange(40) * 0.25]
+    )
+    assert np.array_equal(times, np.sort(expected))
+    assert np.array_equal(np.bincount(sources), [100, 3, 40])
+
+    # Flows are kept as they are, until arrivals are asked for
+    traffic = Traffic("t")
+    traffic.add_flow(Flow(1.0, "b", "a", 2, 0.5, sizes, ["b", "a"]))
+    traffic.add_flow(Flow(0.0, "a", "b", 3, 1.0, sizes))
+    assert [flow.get_id() for flow in traffic.iter_flows()] == [
+        "0.0_a_b_3",
+        "1.0_b_a_2",
+    ]
+    traffic = Traffic("t")
+    traffic.add_flow(Flow(1.0, "b", "a", 2, 0.5, sizes, ["b", "a"]))
+    arrivals = traffic.get_arrivals()
+    assert [arrival.get_time() for arrival in arrivals] == [1.0, 1.5]
+    assert all(arrival.get_path() == ["b", "a"] for arrival in arrivals)
+    assert all(arrival.get_size() in (40, 576, 1500) for arrival in arrivals)
+
+    # Packets of flows are merged with the arrivals by time
+    traffic = Traffic("t")
+    traffic.add_arrival(Arrival(1.0, "a", "b", 100))
+    traffic.add_arrival(Arrival(5.0, "a", "b", 100))
+    traffic.add_flow(Flow(0.0, "b", "a", 3, 2.5, sizes))
+    times = [arrival.get_time() for arrival in traffic.iter_arrivals()]
+    assert times == [0.0, 1.0, 2.5, 5.0, 5.0]
+    traffic = Traffic("t")
+    traffic.add_arrival(Arrival(5.0, "a", "b", 100))
+    traffic.add_flow(Flow(0.0, "b", "a", 2, 1.0, sizes))
+    assert [arrival.get_time() for arrival in traffic.get_arrivals()] == [0, 1, 5]
+
+
+def test_sample_poisson_times():
+    rng = np.random.default_rng(0)
+    times = np.concatenate(list(iter_poisson_times(1000, 100, rng)))
+    assert np.all(np.diff(times) > 0) and 0 < times[0] and times[-1] < 100
+
+    counts = np.bincount(times.astype(np.int64), minlength=100)
+    assert abs(counts.mean() - 1000) < 10
+    assert abs(counts.var() / 1000 - 1) < 0.3
+    assert len(list(iter_poisson_times(0, 100, rng))) == 0
+
+
+def test_sample_varying_poisson_times():
+    table_times = np.array([0.0, 10, 20])
+    table_rates = np.array([0.0, 1000, 0])
+    rng = np.random.default_rng(0)
+    chunks = iter_varying_poisson_times(table_times, table_rates, 200, rng)
+    times = np.concatenate(list(chunks))
+    assert np.all(np.diff(times) > 0) and 0 < times[0] and times[-1] < 200
+
+    # Every period of 20 seconds holds a triangle of 10000 arrivals
+    counts = np.bincount((times % 20).astype(np.int64), minlength=20) / 10
+    expected = np.interp(np.arange(20) + 0.5, table_times, table_rates)
+    assert np.allclose(counts, expected, rtol=0.1, atol=20)
+
+
+def test_sample_train_times():
+    rng = np.random.default_rng(0)
+    chunks = list(iter_train_times(1, 0.01, 5, 1000, rng))
+    times = np.concatenate([times for times, _ in chunks])
+    trains = np.concatenate([trains for _, trains in chunks])
+    assert np.all(np.diff(times) >= 0) and times[-1] < 1000
+    lengths = np.bincount(trains)
+    assert np.all(np.diff(trains) >= 0) and lengths.min() >= 1 and lengths.max() <= 5
+    assert abs(lengths.mean() - 3) < 0.1
+    assert abs(len(lengths) - 1000 / 1.02) < 100
+
+
+def test_sample_source_times():
+    rates = np.array([2000, 0, 1, 30, 1e-6])
+    chunks = list(iter_source_times(rates, 100, np.random.default_rng(0)))
+    times = np.concatenate([times for times, _ in chunks])
+    sources = np.concatenate([sources for _, sources in chunks])
+    assert np.all(np.diff(times) > 0) and 0 < times[0] and times[-1] < 100
+
+    counts = np.bincount(sources, minlength=5)
+    assert np.allclose(counts, rates * 100, rtol=0.3, atol=2)
+    assert len(list(iter_source_times(np.zeros(3), 100, np.random.default_rng(0)))) == 0
+
+
+def test_sample_on_off_times():
+    rng = np.random.default_rng(0)
+    chunks = list(iter_on_off_times(100, 10, 1, 2, 1.4, 20000, rng))
+    times = np.concatenate([times for times, _ in chunks])
+    sources = np.concatenate([sources for _, sources in chunks])
+    assert np.all(np.diff(times) >= 0) and 0 <= times[0] and times[-1] < 20000
+    assert abs(len(times) / (100 * 10 * 20000 / 3) - 1) < 0.1
+
+    # A source never sends faster than its rate, also across windows
+    gaps = np.diff(times[sources == 0])
+    assert gaps.min() > 1 / 10 - 1e-9
+
+    # Variances of means over growing intervals decay slower than for independent
+    # counts, which is the mark of long-range dependence
+    counts = np.bincount(times.astype(np.int64)).astype(np.float64)
+    sizes = np.array([1, 4, 16, 64, 256])
+    variances = [
+        counts[: len(counts) // m * m].reshape(-1, m).mean(axis=1).var() for m in sizes
+    ]
+    hurst = 1 + np.polyfit(np.log(sizes), np.log(variances), 1)[0] / 2
+    assert 0.7 < hurst < 1
+
+
+def test_generate_constant(tmp_path):
+    path, _ = generate_topology(tmp_path, "fat-tree", '{"name": "f", "k": "4"}')
+    config = json.dumps({"topology": path, "duration": "1", "rate": "0.001"})
+    times = [arrival["time"] for arrival in generate_traffic("constant", config)]
+    assert len(times) == 999
+    assert np.allclose(times, np.arange(1, 1000) / 1000, rtol=0, atol=1e-15)
+
+
+def test_generate_sizes(tmp_path):
+    path, _ = generate_topology(tmp_path, "fat-tree", '{"name": "f", "k": "4"}')
+    config = json.dumps({"topology": path, "duration": "10", "lambda": "50"})
+    sizes = [arrival["size"] for arrival in generate_traffic("poisson", config)]
+    assert 512 <= min(sizes) and max(sizes) <= 1500
+
+    config = json.dumps(
+        {"topology": path, "duration": "10", "lambda": "50", "sizes": "imix"}
+    )
+    sizes = [arrival["size"] for arrival in generate_traffic("poisson", config)]
+    assert set(sizes) == {40, 576, 1500}
+
+    sizes_path = tmp_path / "sizes.json"
+    sizes_path.write_text("[[64, 64, 1], [1500, 1500, 1]]")
+    config = json.dumps(
+        {"topology": path, "duration": "1", "rate": "0.01", "sizes": str(sizes_path)}
+    )
+    sizes = [arrival["size"] for arrival in generate_traffic("constant", config)]
+    assert set(sizes) == {64, 1500}
+
+
+def test_generate_routes(tmp_path):
+    config = '{"name": "m", "number_of_nodes": "40", "connectivity": "0.2"}'
+    path, topology = generate_topology(tmp_path, "mesh", config)
+    edges = {node["id"]: node["edges"] for node in topology["nodes"]}
+
+    def reachable(source):
+        seen, queue = {source}, [source]
+        for leaf in queue:
+            for edge in edges[leaf]:
+                if edge["destination"] not in seen:
+                    seen.add(edge["destination"])
+                    queue.append(edge["destination"])
+        return seen
+
+    config = json.dumps({"topology": path, "duration": "10", "lambda": "50"})
+    arrivals = generate_traffic("poisson", config)
+    assert len(arrivals) > 300
+    assert arrivals == generate_traffic("poisson", config)
+    assert arrivals != generate_traffic("poisson", config, seed="2")
+    for arrival in arrivals:
+        assert arrival["source"] != arrival["destination"]
+        assert arrival["destination"] in reachable(arrival["source"])
+
+
+def test_generate_windows(tmp_path, monkeypatch):
+    monkeypatch.setattr(poisson, "WINDOW_SIZE", 100)
+    monkeypatch.setattr(constant, "WINDOW_SIZE", 100)
+    path, _ = generate_topology(tmp_path, "fat-tree", '{"name": "f", "k": "4"}')
+
+    # Windows join up seamlessly, and do not depend on the number of workers
+    config = json.dumps({"topology": path, "duration": "10", "lambda": "50"})
+    arrivals = generate_traffic("poisson", config)
+    times = [arrival["time"] for arrival in arrivals]
+    assert len(times) > 300 and np.all(np.diff(times) > 0) and times[-1] < 10
+    assert arrivals == generate_traffic("poisson", config, options=["--workers", "2"])
+
+    config = json.dumps({"topology": path, "duration": "1", "rate": "0.001"})
+    arrivals = generate_traffic("constant", config, options=["--workers", "3"])
+    assert arrivals == generate_traffic("constant", config)
+    assert len(arrivals) == 999
+
+
+def test_generate_sources(tmp_path):
+    path, _ = generate_topology(tmp_path, "fat-tree", '{"name": "f", "k": "4"}')
+    rates = json.dumps({"f_host_0_0_0": 100, "f_host_3_1_1": 10})
+    config = json.dumps({"topology": path, "duration": "10", "rates": rates})
+    arrivals = generate_traffic("source", config)
+    times = [arrival["time"] for arrival in arrivals]
+    assert np.all(np.diff(times) > 0)
+
+    sources = [arrival["source"] for arrival in arrivals]
+    assert set(sources) == {"f_host_0_0_0", "f_host_3_1_1"}
+    assert abs(sources.count("f_host_0_0_0") - 1000) < 150
+    assert abs(sources.count("f_host_3_1_1") - 100) < 50
+    assert all(arrival["destination"] != arrival["source"] for arrival in arrivals)
+
+
+def test_generate_diurnal(tmp_path):
+    path, _ = generate_topology(tmp_path, "fat-tree", '{"name": "f", "k": "4"}')
+    rates = "[[0, 100], [5, 0], [10, 100]]"
+    config = json.dumps({"topology": path, "duration": "20", "rates": rates})
+    times = np.array(
+        [arrival["time"] for arrival in generate_traffic("diurnal", config)]
+    )
+    assert np.all(np.diff(times) > 0) and times[-1] < 20
+    assert abs(len(times) - 1000) < 150
+
+    # Rates are highest at the start and end of each period, and lowest halfway
+    phases = times % 10
+    assert np.sum(phases < 2.5) > 2 * np.sum(abs(phases - 5) < 1.25)
+
+
+def test_generate_matrix(tmp_path):
+    path, topology = generate_topology(tmp_path, "fat-tree", '{"name": "f", "k": "4"}')
+    ids = [node["id"] for node in topology["nodes"]]
+    a, b, c = (
+        ids.index(leaf_id) for leaf_id in ["f_host_0_0_0", "f_host_1_0_0", "f_core_0_0"]
+    )
+    matrix = np.zeros((len(ids), len(ids)))
+    matrix[a, b] = 30
+    matrix[a, c] = 10
+    matrix[b, a] = 60
+    np.save(tmp_path / "matrix.npy", matrix)
+
+    config = json.dumps(
+        {"topology": path, "duration": "10", "matrix": str(tmp_path / "matrix.npy")}
+    )
+    arrivals = generate_traffic("matrix", config)
+    assert np.all(np.diff([arrival["time"] for arrival in arrivals]) > 0)
+    pairs = [(arrival["source"], arrival["destination"]) for arrival in arrivals]
+    assert abs(pairs.count(("f_host_0_0_0", "f_host_1_0_0")) - 300) < 60
+    assert abs(pairs.count(("f_host_0_0_0", "f_core_0_0")) - 100) < 40
+    assert abs(pairs.count(("f_host_1_0_0", "f_host_0_0_0")) - 600) < 90
+    assert len(set(pairs)) == 3
+
+
+def test_generate_gravity(tmp_path):
+    path, _ = generate_topology(tmp_path, "fat-tree", '{"name": "f", "k": "4"}')
+    weights = {"f_host_0_0_0": [100, 1], "f_host_1_0_0": [0, 3], "f_edge_0_0": [0, 0]}
+    config = json.dumps(
+        {"topology": path, "duration": "10", "weights": json.dumps(weights)}
+    )
+    arrivals = generate_traffic("gravity", config)
+    assert abs(len(arrivals) - 1000) < 150
+
+    # The only source cannot send to itself, so all arrivals go to the other leaf
+    assert all(arrival["source"] == "f_host_0_0_0" for arrival in arrivals)
+    assert all(arrival["destination"] == "f_host_1_0_0" for arrival in arrivals)
+
+    # A source whose reachable leaves have almost none of the in weight still
+    # only sends to them
+    links = [("a", "b"), ("c", "d")]
+    topology = {
+        "type": "Topology",
+        "id": "g",
+        "nodes": [
+            {
+                "type": "Host",
+                "id": leaf_id,
+                "edges": [
+                    {
+                        "type": "Edge",
+                        "id": f"{leaf_id}_{other}",
+                        "source": leaf_id,
+                        "destination": other,
+                        "bandwidth": 1000,
+                    }
+                    for link in links
+                    if leaf_id in link
+                    for other in link
+                    if other != leaf_id
+                ],
+            }
+            for leaf_id in "abcd"
+        ],
+    }
+    path = tmp_path / "components.json"
+    path.write_text(json.dumps(topology))
+    weights = {"a": [100, 0], "b": [0, 1e-12], "c": [0, 1], "d": [0, 1]}
+    config = json.dumps(
+        {"topology": str(path), "duration": "10", "weights": json.dumps(weights)}
+    )
+    arrivals = generate_traffic("gravity", config)
+    assert abs(len(arrivals) - 1000) < 150
+    assert all(arrival["destination"] == "b" for arrival in arrivals)
+
+
+def test_generate_paths(tmp_path, monkeypatch):
+    monkeypatch.setattr(routing, "CACHE_DIRECTORY", tmp_path / "cache")
+    config = '{"name": "t", "dimensions": "4x5", "hosts_per_switch": "1"}'
+    path, topology = generate_topology(tmp_path, "torus", config)
+    edges = {
+        node["id"]: {edge["destination"] for edge in node["edges"]}
+        for node in topology["nodes"]
+    }
+
+    def distance(source, destination):
+        hops, frontier, seen = 0, {source}, {source}
+        while destination not in frontier:
+            frontier = {b for a in frontier for b in edges[a]} - seen
+            seen |= frontier
+            hops += 1
+        return hops
+
+    config = json.dumps({"topology": path, "duration": "1", "rate": "0.01"})
+    options = ["--routing", "hops"]
+    arrivals = generate_traffic("constant", config, options=options)
+    assert list(tmp_path.joinpath("cache").iterdir())
+    assert arrivals == generate_traffic("constant", config, options=options)
+    for arrival in arrivals:
+        hops = arrival["path"]
+        assert hops[0] == arrival["source"] and hops[-1] == arrival["destination"]
+        assert all(b in edges[a] for a, b in zip(hops, hops[1:]))
+        assert len(hops) - 1 == distance(arrival["source"], arrival["destination"])
+
+
+def test_generate_flows(tmp_path, monkeypatch):
+    monkeypatch.setattr(routing, "CACHE_DIRECTORY", tmp_path / "cache")
+    path, _ = generate_topology(tmp_path, "fat-tree", '{"name": "f", "k": "4"}')
+    config = json.dumps(
+        {
+            "topology": path,
+            "duration": "10",
+            "lambda": "5",
+            "mean_count": "20",
+            "gap": "0.01",
+            "sizes": "imix",
+        }
+    )
+    args = ["traffic", "generate", "-g", "flow", "-o", "json", "-c", config]
+    result = runner.invoke(cli.app, [*args, "--seed", "1", "--routing", "hops"])
+    assert result.exit_code == 0
+
+    # Flows are written as they are, and cut off at the end of the duration
+    traffic = json.loads(result.stdout)
+    assert traffic["arrivals"] == [] and abs(len(traffic["flows"]) - 50) < 25
+    counts = [flow["count"] for flow in traffic["flows"]]
+    assert 10 < np.mean(counts) < 30
+    for flow in traffic["flows"]:
+        assert flow["start"] + (flow["count"] - 1) * flow["gap"] < 10
+        assert flow["path"][0] == flow["source"]
+        assert flow["path"][-1] == flow["destination"]
+
+    # Reading flows back in gives the same flows, in every format
+    flows_path = tmp_path / "traffic.json"
+    flows_path.write_text(result.stdout)
+    result = runner.invoke(
+        cli.app, ["traffic", "convert", str(flows_path), "-o", "xml"]
+    )
+    flows_path = tmp_path / "traffic.xml"
+    flows_path.write_text(result.stdout)
+    result = runner.invoke(
+        cli.app, ["traffic", "convert", str(flows_path), "-o", "json"]
+    )
+    assert json.loads(result.stdout) == traffic
+
+
+def test_generate_sweep(tmp_path):
+    path, _ = generate_topology(tmp_path, "fat-tree", '{"name": "f", "k": "4"}')
+    config = json.dumps(
+        {"topology": path, "duration": "20", "lambdas": "[100, 10, 50]"}
+    )
+    args = ["traffic", "sweep", "-g", "poisson", "-o", "json", "-c", config]
+    result = runner.invoke(
+        cli.app, [*args, "-d", str(tmp_path / "sweep"), "--seed", "1"]
+    )
+    assert result.exit_code == 0
+
+    def read(rate):
+        text = (tmp_path / "sweep" / f"f-traffic-{rate:.1f}.json").read_text()
+        return json.loads(text)["arrivals"]
+
+    # The traffic at the highest rate is that of the Poisson generator, and the
+    # traffic at every lower rate is thinned from it
+    arrivals = {rate: read(rate) for rate in (10, 50, 100)}
+    config = json.dumps({"topology": path, "duration": "20", "lambda": "100"})
+    assert arrivals[100] == generate_traffic("poisson", config)
+    assert abs(len(arrivals[50]) - 1000) < 150 and abs(len(arrivals[10]) - 200) < 60
+    ids = {rate: {arrival["id"] for arrival in arrivals[rate]} for rate in arrivals}
+    assert ids[10] <= ids[50] <= ids[100]
+
+    # Files are named after the exact rates, and rates are parsed as floats only
+    config = json.dumps(
+        {"topology": path, "duration": "0", "lambdas": "[1000000, 1000001]"}
+    )
+    args = ["traffic", "sweep", "-g", "poisson", "-o", "json", "-c", config]
+    result = runner.invoke(cli.app, [*args, "-d", str(tmp_path / "exact")])
+    assert result.exit_code == 0
+    assert len(list((tmp_path / "exact").iterdir())) == 2
+    with pytest.raises(ValueError):
+        poisson.to_lambdas("[[1]]")
+
+
+def test_thinned_streams(monkeypatch):
+    monkeypatch.setattr(sweep, "MAX_WAITING_BLOCKS", 2)
+    read = []
+
+    def source():
+        for i in range(40):
+            read.append(i)
+            times = np.arange(i * 100, (i + 1) * 100, dtype=np.float64)
+            zeros = np.zeros(100, dtype=np.int64)
+            yield ArrivalBlock(times, zeros, zeros, zeros)
+
+    # Streams that are iterated at the same time read the source once, and
+    # thin every block the same way as they would one after the other
+    shares = [1.0, 0.2, 0.5]
+    streams = sweep.ThinnedStreams(source(), shares, np.random.default_rng(3))
+    with ThreadPoolExecutor(len(shares)) as executor:
+        times = list(
+            executor.map(
+                lambda stream: np.concatenate(
+                    [block.get_times() for block in streams.iter_stream(stream)]
+                ),
+                range(len(shares)),
+            )
+        )
+    assert read == list(range(40))
+    assert np.array_equal(times[0], np.arange(4000))
+    assert set(times[1].tolist()) <= set(times[2].tolist())
+    streams = sweep.ThinnedStreams(source(), shares, np.random.default_rng(3))
+    for stream, expected in enumerate(times):
+        blocks = list(streams.iter_stream(stream))
+        assert np.array_equal(
+            np.concatenate([block.get_times() for block in blocks]), expected
+        )
+
+    # A stream that stops early does not hold back the others
+    streams = sweep.ThinnedStreams(source(), shares, np.random.default_rng(3))
+    first = streams.iter_stream(1)
+    next(first)
+    first.close()
+    assert sum(len(block) for block in streams.iter_stream(0)) == 4000
+
+
+def test_windows_spawn(tmp_path, monkeypatch):
+    monkeypatch.setattr(routing, "CACHE_DIRECTORY", tmp_path / "cache")
+    set_config(LoggingLevelDefault, routing=RoutingMetric.HOPS)
+    topology = Topology("c")
+    leaves = [Leaf(f"c_{i}", LeafType.HOST) for i in range(3000)]
+    for leaf in leaves:
+        topology.add_node(leaf)
+    for a, b in zip(leaves, leaves[1:]):
+        a.add_edge(b, 1000)
+        b.add_edge(a, 1000)
+
+    # Workers get the traversal without its chain of leaves, which is too deep to
+    # pickle, so windows can also be made by workers that are not forked
+    traversal = Traversal(topology)
+    assert pickle.loads(pickle.dumps(traversal)).get_leaf_ids() == [
+        leaf.get_id() for leaf in leaves
+    ]
+    make_window = partial(
+        poisson.make_poisson_window,
+        float(windows.WINDOW_SIZE),
+        0.001,
+        SizeDistribution(SIZE_RANGES["uniform"]),
+    )
+    seeds = np.random.SeedSequence(0).spawn(3)
+    serial = list(windows.iter_windows(traversal, make_window, seeds))
+    context = multiprocessing.get_context("spawn")
+    executor = partial(ProcessPoolExecutor, mp_context=context)
+    monkeypatch.setattr(windows, "ProcessPoolExecutor", executor)
+    parallel = list(windows.iter_windows(traversal, make_window, seeds, 2))
+    assert sum(len(block) for block in serial) > 0
+    assert len(serial) == len(parallel)
+    for a, b in zip(serial, parallel):
+        assert np.array_equal(a.get_times(), b.get_times())
+        assert np.array_equal(a.get_path_nodes(), b.get_path_nodes())
+    set_config(LoggingLevelDefault)
+
+
+def test_generate_json_id(tmp_path):
+    path, _ = generate_topology(tmp_path, "fat-tree", '{"name": "a[]b", "k": "4"}')
+    config = json.dumps({"topology": path, "duration": "1", "lambda": "5"})
+    args = ["traffic", "generate", "-g", "poisson", "-o", "json", "-c", config]
+    result = runner.invoke(cli.app, args)
+    assert result.exit_code == 0
+    traffic = json.loads(result.stdout)
+    assert traffic["id"] == "a[]b-traffic" and len(traffic["arrivals"]) > 0
+    assert result.stdout == json.dumps(traffic, indent=2) + "\n"
+
+
+def test_generate_stream(tmp_path):
+    path, _ = generate_topology(tmp_path, "fat-tree", '{"name": "f", "k": "4"}')
+    for duration in ("0", "1"):
+        config = json.dumps({"topology": path, "duration": duration, "lambda": "5"})
+        for output in ("json", "xml"):
+            args = ["traffic", "generate", "-g", "poisson", "-o", output, "-c", config]
+            result = runner.invoke(cli.app, args)
+            assert result.exit_code == 0
+
+            # Reading the streamed output back in must give the same traffic
+            output_path = tmp_path / f"traffic.{output}"
+            output_path.write_text(result.stdout)
+            args = ["traffic", "convert", str(output_path), "-o", output]
+            assert runner.invoke(cli.app, args).stdout == result.stdout